@@ -4,85 +4,14 @@ from number_grammar_reverse import wstart, wend  # We reuse helper tokens
 # ^ Make sure to point to whichever file you place your shared definitions in.
 #   Or, if you want a self-contained file, define wstart, wend there as well.
 
-# change Pyparsing's default whitespace handling
-pp.ParserElement.setDefaultWhitespaceChars("\t\n")
-
 ###############################################################################
 # 1) Reverse dictionary: from abbreviation -> full spelled-out form(s)
 #
 #    Since your original "abbrevdict" mapped spelled-out to abbreviations,
 #    we now want to map the abbreviations back to spelled-out.
 ###############################################################################
-abbrevdict_forward = {
-    "blant annet": "bl.a.",
-    "blant anna": "bl.a.",
-    "cirka": "ca.",
-    "sirka": "ca.",
-    "centimeter": "cm",
-    "det vil si": "dvs.",
-    "et cetera": "etc.",
-    "for eksempel": "f.eks.",
-    "fylkesvei": "fv.",
-    "kilobyte": "kB",
-    "kilometer i timen": "km/t",
-    "kilowattimer": "kWh",
-    "klokka": "kl.",
-    "klokken": "kl.",
-    "mellom anna": "m.a.",
-    "megabyte": "MB",
-    "millimeter": "mm",
-    "og liknende": "o.l.",
-    "parts per million": "p.p.m",
-    "riksvei": "rv.",
-    "til dømes": "t.d.",
-    "terrawattimer": "TWh",
-    "jamfør": "jf.",
-    "det vil seie": "dvs.",
-    "fylkesveg": "fv.",
-    "jevnfør": "jf.",
-    "kilowattimar": "kWh",
-    "og lignende": "o.l.",
-    "og liknande": "o.l.",
-    "riksveg": "rv.",
-    "terawattimar": "TWh",
-    "terawattimer": "TWh",
-    "dekar": "daa",
-    "desibel": "dB",
-    "elektronisk post": "e-post",
-    "desiliter": "dl",
-    "desimeter": "dm",
-    "eller liknende": "e.l.",
-    "eller lignende": "e.l.",
-    "eller liknande": "e.l.",
-    "fra og med": "f.o.m.",
-    "gigabyte": "GB",
-    "gigawatt": "GW",
-    "kilobit": "kb",
-    "kilo": "kg",
-    "kilogram": "kg",
-    "kilometer": "km",
-    "kilovolt": "kV",
-    "kvadratmeter": "kvm",
-    "kilowatt": "kW",
-    "megabit": "Mb",
-    "milliliter": "ml",
-    "millivolt": "mV",
-    "megavolt": "MV",
-    "milliwatt": "mW",
-    "megawatt": "MW",
-    "og så bortetter": "osb.",
-    "og så vidare": "osv.",
-    "og så videre": "osv.",
-    "på grunn av": "pga.",
-    "petabyte": "PB",
-    "petawatt": "PW",
-    "terabyte": "TB",
-    "terrabyte": "TB",
-    "til og med": "t.o.m.",
-    "terawatt": "TW",
-    "terrawatt": "TW",
-    "til eksempel": "t.eks.",
-}
+# The spelled-out forms live in the lexicon, shared with the variant profiles
+from lexicon import abbrevdict_forward, current_lexicon
 
 # Inverse dictionary: abbreviation -> (preferred) spelled-out
 # Because multiple keys map to the same abbreviation, we must pick one
@@ -103,11 +32,8 @@ abbrev_keys = list(abbrevdict_reverse.keys())  # e.g. ["bl.a.", "ca.", ...]
 abbrev_match = oneOf(abbrev_keys)
 
 def expand_abbrev(t):
-    """Given a token (like 'bl.a.'), return one or all possible expansions."""
-    token = t[0]
-    expansions = abbrevdict_reverse[token]  # possibly multiple
-    # For "production-ready," decide how to pick expansions. We'll pick the first:
-    return expansions[0]
+    """Given a token (like 'bl.a.'), return the expansion of the active lexicon profile."""
+    return current_lexicon().abbreviations[t[0]]
 
 simpleabbrev_reverse = abbrev_match.setParseAction(lambda t: (t[0], expand_abbrev(t)))
 
@@ -118,9 +44,12 @@ simpleabbrev_reverse = abbrev_match.setParseAction(lambda t: (t[0], expand_abbre
 abbrevgrammar_reverse = (
     wstart
     + simpleabbrev_reverse
-    + wend.setParseAction(lambda s, l, t: l)
+    + wend
 )
 
+# Module metadata
+__version__ = '2.1.0'
+
 if __name__ == "__main__":
     test_sent = "Hun jobbet ca. tre år i bedriften osv. før hun sluttet."
     # searchString will find all matches
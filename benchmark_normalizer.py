@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Concurrency Stress Benchmark for Normalizer
+
+Shares one Normalizer (and, in the mixed run, one per profile) between the
+threads of a ThreadPoolExecutor, checks that every result is identical to
+the single-threaded result, and reports throughput per thread count.
+
+On a regular CPython build the GIL serializes the grammar, so throughput
+stays flat as threads are added; the run is then mainly a correctness
+stress test. On a free-threaded build (python3.13t and later, with the GIL
+disabled) it shows how far normalization scales across cores.
+
+Usage:
+    python benchmark_normalizer.py                       # 1, 2, 4 and 8 threads
+    python benchmark_normalizer.py --threads 1 16 --repeat 5
+    python benchmark_normalizer.py --input sentences.txt # one text per line
+"""
+
+import argparse
+import random
+import sys
+import sysconfig
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from normalizer import Normalizer
+
+# Sentence templates for the generated workload
+_TEMPLATES = (
+    "Møtet starter kl. {hour}:{minute:02d} den {day}. {month} {year}.",
+    "Rapporten fra {year} viser ca. {low}-{high} prosent økning, dvs. {percent}%.",
+    "Hun var i {decade}-årene og hadde bodd der siden {day}.{month_number}.{year}.",
+    "Prisen steg til {big} kroner, bl.a. på grunn av {low} nye avtaler.",
+    "Toget går {day}/{month_number}/{year} fra spor {low} f.eks. ved {hour}.{minute:02d}-tiden.",
+    "Det var en vanlig dag, og ingen av dem hadde tenkt på det før.",
+)
+_MONTHS = ("januar", "februar", "mars", "april", "mai", "juni", "juli",
+           "august", "september", "oktober", "november", "desember")
+
+
+def generate_texts(count, seed=0):
+    """Return `count` generated sentences with times, dates, numbers and abbreviations."""
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        month_number = rng.randint(1, 12)
+        low = rng.randint(1, 50)
+        texts.append(rng.choice(_TEMPLATES).format(
+            hour=rng.randint(0, 23), minute=rng.randint(0, 59),
+            day=rng.randint(1, 28), month=_MONTHS[month_number - 1],
+            month_number=month_number, year=rng.randint(1950, 2030),
+            low=low, high=low + rng.randint(1, 50), percent=rng.randint(1, 99),
+            decade=rng.choice((20, 30, 40, 50, 60)), big=rng.randint(10**6, 10**10),
+        ))
+    return texts
+
+
+def gil_status():
+    """Describe the interpreter build and whether the GIL is active."""
+    free_threaded = bool(sysconfig.get_config_var("Py_GIL_DISABLED"))
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    gil_enabled = True if is_gil_enabled is None else is_gil_enabled()
+    build = "free-threaded" if free_threaded else "default"
+    return f"Python {sys.version.split()[0]} ({build} build, GIL {'enabled' if gil_enabled else 'disabled'})"
+
+
+def run(jobs, threads):
+    """
+    Normalize (normalizer, text) jobs on a thread pool.
+
+    Returns:
+        (list of results in job order, seconds)
+    """
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(lambda job: job[0](job[1]), jobs))
+    return results, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stress and benchmark a shared Normalizer across threads.")
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8], help="thread counts to run")
+    parser.add_argument('--texts', type=int, default=2000, help="number of generated texts")
+    parser.add_argument('--repeat', type=int, default=3, help="passes over the texts per run")
+    parser.add_argument('--input', help="read texts from this file (one per line) instead")
+    parser.add_argument('--profile', default=None, help="lexicon profile of the shared normalizer")
+    args = parser.parse_args(argv)
+
+    if args.input:
+        with open(args.input, encoding='utf-8') as f:
+            texts = [line.rstrip("\n") for line in f if line.strip()]
+    else:
+        texts = generate_texts(args.texts)
+
+    print(gil_status())
+    normalizer = Normalizer(profile=args.profile)
+    expected = [normalizer(text) for text in texts] * args.repeat
+    jobs = [(normalizer, text) for text in texts] * args.repeat
+
+    # A second normalizer with another profile, interleaved with the first
+    other = Normalizer(profile='nynorsk' if normalizer.profile != 'nynorsk' else 'bokmal')
+    mixed_jobs = [job for text in texts for job in ((normalizer, text), (other, text))] * args.repeat
+    mixed_expected = [
+        result for text in texts for result in (normalizer(text), other(text))
+    ] * args.repeat
+
+    print(f"{len(jobs)} texts per run, profile {normalizer.profile!r}\n")
+    print(f"  {'threads':>7}  {'texts/s':>10}  {'speedup':>7}  {'mixed texts/s':>13}  status")
+    failures = 0
+    baseline = None
+    for threads in args.threads:
+        results, seconds = run(jobs, threads)
+        mixed_results, mixed_seconds = run(mixed_jobs, threads)
+        mismatches = sum(a != b for a, b in zip(results, expected))
+        mismatches += sum(a != b for a, b in zip(mixed_results, mixed_expected))
+        failures += mismatches
+
+        rate = len(jobs) / seconds
+        baseline = baseline or rate
+        status = "ok" if not mismatches else f"{mismatches} MISMATCHES"
+        print(f"  {threads:>7}  {rate:>10.0f}  {rate / baseline:>6.2f}x  "
+              f"{len(mixed_jobs) / mixed_seconds:>13.0f}  {status}")
+
+    if failures:
+        print(f"\n{failures} results differed from the single-threaded output.")
+        return 1
+    print("\nAll results matched the single-threaded output.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Worker Pool Benchmark: Start-up Time and Memory per Worker
+
+Starts a NormalizerPool with each start method in a fresh interpreter and
+reports how long the pool takes until its workers have normalized their
+first sentences, and how much memory each worker holds on its own: USS
+(pages private to the worker) and PSS (private pages plus its share of the
+pages shared with the other processes).
+
+'spawn' builds the grammar in every worker, so it shows the cost the
+preloading strategies ('forkserver' and 'fork') avoid. Memory is read from
+/proc/<pid>/smaps_rollup and is only reported on Linux.
+
+Usage:
+    python benchmark_pool.py                  # os.cpu_count() workers
+    python benchmark_pool.py --workers 64 --runs 3
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from worker_pool import START_METHODS
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Run in each fresh interpreter; prints the measurements as JSON
+_WORKER = """
+import json, multiprocessing, sys, time
+
+def smaps(pid):
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == "kB":
+                    fields[parts[0].rstrip(":")] = int(parts[1])
+    except OSError:
+        return None
+    return {"uss": fields["Private_Clean"] + fields["Private_Dirty"], "pss": fields["Pss"]}
+
+if __name__ == "__main__":
+    from worker_pool import NormalizerPool
+    workers, start_method = int(sys.argv[1]), sys.argv[2]
+    texts = ["Møte kl. 15:30 den 3. juni 2023, ca. 50% av 1 000 deltakere."] * (workers * 4)
+    start = time.perf_counter()
+    with NormalizerPool(workers, start_method) as pool:
+        pool.map(len, texts, chunksize=1)
+        started = time.perf_counter()
+        pool.normalize_many(texts, chunksize=1)
+        ready = time.perf_counter()
+        memory = [smaps(child.pid) for child in multiprocessing.active_children()]
+    memory = [m for m in memory if m]
+    print(json.dumps({
+        "started": started - start,
+        "ready": ready - start,
+        "uss": sum(m["uss"] for m in memory) / len(memory) if memory else None,
+        "pss": sum(m["pss"] for m in memory) / len(memory) if memory else None,
+    }))
+"""
+
+
+def run_pool(workers, start_method):
+    """Start one interpreter running a pool; return its measurements."""
+    output = subprocess.run(
+        [sys.executable, "-c", _WORKER, str(workers), start_method], cwd=_HERE,
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def measure(workers, start_method, runs):
+    """Median measurements over `runs` fresh interpreters."""
+    samples = [run_pool(workers, start_method) for _ in range(runs)]
+    return {
+        key: statistics.median(sample[key] for sample in samples) if samples[0][key] is not None else None
+        for key in samples[0]
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare pool start-up time and memory per worker.")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="workers per pool")
+    parser.add_argument('--runs', type=int, default=3, help="pools started per start method")
+    parser.add_argument('--start-methods', nargs='+', choices=START_METHODS,
+                        default=['spawn', 'forkserver', 'fork'], help="start methods to compare")
+    args = parser.parse_args(argv)
+
+    print(f"{args.workers} workers, median of {args.runs} runs\n")
+    print(f"  {'start method':<12} {'started (ms)':>12} {'ready (ms)':>11} "
+          f"{'USS/worker (MB)':>16} {'PSS/worker (MB)':>16}")
+    for start_method in args.start_methods:
+        result = measure(args.workers, start_method, args.runs)
+        if result['uss'] is None:
+            memory = f"{'n/a':>16} {'n/a':>16}"
+        else:
+            memory = f"{result['uss'] / 1024:>16.1f} {result['pss'] / 1024:>16.1f}"
+        print(f"  {start_method:<12} {result['started'] * 1000:>12.0f} "
+              f"{result['ready'] * 1000:>11.0f} {memory}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
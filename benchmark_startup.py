@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark: Snapshot vs. Full Construction
+
+Starts fresh interpreters that import the normalizer, compute the grammar
+fingerprint and normalize one sentence, as a new worker process does, and
+compares the time with the startup snapshot disabled (every table built on
+import) and with a current snapshot (tables loaded with a single read).
+
+Usage:
+    python benchmark_startup.py            # 10 runs per mode
+    python benchmark_startup.py --runs 30
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from snapshot import SNAPSHOT_ENV
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Run in each fresh interpreter; prints the timings as JSON
+_WORKER = """
+import json, time
+start = time.perf_counter()
+import pyparsing
+after_pyparsing = time.perf_counter()
+from grammar import grammar_fingerprint, normalize_text
+after_import = time.perf_counter()
+grammar_fingerprint()
+normalize_text("Møte kl. 15:30 den 3. juni 2023")
+end = time.perf_counter()
+print(json.dumps({
+    "pyparsing": after_pyparsing - start,
+    "grammar": after_import - after_pyparsing,
+    "ready": end - start,
+}))
+"""
+
+
+def run_worker(snapshot_setting):
+    """Start one interpreter with the given NORMALIZER_SNAPSHOT value; return its timings."""
+    env = dict(os.environ, **{SNAPSHOT_ENV: snapshot_setting})
+    output = subprocess.run(
+        [sys.executable, "-c", _WORKER], cwd=_HERE, env=env,
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def measure(snapshot_setting, runs):
+    """Median timings over `runs` fresh interpreters."""
+    samples = [run_worker(snapshot_setting) for _ in range(runs)]
+    return {key: statistics.median(sample[key] for sample in samples) for key in samples[0]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare worker startup with and without the snapshot.")
+    parser.add_argument('--runs', type=int, default=10, help="interpreters started per mode")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'snapshot.pickle')
+        run_worker(path)  # builds the snapshot
+        results = {
+            'no snapshot': measure('off', args.runs),
+            'snapshot': measure(path, args.runs),
+        }
+
+    print(f"Median of {args.runs} fresh interpreters (milliseconds):\n")
+    print(f"  {'mode':<12} {'pyparsing':>10} {'grammar':>10} {'ready':>10}")
+    for mode, timings in results.items():
+        print(f"  {mode:<12} {timings['pyparsing'] * 1000:>10.1f} "
+              f"{timings['grammar'] * 1000:>10.1f} {timings['ready'] * 1000:>10.1f}")
+
+    saved = results['no snapshot']['grammar'] - results['snapshot']['grammar']
+    print(f"\nGrammar import is {saved * 1000:.1f} ms faster with the snapshot.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+DataFrame Column Normalization for Norwegian Text Normalizer
+
+Normalizing a text column with Series.apply(normalize) normalizes every row,
+including all the repeats of the same sentence that TTS datasets are full
+of. normalize_column() factorizes the column instead: each distinct value is
+normalized once (optionally on a NormalizerPool) and the results are mapped
+back onto the rows.
+
+Supported columns:
+- pandas Series (object, string or category dtype); returns a Series with
+  the same index, name and dtype. For a categorical, only its categories
+  are normalized; categories that normalize to the same text are merged
+- pyarrow Array or ChunkedArray of (large) strings; returns the same kind
+
+Missing values (None, NaN, pd.NA, Arrow nulls) stay missing. Values that are
+not strings are copied through unchanged.
+
+pandas and pyarrow are optional dependencies and are only imported for a
+column of their own type:
+
+    from columns import normalize_column
+
+    df['spoken'] = normalize_column(df['text'])
+    df['spoken'] = normalize_column(df['text'], workers=8)
+"""
+
+import os
+
+from normalize import normalize
+
+
+def _normalize_values(values, profile, workers, pool):
+    """Normalize a list of distinct values, on a pool if asked to."""
+    if pool is not None:
+        return pool.normalize_many(values, profile=profile)
+    if workers is None or workers == 1 or len(values) < 2:
+        return [normalize(value, profile=profile) for value in values]
+    from worker_pool import NormalizerPool
+
+    with NormalizerPool(min(workers or os.cpu_count() or 1, len(values))) as pool:
+        return pool.normalize_many(values, profile=profile)
+
+
+def _normalize_categorical(series, profile, workers, pool):
+    import numpy as np
+    import pandas as pd
+
+    categories = series.cat.categories
+    normalized = _normalize_values(list(categories), profile, workers, pool)
+    # Different categories can normalize to the same text ("kl." and
+    # "klokka"); those are merged, so the new categories stay unique
+    new_categories = pd.unique(pd.Series(normalized, dtype=object))
+    position = {value: index for index, value in enumerate(new_categories)}
+    remap = np.array([position[value] for value in normalized] + [-1], dtype=series.cat.codes.dtype)
+    codes = remap[series.cat.codes.to_numpy()]
+    result = pd.Categorical.from_codes(codes, categories=new_categories, ordered=series.cat.ordered)
+    return pd.Series(result, index=series.index, name=series.name)
+
+
+def _normalize_series(series, profile, workers, pool):
+    import numpy as np
+    import pandas as pd
+
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return _normalize_categorical(series, profile, workers, pool)
+    codes, uniques = series.factorize()
+    normalized = _normalize_values(list(uniques), profile, workers, pool)
+    # One extra slot for the missing-value code (-1); those rows keep their value
+    values = np.empty(len(normalized) + 1, dtype=object)
+    values[:len(normalized)] = normalized
+    return series.where(codes < 0, values[codes])
+
+
+def _normalize_arrow(array, profile, workers, pool):
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    if not (pa.types.is_string(array.type) or pa.types.is_large_string(array.type)):
+        raise TypeError(f"normalize_column() needs a string column, got Arrow type {array.type}")
+    uniques = pc.unique(array).drop_null()
+    indices = pc.index_in(array, value_set=uniques)
+    normalized = _normalize_values(uniques.to_pylist(), profile, workers, pool)
+    return pc.take(pa.array(normalized, type=array.type), indices)
+
+
+def normalize_column(column, workers=None, profile=None, pool=None):
+    """
+    Normalize a text column, normalizing each distinct value only once.
+
+    Args:
+        column: pandas Series, or pyarrow Array / ChunkedArray of strings
+        workers (int): Worker processes for the distinct values (default:
+            normalize in this process; 0: one per CPU)
+        profile (str): Lexicon variant profile (see lexicon.py)
+        pool (NormalizerPool): Existing pool to normalize on; overrides workers
+
+    Returns:
+        A column of the same type, with normalized text and missing values kept
+
+    Raises:
+        TypeError: For any other column type
+    """
+    package = type(column).__module__.split('.')[0]
+    if package == 'pandas':
+        return _normalize_series(column, profile, workers, pool)
+    if package == 'pyarrow':
+        return _normalize_arrow(column, profile, workers, pool)
+    raise TypeError(
+        f"normalize_column() needs a pandas Series or a pyarrow (Chunked)Array, "
+        f"got {type(column).__name__}"
+    )
+
+
+__all__ = ['normalize_column']
@@ -10,152 +10,271 @@ Usage:
     python create_normalized_dataset.py
 
 This will create a new file 'tts_dataset_normalized.txt' with all text normalized.
+
+Other formats (JSONL, CSV, TSV, Parquet) and columns can be selected:
+    python create_normalized_dataset.py -i data.jsonl -o out.jsonl --text-column sentence
+    python create_normalized_dataset.py -i data.csv --output-format parquet
+
+Use --store (or set TTS_NORMALIZER_STORE) to keep normalized sentences in a
+persistent store; later runs then only normalize sentences not seen before.
+
+Use --workers to normalize on several processes; the workers share one
+preloaded grammar (see worker_pool.py), and with --shared-cache a cache of
+normalized sentences (see shared_cache.py).
 """
 
+import argparse
 import sys
 import os
+from functools import partial
 from normalize import normalize as integrated_normalize
-
-def load_original_dataset(filepath):
-    """Load the original TTS dataset."""
-    samples = []
-
-    if not os.path.exists(filepath):
-        print(f"Error: Dataset file '{filepath}' not found!")
-        return samples
-
-    print(f"Loading original dataset from {filepath}...")
-
-    with open(filepath, 'r', encoding='utf-8') as f:
-        for line_num, line in enumerate(f, 1):
-            line = line.strip()
-            if line and '|' in line:
-                parts = line.split('|')
-                if len(parts) >= 2:
-                    filename = parts[0]
-                    text = parts[1]
-                    speaker_id = parts[2] if len(parts) > 2 else "1"
-
-                    samples.append({
-                        'line_num': line_num,
-                        'filename': filename,
-                        'text': text,
-                        'speaker_id': speaker_id
-                    })
-
-    print(f"Loaded {len(samples)} samples from original dataset")
-    return samples
-
-def normalize_text(text):
-    """Normalize text using the integrated normalizer."""
+from dataset_io import (
+    READERS,
+    DEFAULT_BATCH_SIZE,
+    detect_format,
+    read_batches,
+    open_writer,
+)
+from result_store import FailedNormalization, NormalizationStore
+from worker_pool import NormalizerPool
+from shared_cache import SharedCached, SharedResultCache
+from lexicon import DEFAULT_PROFILE, PROFILES
+from grammar import grammar_fingerprint
+
+def normalize_text(text, deadline=None, profile=None):
+    """Normalize text using the integrated normalizer (optionally within a time budget)."""
     try:
-        return integrated_normalize(text)
+        return integrated_normalize(text, deadline=deadline, profile=profile)
     except Exception as e:
-        # If normalization fails, return original text
+        # If normalization fails, return original text, marked so that it is
+        # not stored as a result
         print(f"Warning: Normalization failed for text: {text[:50]}... Error: {e}")
-        return text
-
-def create_normalized_dataset(samples, output_filepath):
-    """Create the normalized dataset file."""
-    print(f"Creating normalized dataset: {output_filepath}")
-
-    normalized_count = 0
-    unchanged_count = 0
-
-    with open(output_filepath, 'w', encoding='utf-8') as f:
-        for sample in samples:
-            original_text = sample['text']
-            normalized_text = normalize_text(original_text)
-
-            # Write in the same format: filename|text|speaker_id
-            line = f"{sample['filename']}|{normalized_text}|{sample['speaker_id']}"
-            f.write(line + '\n')
-
-            # Track changes
-            if original_text != normalized_text:
-                normalized_count += 1
+        return FailedNormalization(text)
+
+def normalize_dataset(input_file, output_file, input_format=None, output_format=None,
+                      text_column='text', output_column=None, store=None,
+                      batch_size=DEFAULT_BATCH_SIZE, num_examples=10, deadline=None,
+                      profile=None, pool=None):
+    """
+    Stream a dataset of any supported format through the normalizer.
+
+    The input is read and written in columnar batches of `batch_size` rows.
+    Each distinct text in a batch is normalized once (through `store` when
+    given). Values in the text column that are not strings are copied through.
+
+    Args:
+        input_file (str): Dataset to read
+        output_file (str): Dataset to write
+        input_format (str): Input format, detected from the extension if None
+        output_format (str): Output format, detected from the extension of
+            output_file, else the input format
+        text_column (str): Column holding the text to normalize
+        output_column (str): Column for the result (defaults to text_column)
+        store: Optional NormalizationStore
+        batch_size (int): Rows per batch
+        num_examples (int): Number of changed rows to keep as examples
+        deadline (float): Optional per-text time budget in seconds; texts that
+            run out of budget are degraded and counted in stats['degraded'];
+            texts that fail to normalize are copied through and counted in
+            stats['failed']
+        profile (str): Lexicon variant profile (see lexicon.py); the store
+            should be opened with the same profile
+        pool: Optional NormalizerPool to normalize each batch on; with a
+            shared cache, sentences repeated across batches are served from it
+
+    Returns:
+        dict: Counts, text lengths and examples for reporting
+    """
+    input_format = input_format or detect_format(input_file)
+    output_format = output_format or detect_format(output_file, default=input_format)
+    output_column = output_column or text_column
+
+    stats = {
+        'total': 0,
+        'normalized': 0,
+        'unchanged': 0,
+        'original_length': 0,
+        'normalized_length': 0,
+        'degraded': 0,
+        'failed': 0,
+        'examples': [],
+    }
+    normalize_fn = partial(normalize_text, deadline=deadline, profile=profile)
+    map_fn = map
+    if pool is not None:
+        map_fn = pool.map
+        if pool.shared_cache is not None:
+            normalize_fn = SharedCached(normalize_fn, profile)
+
+    with open_writer(output_file, output_format) as writer:
+        for batch in read_batches(input_file, input_format, batch_size):
+            if text_column not in batch:
+                raise ValueError(
+                    f"Text column {text_column!r} not found (columns: {', '.join(batch)})"
+                )
+            texts = batch[text_column]
+            unique = list(dict.fromkeys(text for text in texts if isinstance(text, str)))
+            if store is not None:
+                known = store.normalize_many(unique, normalize_fn, map_fn)
             else:
-                unchanged_count += 1
-
-    return normalized_count, unchanged_count
-
-def show_normalization_examples(samples, num_examples=10):
-    """Show examples of normalization changes."""
-    print(f"\nNormalization Examples (showing first {num_examples}):")
-    print("=" * 80)
-
-    examples_shown = 0
-    for sample in samples:
-        original = sample['text']
-        normalized = normalize_text(original)
-
-        if original != normalized and examples_shown < num_examples:
-            print(f"\nExample {examples_shown + 1}:")
-            print(f"  Line:     {sample['line_num']}")
-            print(f"  File:     {sample['filename']}")
-            print(f"  Original: {original}")
-            print(f"  Normalized: {normalized}")
-            examples_shown += 1
-
-    print("\n" + "=" * 80)
-
-def generate_statistics(samples, normalized_count, unchanged_count):
-    """Generate statistics about the normalization process."""
-    total_samples = len(samples)
-
-    print(f"\nNormalization Statistics:")
-    print(f"  Total samples processed:     {total_samples}")
-    print(f"  Samples with changes:       {normalized_count} ({normalized_count/total_samples*100:.1f}%)")
-    print(f"  Samples unchanged:         {unchanged_count} ({unchanged_count/total_samples*100:.1f}%)")
-
-    # Calculate text length changes
-    original_total_length = sum(len(sample['text']) for sample in samples)
-    normalized_total_length = sum(len(normalize_text(sample['text'])) for sample in samples)
-
-    if original_total_length > 0:
-        length_ratio = normalized_total_length / original_total_length
-        print(f"  Original text length:        {original_total_length:,} characters")
-    print(f"  Normalized text length:      {normalized_total_length:,} characters")
-    if original_total_length > 0:
-        print(f"  Length expansion ratio:       {length_ratio:.2f}x")
-
-def main():
+                known = dict(zip(unique, map_fn(normalize_fn, unique)))
+
+            normalized = [known[text] if isinstance(text, str) else text for text in texts]
+
+            for original, new in zip(texts, normalized):
+                stats['total'] += 1
+                if original != new:
+                    stats['normalized'] += 1
+                    if len(stats['examples']) < num_examples:
+                        stats['examples'].append((stats['total'], original, new))
+                else:
+                    stats['unchanged'] += 1
+                if isinstance(original, str):
+                    stats['original_length'] += len(original)
+                    stats['normalized_length'] += len(new)
+                if getattr(new, 'degraded', False):
+                    stats['degraded'] += 1
+                if getattr(new, 'failed', False):
+                    stats['failed'] += 1
+
+            batch[output_column] = normalized
+            writer.write_batch(batch)
+
+    return stats
+
+def default_output_file(input_file):
+    """'tts_dataset.txt' -> 'tts_dataset_normalized.txt'"""
+    stem, ext = os.path.splitext(input_file)
+    return f"{stem}_normalized{ext}"
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Normalize the text column of a TTS dataset into spoken Norwegian."
+    )
+    parser.add_argument('-i', '--input', default='tts_dataset.txt',
+                        help="input dataset (default: tts_dataset.txt)")
+    parser.add_argument('-o', '--output',
+                        help="output dataset (default: <input>_normalized.<ext>)")
+    parser.add_argument('-f', '--format', choices=sorted(READERS),
+                        help="input format (default: detected from the extension)")
+    parser.add_argument('--output-format', choices=sorted(READERS),
+                        help="output format (default: detected, else same as the input)")
+    parser.add_argument('--text-column', default='text',
+                        help="column to normalize (default: text)")
+    parser.add_argument('--output-column',
+                        help="column for the normalized text (default: replace the text column)")
+    parser.add_argument('--store', default=os.environ.get('TTS_NORMALIZER_STORE'),
+                        help="persistent result store file (default: $TTS_NORMALIZER_STORE)")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"rows per read/write batch (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument('--deadline', type=float,
+                        help="time budget per text in seconds; the rest of a text that runs "
+                             "over only gets numbers spelled out")
+    parser.add_argument('--profile', choices=sorted(PROFILES), default=DEFAULT_PROFILE,
+                        help=f"lexicon variant profile (default: {DEFAULT_PROFILE})")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="worker processes to normalize on (0: one per CPU; default: 1)")
+    parser.add_argument('--shared-cache', type=int, metavar='MB',
+                        help="size of a result cache shared by the workers, in MiB")
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """Main function to create normalized TTS dataset."""
+    args = parse_args(argv)
+
     print("TTS Dataset Normalizer")
     print("=" * 50)
 
     # File paths
-    input_file = 'tts_dataset.txt'
-    output_file = 'tts_dataset_normalized.txt'
-
-    # Load original dataset
-    samples = load_original_dataset(input_file)
-    if not samples:
-        print("No samples loaded. Exiting.")
-        return
-
-    # Show some examples before processing
-    print(f"\nPreview: Processing {len(samples)} samples...")
-
-    # Create normalized dataset
-    normalized_count, unchanged_count = create_normalized_dataset(samples, output_file)
+    input_file = args.input
+    output_file = args.output or default_output_file(input_file)
+
+    if not os.path.exists(input_file):
+        print(f"Error: Dataset file '{input_file}' not found!")
+        return 1
+
+    print(f"Normalizing {input_file} -> {output_file}")
+
+    options = dict(
+        input_format=args.format,
+        output_format=args.output_format,
+        text_column=args.text_column,
+        output_column=args.output_column,
+        batch_size=args.batch_size,
+        deadline=args.deadline,
+        profile=args.profile,
+    )
+    pool = None
+    shared_cache = None
+    try:
+        if args.shared_cache:
+            if args.workers == 1:
+                raise ValueError("--shared-cache needs --workers")
+            shared_cache = SharedResultCache(args.shared_cache * 2**20)
+        if args.workers != 1:
+            pool = NormalizerPool(args.workers or None, shared_cache=shared_cache)
+            print(f"Normalizing on {pool.workers} worker processes ({pool.start_method})")
+        if args.store:
+            with NormalizationStore(args.store, profile=args.profile) as store:
+                if store.invalidated:
+                    print(f"Result store: dropped {store.invalidated} results from an older grammar")
+                stats = normalize_dataset(input_file, output_file, store=store, pool=pool, **options)
+                print(f"Result store: {store.hits} cached, {store.misses} newly normalized")
+        else:
+            stats = normalize_dataset(input_file, output_file, pool=pool, **options)
+    except (ImportError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+    finally:
+        if pool is not None:
+            pool.close()
+        if shared_cache is not None:
+            cache_stats = shared_cache.stats()
+            print(f"Shared cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+                  f"({cache_stats['hit_rate']:.1%} hit rate)")
+            shared_cache.close()
+
+    total = stats['total']
+    if not total:
+        print("No samples loaded.")
+        return 0
 
     # Show examples of changes
-    show_normalization_examples(samples)
+    print(f"\nNormalization Examples (showing first {len(stats['examples'])}):")
+    print("=" * 80)
+    for number, (row, original, normalized) in enumerate(stats['examples'], 1):
+        print(f"\nExample {number}:")
+        print(f"  Row:      {row}")
+        print(f"  Original: {original}")
+        print(f"  Normalized: {normalized}")
+    print("\n" + "=" * 80)
 
-    # Generate statistics
-    generate_statistics(samples, normalized_count, unchanged_count)
+    # Statistics
+    print(f"\nNormalization Statistics:")
+    print(f"  Total samples processed:     {total}")
+    print(f"  Samples with changes:       {stats['normalized']} ({stats['normalized']/total*100:.1f}%)")
+    print(f"  Samples unchanged:         {stats['unchanged']} ({stats['unchanged']/total*100:.1f}%)")
+    print(f"  Original text length:        {stats['original_length']:,} characters")
+    print(f"  Normalized text length:      {stats['normalized_length']:,} characters")
+    if stats['original_length'] > 0:
+        print(f"  Length expansion ratio:       {stats['normalized_length'] / stats['original_length']:.2f}x")
+    if args.deadline is not None:
+        print(f"  Samples over time budget:    {stats['degraded']}")
+    if stats['failed']:
+        print(f"  Samples that failed:         {stats['failed']} (copied unchanged, not stored)")
 
     # Success message
     print(f"\nSuccess!")
     print(f"   Original dataset:  {input_file}")
     print(f"   Normalized dataset: {output_file}")
-    print(f"   Samples processed: {len(samples)}")
-    print(f"   Normalized: {normalized_count}")
-    print(f"   Unchanged: {unchanged_count}")
+    print(f"   Samples processed: {total}")
+    print(f"   Grammar fingerprint: {grammar_fingerprint()}")
+    print(f"   Normalized: {stats['normalized']}")
+    print(f"   Unchanged: {stats['unchanged']}")
 
     print(f"\nYou can now use '{output_file}' with your TTS system!")
     print("   The normalized text will provide better pronunciation for Norwegian text.")
+    return 0
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Dataset I/O for the TTS Dataset Normalizer
+
+Readers and writers for the dataset formats the normalizer understands:
+
+- pipe:    filename|text|speaker_id manifests (memory-mapped, see ManifestReader)
+- jsonl:   one JSON object per line
+- csv/tsv: delimited text with a header row
+- parquet: columnar files (requires the optional pyarrow dependency)
+
+All formats are read and written as columnar batches: dicts mapping a column
+name to a list of values, at most `batch_size` rows each. The text column is
+selected by name, so any column of any format can be normalized.
+
+Pipe manifests are memory-mapped. Line boundaries and `|` fields are located
+on the raw bytes of the mapping, and ManifestReader.records() decodes only the
+text field; the filename and speaker_id fields are handed out as zero-copy
+memoryview slices of the mapping.
+
+Usage:
+    with ManifestReader('tts_dataset.txt') as reader:
+        for record in reader.records():
+            print(record.line_num, record.text)
+
+    with open_writer('out.jsonl') as writer:
+        for batch in read_batches('in.csv'):
+            writer.write_batch(batch)
+"""
+
+import csv
+import json
+import mmap
+import os
+from collections import namedtuple
+
+# A single manifest line. `filename` and `speaker_id` are memoryview slices of
+# the mapping (valid while the reader is open); `text` is the decoded text field.
+ManifestRecord = namedtuple('ManifestRecord', ['line_num', 'filename', 'text', 'speaker_id'])
+
+DEFAULT_SPEAKER_ID = b"1"
+
+_WHITESPACE = b" \t\r\n\x0b\x0c"
+
+
+class ManifestReader:
+    """Read-only, memory-mapped view of a pipe-delimited TTS manifest."""
+
+    def __init__(self, filepath, encoding='utf-8'):
+        self.filepath = filepath
+        self.encoding = encoding
+        self._file = open(filepath, 'rb')
+        self.size = os.fstat(self._file.fileno()).st_size
+        if self.size:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._view = memoryview(self._mmap)
+        else:
+            # mmap cannot map empty files
+            self._mmap = None
+            self._view = memoryview(b"")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """Release the mapping. Slices still held by callers keep it alive."""
+        self._view.release()
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Exported record slices still reference the mapping; it is
+                # unmapped once the last of them is garbage collected.
+                pass
+            self._mmap = None
+        self._file.close()
+
+    def view(self, start=0, end=None):
+        """Return a zero-copy memoryview of bytes [start, end)."""
+        return self._view[start:self.size if end is None else end]
+
+    def records(self):
+        """
+        Yield ManifestRecord for every valid line of the manifest.
+
+        A line is valid when, after stripping surrounding whitespace, it
+        contains at least one `|`. Field 0 is the filename, field 1 the text
+        and field 2 (if present) the speaker id, which defaults to "1".
+        """
+        if self._mmap is None:
+            return
+        mm = self._mmap
+        view = self._view
+        encoding = self.encoding
+        end = self.size
+
+        pos = 0
+        line_num = 1
+        while pos < end:
+            line_end = mm.find(b"\n", pos, end)
+            if line_end == -1:
+                line_end = end
+            next_pos = line_end + 1
+
+            # Strip surrounding whitespace by moving the offsets, not by copying
+            lo, hi = pos, line_end
+            while lo < hi and mm[lo] in _WHITESPACE:
+                lo += 1
+            while hi > lo and mm[hi - 1] in _WHITESPACE:
+                hi -= 1
+
+            sep1 = mm.find(b"|", lo, hi)
+            if sep1 != -1:
+                sep2 = mm.find(b"|", sep1 + 1, hi)
+                text_end = hi if sep2 == -1 else sep2
+                if sep2 == -1:
+                    speaker_id = memoryview(DEFAULT_SPEAKER_ID)
+                else:
+                    sep3 = mm.find(b"|", sep2 + 1, hi)
+                    speaker_id = view[sep2 + 1:hi if sep3 == -1 else sep3]
+                yield ManifestRecord(
+                    line_num,
+                    view[lo:sep1],
+                    str(view[sep1 + 1:text_end], encoding),
+                    speaker_id,
+                )
+
+            pos = next_pos
+            line_num += 1
+
+
+###############################################################################
+# Columnar batch readers and writers
+###############################################################################
+
+DEFAULT_BATCH_SIZE = 10_000
+# Buffer size for text readers and writers
+BUFFER_SIZE = 1024 * 1024
+
+PIPE_COLUMNS = ('filename', 'text', 'speaker_id')
+
+FORMAT_EXTENSIONS = {
+    '.txt': 'pipe',
+    '.psv': 'pipe',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+    '.csv': 'csv',
+    '.tsv': 'tsv',
+    '.parquet': 'parquet',
+}
+
+
+def detect_format(filepath, default='pipe'):
+    """Guess the dataset format from the file extension."""
+    return FORMAT_EXTENSIONS.get(os.path.splitext(filepath)[1].lower(), default)
+
+
+def _rows_to_batches(rows, columns, batch_size):
+    """Group an iterator of row tuples into columnar batches."""
+    batch = [[] for _ in columns]
+    for row in rows:
+        for values, value in zip(batch, row):
+            values.append(value)
+        if len(batch[0]) >= batch_size:
+            yield dict(zip(columns, batch))
+            batch = [[] for _ in columns]
+    if batch[0]:
+        yield dict(zip(columns, batch))
+
+
+def read_pipe(filepath, batch_size=DEFAULT_BATCH_SIZE, encoding='utf-8'):
+    """Read a filename|text|speaker_id manifest."""
+    with ManifestReader(filepath, encoding=encoding) as reader:
+        rows = (
+            (str(record.filename, encoding), record.text, str(record.speaker_id, encoding))
+            for record in reader.records()
+        )
+        yield from _rows_to_batches(rows, PIPE_COLUMNS, batch_size)
+
+
+def read_jsonl(filepath, batch_size=DEFAULT_BATCH_SIZE, encoding='utf-8'):
+    """
+    Read JSON Lines.
+
+    The columns are the keys of all objects, in order of first appearance,
+    so every batch has the same columns; a key missing from an object is
+    None. The file is read twice: once for the keys, once for the rows.
+    """
+    with open(filepath, 'r', encoding=encoding, buffering=BUFFER_SIZE) as f:
+        columns = {}
+        for obj in _json_objects(f, filepath):
+            columns.update(dict.fromkeys(obj))
+        if not columns:
+            return
+        columns = tuple(columns)
+        f.seek(0)
+        rows = (tuple(obj.get(column) for column in columns) for obj in _json_objects(f, filepath))
+        yield from _rows_to_batches(rows, columns, batch_size)
+
+
+def _json_objects(f, filepath):
+    """Yield the object on each non-blank line; ValueError for any other JSON value."""
+    for line_num, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        obj = json.loads(line)
+        if not isinstance(obj, dict):
+            raise ValueError(f"{filepath}, line {line_num}: expected a JSON object, got {type(obj).__name__}")
+        yield obj
+
+
+def _read_delimited(filepath, delimiter, batch_size, encoding):
+    with open(filepath, 'r', encoding=encoding, newline='', buffering=BUFFER_SIZE) as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        columns = tuple(next(reader, ()))
+        if not columns:
+            return
+        yield from _rows_to_batches(_header_width_rows(reader, len(columns), filepath), columns, batch_size)
+
+
+def _header_width_rows(reader, width, filepath):
+    """
+    Yield the rows of a csv.reader padded to the header width with None.
+
+    Blank lines are skipped. A row with more fields than the header raises
+    ValueError rather than losing fields.
+    """
+    for row in reader:
+        if not row:
+            continue
+        if len(row) > width:
+            raise ValueError(
+                f"{filepath}, line {reader.line_num}: {len(row)} fields, but the header has {width}"
+            )
+        if len(row) < width:
+            row += [None] * (width - len(row))
+        yield row
+
+
+def read_csv(filepath, batch_size=DEFAULT_BATCH_SIZE, encoding='utf-8'):
+    """
+    Read comma-separated values with a header row.
+
+    Short rows are padded with None; longer rows raise ValueError.
+    """
+    return _read_delimited(filepath, ',', batch_size, encoding)
+
+
+def read_tsv(filepath, batch_size=DEFAULT_BATCH_SIZE, encoding='utf-8'):
+    """Read tab-separated values with a header row (see read_csv())."""
+    return _read_delimited(filepath, '\t', batch_size, encoding)
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("The parquet format requires pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+def read_parquet(filepath, batch_size=DEFAULT_BATCH_SIZE, encoding='utf-8'):
+    """Read a Parquet file one row group slice at a time."""
+    pa = _import_pyarrow()
+    parquet_file = pa.parquet.ParquetFile(filepath)
+    for record_batch in parquet_file.iter_batches(batch_size=batch_size):
+        yield record_batch.to_pydict()
+
+
+class _TextWriter:
+    """Base class for buffered text writers; subclasses implement write_batch."""
+
+    def __init__(self, filepath, encoding='utf-8'):
+        self._file = open(filepath, 'w', encoding=encoding, newline='', buffering=BUFFER_SIZE)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self._file.close()
+
+
+class PipeWriter(_TextWriter):
+    """Write batches as `|`-joined lines in column order; None is written as an empty field."""
+
+    def write_batch(self, batch):
+        self._file.writelines(
+            "|".join("" if value is None else str(value) for value in row) + "\n"
+            for row in zip(*batch.values())
+        )
+
+
+class JsonlWriter(_TextWriter):
+    """Write batches as JSON Lines."""
+
+    def write_batch(self, batch):
+        columns = list(batch)
+        self._file.writelines(
+            json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n"
+            for row in zip(*batch.values())
+        )
+
+
+class DelimitedWriter(_TextWriter):
+    """Write batches as delimited text with a header row."""
+
+    def __init__(self, filepath, delimiter=',', encoding='utf-8'):
+        super().__init__(filepath, encoding)
+        self._writer = csv.writer(self._file, delimiter=delimiter, lineterminator="\n")
+        self._header_written = False
+
+    def write_batch(self, batch):
+        if not self._header_written:
+            self._writer.writerow(list(batch))
+            self._header_written = True
+        self._writer.writerows(zip(*batch.values()))
+
+
+class ParquetWriter:
+    """Write batches to a Parquet file, one row group per batch."""
+
+    def __init__(self, filepath, encoding='utf-8'):
+        self._pa = _import_pyarrow()
+        self._filepath = filepath
+        self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write_batch(self, batch):
+        table = self._pa.Table.from_pydict(batch)
+        if self._writer is None:
+            self._writer = self._pa.parquet.ParquetWriter(self._filepath, table.schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+READERS = {
+    'pipe': read_pipe,
+    'jsonl': read_jsonl,
+    'csv': read_csv,
+    'tsv': read_tsv,
+    'parquet': read_parquet,
+}
+
+WRITERS = {
+    'pipe': PipeWriter,
+    'jsonl': JsonlWriter,
+    'csv': lambda filepath, encoding='utf-8': DelimitedWriter(filepath, ',', encoding),
+    'tsv': lambda filepath, encoding='utf-8': DelimitedWriter(filepath, '\t', encoding),
+    'parquet': ParquetWriter,
+}
+
+
+def read_batches(filepath, fmt=None, batch_size=DEFAULT_BATCH_SIZE, encoding='utf-8'):
+    """
+    Read a dataset as columnar batches.
+
+    Args:
+        filepath (str): Input file
+        fmt (str): One of READERS, or None to detect from the extension
+        batch_size (int): Maximum rows per batch
+
+    Returns:
+        iterator of dict: {column name: list of values}
+    """
+    fmt = fmt or detect_format(filepath)
+    if fmt not in READERS:
+        raise ValueError(f"Unknown dataset format: {fmt!r} (expected one of {', '.join(READERS)})")
+    return READERS[fmt](filepath, batch_size=batch_size, encoding=encoding)
+
+
+def open_writer(filepath, fmt=None, encoding='utf-8'):
+    """Open a batch writer for `filepath`; use as a context manager."""
+    fmt = fmt or detect_format(filepath)
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown dataset format: {fmt!r} (expected one of {', '.join(WRITERS)})")
+    return WRITERS[fmt](filepath, encoding=encoding)
+
+
+__all__ = [
+    'ManifestReader',
+    'ManifestRecord',
+    'READERS',
+    'WRITERS',
+    'detect_format',
+    'read_batches',
+    'open_writer',
+]
@@ -2,63 +2,18 @@ import pyparsing as pp
 from pyparsing import Word, nums, oneOf, Suppress,originalTextFor,Combine,Keyword,OneOrMore, Regex
 from year_grammar_reverse import yeargrammar_reverse, year_to_spoken
 from number_grammar_reverse import wstart, wend, number_to_spoken
+import calendar
 import re
-pp.ParserElement.setDefaultWhitespaceChars("\t\n")
-
-# We'll define a small dictionary from integer day -> "første" / "andre" / etc.
-ordinals_dict = {
-    1: ["første", "fyrste"],  # you may pick one: "første"
-    2: ["andre"],
-    3: ["tredje"],
-    4: ["fjerde"],
-    5: ["femte"],
-    6: ["sjette"],
-    7: ["sjuende", "syvende"],
-    8: ["åttende", "åttande"],
-    9: ["niende", "niande"],
-    10: ["tiende", "tiande"],
-    11: ["ellevte"],
-    12: ["tolvte"],
-    13: ["trettende", "trettande"],
-    14: ["fjortende", "fjortande"],
-    15: ["femtende", "femtande"],
-    16: ["sekstende", "sekstande"],
-    17: ["syttende", "syttande"],
-    18: ["attende", "attande"],
-    19: ["nittende", "nittande"],
-    20: ["tjuende", "tyvende", "tjuande"],
-    21: ["tjueførste", "tjuefyrste", "énogtyvende", "énogtjuende"],
-    22: ["tjueandre", "toogtyvende", "toogtjuende"],
-    23: ["tjuetredje", "treogtyvende", "treogtjuende"],
-    24: ["tjuefjerde", "fireogtyvende", "fireogtjuende"],
-    25: ["tjuefemte", "femogtyvende", "femogtjuende"],
-    26: ["tjuesjette", "seksogtyvende", "seksogtjuende"],
-    27: ["tjuesjuende", "tjuesyvende", "syvogtyvende", "syvogtjuende"],
-    28: ["tjueåttende", "tjueåttande", "åtteogtyvende", "åtteogtjuende"],
-    29: ["tjueniende", "tjueniande", "niogtyvende", "niogtjuende"],
-    30: ["trettiende", "trettiande"],
-    31: ["trettiførste", "trettifyrste", "énogtrettiende"],
-}
-
-months = {
-    1: "januar",
-    2: "februar",
-    3: "mars",
-    4: "april",
-    5: "mai",
-    6: "juni",
-    7: "juli",
-    8: "august",
-    9: "september",
-    10: "oktober",
-    11: "november",
-    12: "desember",
-}
+
+# Day ordinals and month names come from the lexicon
+from lexicon import LEXICONS, ordinals_dict, months, current_lexicon
+import snapshot
 
 def day_to_ordinal(day: int) -> str:
-    """Always returns the first ordinal form from ordinals_dict."""
-    if day in ordinals_dict:
-        return ordinals_dict[day][0]
+    """Returns the ordinal form of the active lexicon profile."""
+    ordinals = current_lexicon().ordinals
+    if day in ordinals:
+        return ordinals[day]
     
     # For days not in dictionary (though our dict covers 1-31)
     tens = (day // 10) * 10
@@ -69,134 +24,125 @@ def day_to_ordinal(day: int) -> str:
 
 def numeric_month_to_name(m: int) -> str:
     """Convert 1 => 'januar', 12 => 'desember'"""
-    return months.get(m, str(m))
+    return current_lexicon().months.get(m, str(m))
 
 ###############################################################################
-# 1) Grammar to match typical "3. juni" or "03.06.2022", etc.
+# 0) Date engine
+#
+#    Every date syntax (3. juni, 03.06.2023, 3/6/23, 06-03-2023, 2023.06.03)
+#    is validated and spelled out by date_to_spoken(). The spoken day and
+#    month of every valid day x month combination are built once per lexicon
+#    profile, and spoken years come from year_grammar_reverse.YEAR_TABLES.
 ###############################################################################
-# We'll keep it simple: dd. monthname [yyyy], or dd.mm.yyyy
-digit = Word(nums)
-
-# Match pattern1: "3. juni"
-pattern1 = pp.Regex(r"(\d{1,2})\.\s*(januar|februar|mars|april|mai|juni|juli|august|september|oktober|november|desember)\b\.?")# e.g. group(1) = day, group(2) = monthName, group(3) = optional year
-
-def parse_pattern1(t):
-    # t[0] is the entire match
-    import re
-    m = re.match(r"(\d{1,2})\.\s*([^\s]+)(?:\s+(\d{4}))?", t[0])
-    if not m:
-        return (t[0], t[0])  # fallback
-    day_str = m.group(1)
-    month_str = m.group(2)
-    year_str = m.group(3) if m.group(3) else None
-
-    day_val = int(day_str)
-    # Convert day to ordinal
-    day_spoken = day_to_ordinal(day_val)
-    # The month is already spelled out, just keep it
-    spoken = f"{day_spoken} {month_str}"
-    # If there's a year
-    if year_str:
-        from year_grammar_reverse import year_to_spoken
-        yval = int(year_str)
-        spoken_year = year_to_spoken(yval)
-        spoken += f" {spoken_year}"
-    return (t[0], spoken)
-
-pattern1_expr = pattern1.setParseAction(parse_pattern1)
-
-# Match pattern2: "dd.mm.yyyy" or "dd.mm"
-pattern2 = pp.Regex(r"(\d{1,2})\.(\d{1,2})(?:\.(\d{4}))?")
-def parse_pattern2(t):
-    import re
-    m = re.match(r"(\d{1,2})\.(\d{1,2})(?:\.(\d{4}))?", t[0])
-    if not m:
-        return (t[0], t[0])
-    day_val = int(m.group(1))
-    month_val = int(m.group(2))
-    year_val = m.group(3)
-    day_spoken = day_to_ordinal(day_val)
-    month_spoken = numeric_month_to_name(month_val)
-    out = f"{day_spoken} i {month_spoken}"
-    if year_val:
-        from year_grammar_reverse import year_to_spoken
-        out += " " + year_to_spoken(int(year_val))
-    return (t[0], out)
-
-pattern2_expr = pattern2.setParseAction(parse_pattern2)
 
-ordinal_expr = (
-    Word(nums) 
-    + Suppress(".-")
-).setParseAction(
-    lambda t: f"{ordinals_dict[int(t[0])][0]}"
+DAYS_IN_MONTH = (31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+# Two-digit years up to the pivot are read as 20xx, the others as 19xx
+TWO_DIGIT_YEAR_PIVOT = 30
+
+MONTH_NUMBERS = {name: number for number, name in months.items()}
+
+def expand_two_digit_year(year: int) -> int:
+    """Apply the two-digit-year policy: 23 => 2023, 87 => 1987."""
+    return 2000 + year if year <= TWO_DIGIT_YEAR_PIVOT else 1900 + year
+
+def is_valid_date(day: int, month: int, year: int = None) -> bool:
+    """True if day/month (and year, if given) is a calendar date."""
+    if not 1 <= month <= 12 or not 1 <= day <= DAYS_IN_MONTH[month - 1]:
+        return False
+    if month == 2 and day == 29 and year is not None:
+        return calendar.isleap(year)
+    return True
+
+def _build_day_month_table(lexicon):
+    """(day, month) => (spoken day, spoken month) for every valid combination."""
+    return {
+        (day, month): (lexicon.ordinals[day], lexicon.months[month])
+        for month in range(1, 13)
+        for day in range(1, DAYS_IN_MONTH[month - 1] + 1)
+    }
+
+# Spoken day and month per lexicon profile
+DAY_MONTH_TABLES = snapshot.table(
+    'date_grammar_reverse.DAY_MONTH_TABLES',
+    lambda: {name: _build_day_month_table(lexicon) for name, lexicon in LEXICONS.items()},
 )
 
-
-
-
-
-klokka_time_expr = pp.Regex(r"(?i)\b(klokka|klokken)\s+(\d{1,2})\.(\d{1,2})([.,?!:;])?(?!\d)")
-def parse_klokka_time(t):
+def date_to_spoken(day: int, month: int, year: str = None, separator: str = " "):
     """
-    Examples:
-      - "Klokka 17.12" => "Klokka sytten tolv"
-      - "klokken 8.30" => "klokken åtte tretti"
-    Preserves the exact casing of “klokka” or “klokken” from the input.
+    Spell out a date, or return None if it is not a calendar date.
+
+    Args:
+        day (int): Day of the month
+        month (int): Month number
+        year (str): Year as written, or None; two-digit years are expanded
+            with expand_two_digit_year()
+        separator (str): Text between day and month (" " or " i ")
     """
-    raw = t[0]               
-    match = re.search(r"(?i)\b(klokka|klokken)\s+(\d{1,2})\.(\d{1,2})([.,?!:;])?(?!\d)", raw)
-    if not match:
-        return (raw, raw)
-
-    # This is the exact substring the user typed: "Klokka", "klokka", "Klokken", "klokken", etc.
-    klokkeword = match.group(1)
-
-    hour = int(match.group(2))
-    minute = int(match.group(3))
-    hour_spelled = number_to_spoken(hour)
-    minute_spelled = number_to_spoken(minute)
-
-    return (raw, f"{klokkeword} {hour_spelled} {minute_spelled}")
-
-klokka_time_expr.setParseAction(parse_klokka_time)
-
-
-
-
-
-klokka_time_expr2 = pp.Regex(r"(?i)\b(klokka|klokken)\s+(\d{1,2})\:(\d{1,2})([.,?!:;])?(?!\d)")
-def parse_klokka_time(t):
+    year_value = None
+    if year:
+        year_value = int(year)
+        if len(year) == 2:
+            year_value = expand_two_digit_year(year_value)
+    if not is_valid_date(day, month, year_value):
+        return None
+
+    day_spoken, month_spoken = DAY_MONTH_TABLES[current_lexicon().name][(day, month)]
+    spoken = f"{day_spoken}{separator}{month_spoken}"
+    if year_value is not None:
+        spoken += f" {year_to_spoken(year_value)}"
+    return spoken
+
+def date_parse_action(separator=" "):
     """
-    Examples:
-      - "Klokka 17:12" => "Klokka sytten tolv"
-      - "klokken 8:30" => "klokken åtte tretti"
-    Preserves the exact casing of “klokka” or “klokken” from the input.
+    Parse action for a date regex with named groups day, month (or
+    month_name) and optionally year. Invalid dates raise ParseException, so
+    the surrounding alternatives get to match the text instead.
     """
-    raw = t[0]               
-    match = re.search(r"(?i)\b(klokka|klokken)\s+(\d{1,2})\:(\d{1,2})([.,?!:;])?(?!\d)", raw)
-    if not match:
-        return (raw, raw)
+    def parse_date(s, loc, t):
+        raw = t[0]
+        if t.month_name:
+            month = MONTH_NUMBERS[t.month_name]
+        else:
+            month = int(t.month)
+        spoken = date_to_spoken(int(t.day), month, t.year, separator)
+        if spoken is None:
+            raise pp.ParseException(s, loc, f"not a calendar date: {raw}")
+        if t.month_name and raw.endswith("."):
+            spoken += "."
+        return (raw, spoken)
+    return parse_date
 
-    # This is the exact substring the user typed: "Klokka", "klokka", "Klokken", "klokken", etc.
-    klokkeword = match.group(1)
+###############################################################################
+# 1) Grammar to match typical "3. juni" or "03.06.2022", etc.
+###############################################################################
 
-    hour = int(match.group(2))
-    minute = int(match.group(3))
-    hour_spelled = number_to_spoken(hour)
-    minute_spelled = number_to_spoken(minute)
+# Match pattern1: "3. juni" (the month keeps a trailing period)
+pattern1 = pp.Regex(r"(?P<day>\d{1,2})\.\s*(?P<month_name>januar|februar|mars|april|mai|juni|juli|august|september|oktober|november|desember)\b\.?")
+pattern1_expr = pattern1.setParseAction(date_parse_action())
 
-    return (raw, f"{klokkeword} {hour_spelled} {minute_spelled}")
+# Match pattern2: "dd.mm.yyyy" or "dd.mm" => "tredje i juni"
+pattern2 = pp.Regex(r"(?P<day>\d{1,2})\.(?P<month>\d{1,2})(?:\.(?P<year>\d{4}))?")
+pattern2_expr = pattern2.setParseAction(date_parse_action(" i "))
 
-klokka_time_expr2.setParseAction(parse_klokka_time)
+ordinal_expr = (
+    Word(nums) 
+    + Suppress(".-")
+).setParseAction(
+    lambda t: f"{current_lexicon().ordinals[int(t[0])]}"
+)
 
 
 
 
 
+# Clock times ("klokka 15.30", "kl. 15:30") are handled by time_grammar_reverse.
 
 dategrammar_reverse = (
     wstart
-    + (klokka_time_expr2 ^klokka_time_expr ^pattern1_expr ^ pattern2_expr)
-    + wend.setParseAction(lambda s, l, t: l)
+    + (pattern1_expr ^ pattern2_expr)
+    + wend
 )
+
+# Module metadata
+__version__ = '2.3.0'
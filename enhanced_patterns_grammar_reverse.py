@@ -1,17 +1,24 @@
 import pyparsing as pp
 from pyparsing import Word, nums, Regex, Suppress, Combine, Literal, Optional, oneOf
-from number_grammar_reverse import number_to_spoken, wstart, wend
+from number_grammar_reverse import number_to_spoken, digits_to_spoken, wstart, wend
 from year_grammar_reverse import year_to_spoken
+from date_grammar_reverse import date_parse_action
+from time_grammar_reverse import time_to_spoken
+from lexicon import FRACTIONS, LEXICONS, current_lexicon
 import re
 
-# Change Pyparsing's default whitespace handling
-pp.ParserElement.setDefaultWhitespaceChars("\t\n")
-
 ###############################################################################
 # 1. Enhanced Range Patterns (fix for "10-15" -> "ti til femten")
 ###############################################################################
 
-def parse_enhanced_range(tokens):
+# Clock time, "HH.MM"
+_DOTTED_TIME = re.compile(r'(\d{1,2})\.(\d{2})$')
+
+def _is_dotted_time(num):
+    match = _DOTTED_TIME.match(num)
+    return match is not None and time_to_spoken(int(match.group(1)), int(match.group(2))) is not None
+
+def parse_enhanced_range(s, loc, tokens):
     """Parse range patterns like '10-15', '2010-2020', '(10-15)', etc."""
     raw = tokens[0]
 
@@ -43,18 +50,15 @@ def parse_enhanced_range(tokens):
         try:
             # Try to parse as integers first
             if '.' not in num1_clean and '.' not in num2_clean:
-                num1 = int(num1_clean)
-                num2 = int(num2_clean)
-
-                # Special handling for year ranges
-                if num1 >= 1000 and num2 >= 1000 and num1 <= 9999 and num2 <= 9999:
-                    year1 = year_to_spoken(num1)
-                    year2 = year_to_spoken(num2)
+                # Special handling for year ranges (two 4-digit numbers from 1000)
+                if all(len(num) == 4 and num[0] != '0' for num in (num1_clean, num2_clean)):
+                    year1 = year_to_spoken(int(num1_clean))
+                    year2 = year_to_spoken(int(num2_clean))
                     return (raw, f"{prefix_bracket}{year1} til {year2}{trailing_symbols}{suffix_bracket}")
 
                 # Regular number ranges
-                num1_spoken = number_to_spoken(num1)
-                num2_spoken = number_to_spoken(num2)
+                num1_spoken = digits_to_spoken(num1_clean)
+                num2_spoken = digits_to_spoken(num2_clean)
                 return (raw, f"{prefix_bracket}{num1_spoken} til {num2_spoken}{trailing_symbols}{suffix_bracket}")
 
             # Handle decimal ranges
@@ -67,6 +71,13 @@ def parse_enhanced_range(tokens):
                 num2_spoken = number_to_spoken(int(num2))
                 return (raw, f"{prefix_bracket}{num1_spoken} til {num2_spoken}{trailing_symbols}{suffix_bracket}")
 
+            # A bare interval of two clock times ("15.30-16.00") is left to
+            # the time rule, which this match would otherwise outlast by the
+            # trailing whitespace it consumes
+            if (not (prefix_bracket or suffix_bracket or trailing_symbols.strip())
+                    and _is_dotted_time(num1_str) and _is_dotted_time(num2_str)):
+                raise pp.ParseException(s, loc, f"clock time interval: {raw}")
+
             # True decimals - simplified approach
             return (raw, raw)  # Keep original for complex decimals
 
@@ -80,215 +91,98 @@ enhanced_range_expr = pp.Regex(r'[\(\[]?\d+(?:[.,]\d+)?\s*-\s*\d+(?:[.,]\d+)?[\)
 enhanced_range_expr.setParseAction(parse_enhanced_range)
 
 ###############################################################################
-# 2. Unicode Fractions Support
+# 2. Unicode Fractions Support (pre- and post-pass, not grammar rules)
 ###############################################################################
 
-unicode_fractions = {
-    '¼': 'en fjerdedel',
-    '½': 'en halv',
-    '¾': 'tre fjerdedeler',
-    '⅐': 'en sjuendedel',
-    '⅑': 'en niendedel',
-    '⅒': 'en tiendedel',
-    '⅓': 'en tredjedel',
-    '⅔': 'to tredjedeler',
-    '⅕': 'en femtedel',
-    '⅖': 'to femtedeler',
-    '⅗': 'tre femtedeler',
-    '⅘': 'fire femtedeler',
-    '⅙': 'en sjettedel',
-    '⅚': 'fem sjettedeler',
-    '⅛': 'en åttendedel',
-    '⅜': 'tre åttendedeler',
-    '⅝': 'fem åttendedeler',
-    '⅞': 'syv åttendedeler'
+# Superscript digits and minus -> ASCII
+SUPERSCRIPT_TRANSLATION = str.maketrans("⁰¹²³⁴⁵⁶⁷⁸⁹⁻", "0123456789-")
+
+# A fraction glued to a number ("1½")
+_MIXED_FRACTION = re.compile(r"(?<=\d)(?=[" + "".join(FRACTIONS) + "])")
+
+# Fraction characters -> spoken form, per profile
+_FRACTION_TRANSLATIONS = {
+    name: str.maketrans(lexicon.fractions) for name, lexicon in LEXICONS.items()
 }
 
-def parse_unicode_fraction(tokens):
-    """Parse Unicode fraction characters."""
-    raw = tokens[0]
-    result_parts = []
+def expand_unicode_symbols(text):
+    """
+    Pre-pass run before grammar matching.
 
-    for char in raw:
-        if char in unicode_fractions:
-            result_parts.append(unicode_fractions[char])
-        else:
-            result_parts.append(char)
+    Fractions glued to a number get an "og" ("1½" -> "1 og ½"). The fraction
+    characters themselves stay in place until expand_fractions runs after
+    the grammar, so a unit after them is still expanded ("½kg" -> "½kilo").
+    """
+    return _MIXED_FRACTION.sub(" og ", text)
 
-    result = ''.join(result_parts)
-    return (raw, result)
+def expand_fractions(text):
+    """
+    Post-pass run after grammar matching.
 
-unicode_fraction_expr = pp.Regex(r'[¼½¾⅐⅑⅒⅔⅕⅖⅗⅘⅙⅚⅛⅜⅝⅞]')
-unicode_fraction_expr.setParseAction(parse_unicode_fraction)
+    Replaces every fraction character by its spoken form in the active
+    profile ("½" -> "en halv", "ein halv" in nynorsk) in a single
+    str.translate pass.
+    """
+    return text.translate(_FRACTION_TRANSLATIONS[current_lexicon().name])
 
 ###############################################################################
 # 3. Enhanced Date Patterns with Different Separators
 ###############################################################################
 
-def parse_slash_date(tokens):
-    """Parse date with slash separator like '3/6/2023'."""
-    raw = tokens[0]
-    match = re.match(r'(\d{1,2})/(\d{1,2})(?:/(\d{2,4}))?', raw)
-    if match:
-        day = int(match.group(1))
-        month = int(match.group(2))
-        year = match.group(3)
-
-        from date_grammar_reverse import day_to_ordinal, numeric_month_to_name
-
-        day_spoken = day_to_ordinal(day)
-        month_spoken = numeric_month_to_name(month)
-
-        result = f"{day_spoken} {month_spoken}"
-
-        if year:
-            year_int = int(year)
-            if len(year) == 2:  # Convert 2-digit year to 4-digit
-                year_int = 2000 + year_int if year_int <= 30 else 1900 + year_int
-            result += f" {year_to_spoken(year_int)}"
-
-        return (raw, result)
-
-    return (raw, raw)
+# All separators feed the date engine in date_grammar_reverse, which validates
+# the date and applies the shared two-digit-year policy.
+slash_date_expr = pp.Regex(r'(?P<day>\d{1,2})/(?P<month>\d{1,2})(?:/(?P<year>\d{2,4}))?')
+slash_date_expr.setParseAction(date_parse_action())
 
-def parse_dash_date(tokens):
-    """Parse date with dash separator like '06-03-2023'."""
-    raw = tokens[0]
-    match = re.match(r'(\d{1,2})-(\d{1,2})(?:-(\d{2,4}))?', raw)
-    if match:
-        day = int(match.group(1))
-        month = int(match.group(2))
-        year = match.group(3)
-
-        from date_grammar_reverse import day_to_ordinal, numeric_month_to_name
-
-        day_spoken = day_to_ordinal(day)
-        month_spoken = numeric_month_to_name(month)
-
-        result = f"{day_spoken} {month_spoken}"
-
-        if year:
-            year_int = int(year)
-            if len(year) == 2:  # Convert 2-digit year to 4-digit
-                year_int = 2000 + year_int if year_int <= 30 else 1900 + year_int
-            result += f" {year_to_spoken(year_int)}"
-
-        return (raw, result)
-
-    return (raw, raw)
-
-def parse_yearfirst_date(tokens):
-    """Parse year-first date like '2023.06.03'."""
-    raw = tokens[0]
-    match = re.match(r'(\d{4})\.(\d{1,2})\.(\d{1,2})', raw)
-    if match:
-        year = int(match.group(1))
-        month = int(match.group(2))
-        day = int(match.group(3))
-
-        from date_grammar_reverse import day_to_ordinal, numeric_month_to_name
-
-        day_spoken = day_to_ordinal(day)
-        month_spoken = numeric_month_to_name(month)
-        year_spoken = year_to_spoken(year)
-
-        result = f"{day_spoken} {month_spoken} {year_spoken}"
-        return (raw, result)
-
-    return (raw, raw)
+dash_date_expr = pp.Regex(r'(?P<day>\d{1,2})-(?P<month>\d{1,2})(?:-(?P<year>\d{2,4}))?')
+dash_date_expr.setParseAction(date_parse_action())
 
-# Date patterns with different separators
-slash_date_expr = pp.Regex(r'\d{1,2}/\d{1,2}(?:/\d{2,4})?')
-slash_date_expr.setParseAction(parse_slash_date)
-
-dash_date_expr = pp.Regex(r'\d{1,2}-\d{1,2}(?:-\d{2,4})?')
-dash_date_expr.setParseAction(parse_dash_date)
-
-yearfirst_date_expr = pp.Regex(r'\d{4}\.\d{1,2}\.\d{1,2}')
-yearfirst_date_expr.setParseAction(parse_yearfirst_date)
+yearfirst_date_expr = pp.Regex(r'(?P<year>\d{4})\.(?P<month>\d{1,2})\.(?P<day>\d{1,2})')
+yearfirst_date_expr.setParseAction(date_parse_action())
 
 ###############################################################################
 # 4. Enhanced Scientific Notation
 ###############################################################################
 
-def parse_scientific_notation(tokens):
-    """Parse scientific notation like '1,5×10³' or '2.5e10'."""
-    raw = tokens[0]
-
-    # Match patterns like "1,5×10³", "2.5e10", "3,14·10²", "1E-6"
-    # Try the e-notation format first
-    e_match = re.match(r'([0-9]+(?:[.,][0-9]+)?)\s*([eE])\s*([-]?[0-9]+)', raw)
-    if e_match:
-        base = e_match.group(1).replace(',', '.')
-        exp_str = e_match.group(3)
-        try:
-            base_num = float(base)
-            exp_num = int(exp_str)
-            # Convert to spoken format
-            if base_num == int(base_num):
-                base_spoken = number_to_spoken(int(base_num))
-            else:
-                base_spoken = f"{number_to_spoken(int(base_num))} komma {number_to_spoken(int((base_num % 1) * 10))}"
-
-            exp_spoken = number_to_spoken(abs(exp_num))
-            if exp_num < 0:
-                return (raw, f"{base_spoken} ganger ti opphøyd i minus {exp_spoken}")
-            else:
-                return (raw, f"{base_spoken} ganger ti opphøyd i {exp_spoken}")
-        except (ValueError, OverflowError):
-            return (raw, raw)
-
-    # Fall back to the traditional format
-    match = re.match(r'([0-9]+[.,]?[0-9]*)\s*[×x·*]\s*10*([⁰¹²³⁴⁵⁶⁷⁸⁹]+|[0-9]+)', raw)
-    if match:
-        base = match.group(1).replace(',', '.')
-        exp_str = match.group(2)
-
-        # Convert Unicode superscript to regular digits
-        superscript_map = {'⁰': '0', '¹': '1', '²': '2', '³': '3', '⁴': '4',
-                          '⁵': '5', '⁶': '6', '⁷': '7', '⁸': '8', '⁹': '9'}
-        for super_char, digit in superscript_map.items():
-            exp_str = exp_str.replace(super_char, digit)
-
-        try:
-            base_num = float(base)
-            exp_num = int(exp_str)
-
-            if base_num == int(base_num):
-                base_spoken = number_to_spoken(int(base_num))
-            else:
-                base_spoken = f"{number_to_spoken(int(base_num))} komma {number_to_spoken(int((base_num % 1) * 10))}"
-
-            exp_spoken = number_to_spoken(exp_num)
-            return (raw, f"{base_spoken} ganger ti opphøyd i {exp_spoken}")
-
-        except (ValueError, OverflowError):
-            return (raw, raw)
-
-    # Handle simple exponent notation like "2.5e10"
-    match = re.match(r'([0-9]+[.,]?[0-9]*)[eE]([0-9]+)', raw)
-    if match:
-        base = match.group(1).replace(',', '.')
-        exp = match.group(2)
-
-        try:
-            base_num = float(base)
-            exp_num = int(exp)
+def _decimal_to_spoken(base):
+    base_num = float(base.replace(',', '.'))
+    if base_num == int(base_num):
+        return number_to_spoken(int(base_num))
+    return f"{number_to_spoken(int(base_num))} komma {number_to_spoken(int((base_num % 1) * 10))}"
 
-            if base_num == int(base_num):
-                base_spoken = number_to_spoken(int(base_num))
-            else:
-                base_spoken = f"{number_to_spoken(int(base_num))} komma {number_to_spoken(int((base_num % 1) * 10))}"
+def _exponent_to_spoken(exp_str):
+    exp_num = int(exp_str)
+    if exp_num < 0:
+        return f"minus {number_to_spoken(-exp_num)}"
+    return number_to_spoken(exp_num)
 
-            exp_spoken = number_to_spoken(exp_num)
-            return (raw, f"{base_spoken} ganger ti opphøyd i {exp_spoken}")
+def parse_scientific_notation(tokens):
+    """Parse scientific notation like '1,5×10³', '10³' or '2.5e10'."""
+    raw = tokens[0]
 
-        except (ValueError, OverflowError):
-            return (raw, raw)
+    try:
+        # e-notation: "2.5e10", "1E-6"
+        match = re.match(r'([0-9]+(?:[.,][0-9]+)?)\s*[eE]\s*(-?[0-9]+)', raw)
+        if match:
+            return (raw, f"{_decimal_to_spoken(match.group(1))} ganger ti opphøyd i {_exponent_to_spoken(match.group(2))}")
+
+        # Times a power of ten: "1,5×10³", "3,14·10²"
+        match = re.match(r'([0-9]+(?:[.,][0-9]+)?)\s*[×x·*]\s*10*([⁻⁰¹²³⁴⁵⁶⁷⁸⁹]+)', raw)
+        if match:
+            exponent = match.group(2).translate(SUPERSCRIPT_TRANSLATION)
+            return (raw, f"{_decimal_to_spoken(match.group(1))} ganger ti opphøyd i {_exponent_to_spoken(exponent)}")
+
+        # Plain power: "10³", "2⁻¹"
+        match = re.match(r'([0-9]+(?:[.,][0-9]+)?)([⁻⁰¹²³⁴⁵⁶⁷⁸⁹]+)', raw)
+        if match:
+            exponent = match.group(2).translate(SUPERSCRIPT_TRANSLATION)
+            return (raw, f"{_decimal_to_spoken(match.group(1))} opphøyd i {_exponent_to_spoken(exponent)}")
+    except (ValueError, OverflowError):
+        pass
 
     return (raw, raw)
 
-scientific_notation_expr = pp.Regex(r'[0-9]+(?:[.,][0-9]+)?\s*[×x·*eE]\s*(?:10*)?[⁰¹²³⁴⁵⁶⁷⁸⁹]+|[0-9]+(?:[.,][0-9]+)?[eE][-]?[0-9]+')
+scientific_notation_expr = pp.Regex(r'[0-9]+(?:[.,][0-9]+)?(?:\s*[×x·*]\s*10*)?⁻?[⁰¹²³⁴⁵⁶⁷⁸⁹]+|[0-9]+(?:[.,][0-9]+)?[eE][-]?[0-9]+')
 scientific_notation_expr.setParseAction(parse_scientific_notation)
 
 ###############################################################################
@@ -328,33 +222,9 @@ mixed_number_expr.setParseAction(parse_mixed_number)
 ###############################################################################
 
 def parse_large_number(tokens):
-    """Parse and properly name very large numbers."""
+    """Spell out a long digit string with the scale words (milliard, billion, ...)."""
     raw = tokens[0]
-    num_str = raw.replace(' ', '').replace('.', '')
-
-    try:
-        num = int(num_str)
-
-        if num >= 10**12:  # Trillion and above
-            if num == 10**12:
-                return (raw, "en billion")
-            else:
-                # Simplified approach for very large numbers
-                return (raw, number_to_spoken(num))
-        elif num >= 10**9:  # Billion
-            if num == 10**9:
-                return (raw, "en milliard")
-            billions = num // 10**9
-            remainder = num % 10**9
-            if remainder == 0:
-                return (raw, f"{number_to_spoken(billions)} milliarder" if billions > 1 else "en milliard")
-            else:
-                return (raw, f"{number_to_spoken(billions)} milliarder {number_to_spoken(remainder)}")
-        else:
-            return (raw, number_to_spoken(num))
-
-    except (ValueError, OverflowError):
-        return (raw, raw)
+    return (raw, digits_to_spoken(raw))
 
 large_number_expr = pp.Regex(r'\d{9,}')
 large_number_expr.setParseAction(parse_large_number)
@@ -367,7 +237,6 @@ enhanced_grammar_reverse = (
     wstart
     + (
         enhanced_range_expr
-        ^ unicode_fraction_expr
         ^ slash_date_expr
         ^ dash_date_expr
         ^ yearfirst_date_expr
@@ -375,18 +244,22 @@ enhanced_grammar_reverse = (
         ^ mixed_number_expr
         ^ large_number_expr
     )
-    + wend.setParseAction(lambda s, l, t: l)
+    + wend
 )
 
 # Export for use in other modules
 __all__ = [
     'enhanced_grammar_reverse',
     'enhanced_range_expr',
-    'unicode_fraction_expr',
+    'expand_unicode_symbols',
+    'expand_fractions',
     'slash_date_expr',
     'dash_date_expr',
     'yearfirst_date_expr',
     'scientific_notation_expr',
     'mixed_number_expr',
     'large_number_expr'
-]
\ No newline at end of file
+]
+
+# Module metadata
+__version__ = '2.4.0'
@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""
+Differential Equivalence Harness for Normalizer Engines
+
+Performance work on the grammar (prefilters, windowing, caches, splitting
+for parallel runs) must not change a single character of TTS output. This
+harness runs candidate engines side by side with the reference,
+grammar.normalize_text, on a large generated corpus plus the examples from
+README.md, and reports every input on which an engine differs.
+
+Each difference is minimized (delta debugging over tokens, then characters)
+to a small input that still differs, and the differences are grouped by the
+grammar rules that match that minimized input, so one broken rule shows up
+as one group instead of hundreds of failing sentences.
+
+An engine is any callable text -> normalized text. The built-in engines
+(ENGINES) are the alternative paths of this package, which must all be
+identical to the reference; others can be given as module:function.
+
+The golden corpus (tests/golden_corpus.jsonl) pins the reference itself:
+every entry holds an input and its expected output. Entries whose output
+differs from the original grammar also keep that `baseline` output and
+`changed_by`, the requests that changed it on purpose. --golden checks the
+reference against it; after an intended output change, --update-golden
+records the new outputs together with the request that changed them.
+
+Usage:
+    python equivalence.py                          # every built-in engine
+    python equivalence.py --engine segmented --texts 20000 --seed 3
+    python equivalence.py --engine mymodule:fast_normalize
+    python equivalence.py --golden                 # reference vs golden corpus
+    python equivalence.py --update-golden user-051 # record intended changes
+"""
+
+import argparse
+import importlib
+import json
+import os
+import random
+import re
+import sys
+import time
+from collections import defaultdict
+
+from benchmark_normalizer import generate_texts
+from grammar import (
+    GRAMMAR_RULES,
+    _apply_grammar,
+    comprehensive_grammar,
+    expand_fractions,
+    expand_unicode_symbols,
+    normalize_text,
+)
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Inputs with the expected output of the reference (see load_golden())
+GOLDEN_PATH = os.path.join(_HERE, 'tests', 'golden_corpus.jsonl')
+
+# Plain words and tricky tokens the generated corpus is built from
+_WORDS = tuple((
+    "Møte den i og på med for til av som deltakere rapporten viser økning plass "
+    "juni mars mai desember klokka Klokka klokken kl. ca. f.eks. osv. bl.a. kg km "
+    "e-post dvs. år tiden"
+).split())
+_TOKENS = (
+    "0", "7", "07", "15", "27", "1980", "2010", "2023", "3.", "12.", "31.", "17.05.",
+    "03.06.2023", "1/6/2023", "3/6/87", "31/13", "06-03-2023", "2023.06.03",
+    "10-15", "(10-15)", "10 - 15", "2010-2020", "15.30-16.00", "1 1/2", "½", "1½",
+    "1,5×10³", "2.5e10", "1E-6", "10^3", "50%", "2,5%", "2,5", "1.000.000", "1 000 000",
+    "1000000000", "123456789012", "40-årene", "16-årig,", "11-årige!", "15:30", "15.30",
+    "8.05", "(20)", "2.10", "10-tiden", "«10-15»",
+)
+_SEPARATORS = (" ", " ", " ", "\n", "\n\n", "\t", "  ", " - ")
+
+_README_PATTERNS = (
+    re.compile(r"`([^`\n]+)`\s*→"),
+    re.compile(r'normalize\(\s*"([^"\n]+)"'),
+    re.compile(r'^\s*text\s*=\s*"([^"\n]+)"', re.MULTILINE),
+)
+
+
+def generate_corpus(count, seed=0):
+    """
+    Return `count` generated texts.
+
+    A third are token soup (random words and tricky tokens), a third are
+    template sentences (benchmark_normalizer.generate_texts) and a third
+    are short multi-line documents mixing both with various separators.
+    """
+    rng = random.Random(seed)
+    sentences = generate_texts(count, seed)
+    vocabulary = _WORDS + _TOKENS
+
+    def soup():
+        return " ".join(rng.choice(vocabulary) for _ in range(rng.randint(1, 12)))
+
+    corpus = []
+    for i in range(count):
+        kind = i % 3
+        if kind == 0:
+            corpus.append(soup())
+        elif kind == 1:
+            corpus.append(sentences[i])
+        else:
+            parts = [soup() if rng.random() < 0.5 else rng.choice(sentences)
+                     for _ in range(rng.randint(2, 6))]
+            corpus.append("".join(part + rng.choice(_SEPARATORS) for part in parts))
+    return corpus
+
+
+def readme_examples(path=os.path.join(_HERE, 'README.md')):
+    """Return the example inputs quoted in README.md (`input` → ..., normalize("...")."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            readme = f.read()
+    except OSError:
+        return []
+    examples = []
+    for pattern in _README_PATTERNS:
+        examples.extend(match.group(1) for match in pattern.finditer(readme))
+    return list(dict.fromkeys(examples))
+
+
+def _full_scan(text):
+    # The grammar over the whole text, without pretokenizer windows
+    if not text:
+        return text
+    return expand_fractions(_apply_grammar(expand_unicode_symbols(text), comprehensive_grammar))
+
+
+def _segmented(text):
+    from segmentation import split_segments
+
+    return "".join(normalize_text(segment) for segment in split_segments(text, max_length=40))
+
+
+def _document_chunks(text):
+    from worker_pool import document_chunks
+
+    return "".join(normalize_text(chunk) for chunk in document_chunks(text, chunk_size=64))
+
+
+def _within_deadline(text):
+    return normalize_text(text, deadline=3600.0)
+
+
+def _normalizer(cache_size=None):
+    from normalizer import Normalizer
+
+    if cache_size is None:
+        return Normalizer()
+    return Normalizer(cache_size=cache_size)
+
+
+def _incremental(text):
+    from incremental import IncrementalNormalizer
+
+    return IncrementalNormalizer().update(text)
+
+
+def _pipeline(skip=()):
+    from pipeline import Pipeline
+
+    pipeline = Pipeline()
+    return lambda text: pipeline.run(text, skip=skip)
+
+
+# Built-in engines: name -> factory returning a callable text -> normalized text
+ENGINES = {
+    'full-scan': lambda: _full_scan,
+    'segmented': lambda: _segmented,
+    'document-chunks': lambda: _document_chunks,
+    'deadline-path': lambda: _within_deadline,
+    'normalizer': _normalizer,
+    'no-token-cache': lambda: _normalizer(cache_size=0),
+    'incremental': lambda: _incremental,
+    'pipeline': _pipeline,
+    'pipeline-full-scan': lambda: _pipeline(skip=('prefilter', 'candidates')),
+}
+
+
+def load_engine(spec):
+    """Return the engine callable for a built-in name or a 'module:function' spec."""
+    if spec in ENGINES:
+        return ENGINES[spec]()
+    module_name, sep, attr = spec.partition(':')
+    if not sep:
+        raise ValueError(f"Unknown engine {spec!r} (built-in: {', '.join(ENGINES)}; or module:function)")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def _run(engine, text):
+    try:
+        return str(engine(text))
+    except Exception as e:
+        return f"<{type(e).__name__}: {e}>"
+
+
+def _differs(engine, reference):
+    return lambda text: _run(engine, text) != _run(reference, text)
+
+
+def _ddmin(pieces, failing):
+    """Delta debugging: a smaller list of pieces whose join still fails."""
+    granularity = 2
+    while len(pieces) >= 2:
+        size = max(len(pieces) // granularity, 1)
+        reduced = False
+        for start in range(0, len(pieces), size):
+            candidate = pieces[:start] + pieces[start + size:]
+            if candidate and failing("".join(candidate)):
+                pieces = candidate
+                granularity = max(granularity - 1, 2)
+                reduced = True
+                break
+        if not reduced:
+            if size == 1:
+                break
+            granularity = min(granularity * 2, len(pieces))
+    return pieces
+
+
+def minimize(text, failing):
+    """
+    Shrink a failing input while it keeps failing.
+
+    Removes whitespace-separated tokens first, then single characters.
+
+    Args:
+        text (str): Input on which `failing` returns True
+        failing: Predicate text -> bool
+    """
+    pieces = _ddmin(re.findall(r"\s+|\S+", text), failing)
+    return "".join(_ddmin(list("".join(pieces)), failing))
+
+
+def matched_rules(text, rules=None):
+    """
+    Return the names of the grammar rules whose replacements apply to `text`.
+
+    For every match of the comprehensive grammar, the rule is the first
+    top-level alternative that matches the same span (the one the grammar
+    picks). Plain words are left out.
+    """
+    rules = rules or GRAMMAR_RULES
+    found = []
+    for tokens, start, end in comprehensive_grammar.scan_string(text):
+        if not tokens or not isinstance(tokens[0], tuple):
+            continue
+        span = text[start:end]
+        for name, element in rules:
+            if element.matches(span, parse_all=True):
+                found.append(name)
+                break
+    return tuple(sorted(set(found)))
+
+
+def compare(engine, texts, reference=normalize_text, minimize_limit=200):
+    """
+    Run `engine` and `reference` on every text and collect the differences.
+
+    Args:
+        engine: Candidate callable text -> normalized text
+        texts: Inputs to compare on
+        reference: Reference callable (default grammar.normalize_text)
+        minimize_limit (int): Differences minimized at most (the rest are
+            grouped by the rules matching their full input)
+
+    Returns:
+        dict: 'checked', 'differences', 'reference_seconds', 'engine_seconds'
+            and 'groups' {rules: [(input, minimized, reference, engine)]}
+    """
+    failing = _differs(engine, reference)
+    rules = GRAMMAR_RULES
+    groups = defaultdict(list)
+    differences = 0
+    reference_seconds = engine_seconds = 0.0
+    for text in texts:
+        start = time.perf_counter()
+        expected = _run(reference, text)
+        middle = time.perf_counter()
+        actual = _run(engine, text)
+        engine_seconds += time.perf_counter() - middle
+        reference_seconds += middle - start
+        if actual == expected:
+            continue
+        differences += 1
+        small = minimize(text, failing) if differences <= minimize_limit else text
+        groups[matched_rules(small, rules) or ('(no rule)',)].append(
+            (text, small, _run(reference, small), _run(engine, small)))
+    return {
+        'checked': len(texts),
+        'differences': differences,
+        'reference_seconds': reference_seconds,
+        'engine_seconds': engine_seconds,
+        'groups': dict(groups),
+    }
+
+
+def load_golden(path=GOLDEN_PATH):
+    """
+    Return the entries of a golden corpus file.
+
+    Each entry is a dict with 'input' and 'expected', and for outputs that
+    changed since the original grammar, 'baseline' (its output) and
+    'changed_by' (list of request ids).
+    """
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def check_golden(engine=normalize_text, path=GOLDEN_PATH):
+    """Return (entry, actual output) for every golden entry `engine` does not reproduce."""
+    differences = []
+    for entry in load_golden(path):
+        actual = _run(engine, entry['input'])
+        if actual != entry['expected']:
+            differences.append((entry, actual))
+    return differences
+
+
+def update_golden(request_id, engine=normalize_text, path=GOLDEN_PATH):
+    """
+    Record the current outputs of `engine` as expected, crediting `request_id`.
+
+    Returns:
+        int: Number of entries whose expected output changed
+    """
+    entries = load_golden(path)
+    changed = 0
+    for entry in entries:
+        actual = _run(engine, entry['input'])
+        if actual == entry['expected']:
+            continue
+        changed += 1
+        entry.setdefault('baseline', entry['expected'])
+        entry['expected'] = actual
+        if actual == entry['baseline']:
+            del entry['baseline']
+            entry.pop('changed_by', None)
+        else:
+            entry['changed_by'] = entry.get('changed_by', []) + [request_id]
+    with open(path, 'w', encoding='utf-8') as f:
+        f.writelines(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries)
+    return changed
+
+
+def _report_golden(differences, max_examples):
+    if not differences:
+        print("golden corpus: the reference reproduces every expected output")
+        return
+    print(f"golden corpus: {len(differences)} DIFFERENCES from the expected outputs")
+    for entry, actual in differences[:max_examples]:
+        print(f"           input:     {entry['input']!r}")
+        print(f"           expected:  {entry['expected']!r}")
+        print(f"           reference: {actual!r}")
+    print("  If these changes are intended, record them with --update-golden <request id>.")
+
+
+def _report(name, result, max_examples):
+    speed = result['reference_seconds'] / max(result['engine_seconds'], 1e-9)
+    status = "equivalent" if not result['differences'] else f"{result['differences']} DIFFERENCES"
+    print(f"{name:<16} {result['checked']:>7} texts  {speed:>5.2f}x reference speed  {status}")
+    groups = sorted(result['groups'].items(), key=lambda item: -len(item[1]))
+    for rules, cases in groups:
+        print(f"    {len(cases):>5}  {' + '.join(rules)}")
+        seen = set()
+        for _, small, expected, actual in cases:
+            if small in seen or len(seen) >= max_examples:
+                continue
+            seen.add(small)
+            print(f"           input:     {small!r}")
+            print(f"           reference: {expected!r}")
+            print(f"           engine:    {actual!r}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check engines for identical output to grammar.normalize_text.")
+    parser.add_argument('--engine', action='append',
+                        help=f"engine to check, repeatable (built-in: {', '.join(ENGINES)}; "
+                             f"or module:function; default: all built-in)")
+    parser.add_argument('--texts', type=int, default=5000, help="number of generated texts")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the generated corpus")
+    parser.add_argument('--input', help="also check the lines of this file")
+    parser.add_argument('--no-readme', action='store_true', help="leave out the README examples")
+    parser.add_argument('--examples', type=int, default=3, help="minimized examples shown per group")
+    parser.add_argument('--golden', action='store_true',
+                        help="check the reference against the golden corpus instead")
+    parser.add_argument('--update-golden', metavar='REQUEST_ID',
+                        help="record the current reference outputs in the golden corpus, "
+                             "crediting REQUEST_ID for every changed one")
+    args = parser.parse_args(argv)
+
+    if args.update_golden:
+        changed = update_golden(args.update_golden)
+        print(f"golden corpus: {changed} expected output(s) changed by {args.update_golden}")
+        return 0
+    if args.golden:
+        differences = check_golden()
+        _report_golden(differences, args.examples)
+        return 1 if differences else 0
+
+    texts = generate_corpus(args.texts, args.seed)
+    if not args.no_readme:
+        texts += readme_examples()
+    if args.input:
+        with open(args.input, encoding='utf-8') as f:
+            texts += [line.rstrip("\n") for line in f if line.strip()]
+
+    try:
+        engines = [(spec, load_engine(spec)) for spec in args.engine or ENGINES]
+    except (ImportError, AttributeError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+
+    failed = 0
+    for name, engine in engines:
+        result = compare(engine, texts)
+        _report(name, result, args.examples)
+        failed += bool(result['differences'])
+    if failed:
+        print(f"\n{failed} engine(s) differ from the reference.")
+        return 1
+    print("\nAll engines match the reference.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,23 +6,40 @@ This module combines all grammar patterns (basic and enhanced) into a single,
 comprehensive grammar system with proper priority ordering.
 """
 
+import ast
+import hashlib
+import importlib
+import inspect
+import json
+import re
+import threading
+import time
+from functools import lru_cache
+
 import pyparsing as pp
 from pyparsing import Word, printables, alphas8bit
 
 # Import all grammar modules
-from number_grammar_reverse import numbergrammar_reverse, wstart, wend, WS
-from year_grammar_reverse import yeargrammar_reverse
+from number_grammar_reverse import numbergrammar_reverse, wstart, wend, WS, digits_to_spoken
+from year_grammar_reverse import age_expr, ordinal_rule, thousand_separated_rule, year_expr
 from date_grammar_reverse import dategrammar_reverse
+from time_grammar_reverse import timegrammar_reverse
 from abbrev_grammar_reverse import abbrevgrammar_reverse
+from lexicon import use_profile
+from segmentation import split_segments
+from token_cache import TokenCache, install_token_cache
+from pretokenizer import candidate_windows, has_candidates
+import snapshot
 from enhanced_patterns_grammar_reverse import (
     enhanced_range_expr,
-    unicode_fraction_expr,
     slash_date_expr,
     dash_date_expr,
     yearfirst_date_expr,
     scientific_notation_expr,
     mixed_number_expr,
-    large_number_expr
+    large_number_expr,
+    expand_unicode_symbols,
+    expand_fractions,
 )
 
 # Base word grammar for fallback
@@ -31,7 +48,6 @@ wordgrammar = Word(printables + alphas8bit)
 # Import enhanced patterns
 from enhanced_patterns_grammar_reverse import (
     enhanced_range_expr,
-    unicode_fraction_expr,
     slash_date_expr,
     dash_date_expr,
     yearfirst_date_expr,
@@ -40,24 +56,77 @@ from enhanced_patterns_grammar_reverse import (
     large_number_expr
 )
 
-# Comprehensive grammar with proper priority ordering
-# Enhanced patterns come first to ensure they match before basic patterns
-comprehensive_grammar = (
-    enhanced_range_expr           # Range patterns (10-15, 2010-2020) - HIGHEST PRIORITY
-    ^ unicode_fraction_expr       # Unicode fractions (½, ¾, ⅓)
-    ^ slash_date_expr            # Slash dates (1/6/2023)
-    ^ dash_date_expr             # Dash dates (06-03-2023)
-    ^ yearfirst_date_expr        # Year-first dates (2023.06.03)
-    ^ scientific_notation_expr   # Scientific notation (1,5×10³)
-    ^ mixed_number_expr          # Mixed numbers (1 1/2)
-    ^ large_number_expr          # Large numbers with proper naming (9+ digits)
-    ^ abbrevgrammar_reverse       # Abbreviations (ca., f.eks., osv.)
-    ^ dategrammar_reverse        # Standard date patterns (3. juni, 03.06.2023)
-    ^ yeargrammar_reverse        # Year patterns (1980, 2010, 2023)
-    ^ numbergrammar_reverse      # Number patterns (15, 2,5, 1000)
-    ^ wordgrammar               # Fallback to plain words
+# Top-level rules with their stable names, in priority order: enhanced
+# patterns come first to ensure they match before basic patterns, and on a
+# tie the earlier rule wins. Unicode fractions are spelled out by a post-pass
+# (expand_fractions) after the grammar runs.
+GRAMMAR_RULES = (
+    ('time', timegrammar_reverse),                     # Clock times (kl. 15.30, 15:30, 15.30-16.00) - wins ties
+    ('range', enhanced_range_expr),                    # Range patterns (10-15, 2010-2020)
+    ('slash_date', slash_date_expr),                   # Slash dates (1/6/2023)
+    ('dash_date', dash_date_expr),                     # Dash dates (06-03-2023)
+    ('yearfirst_date', yearfirst_date_expr),           # Year-first dates (2023.06.03)
+    ('scientific_notation', scientific_notation_expr), # Scientific notation (1,5×10³)
+    ('mixed_number', mixed_number_expr),               # Mixed numbers (1 1/2)
+    ('large_number', large_number_expr),               # Large numbers with proper naming (9+ digits)
+    ('abbreviation', abbrevgrammar_reverse),           # Abbreviations (ca., f.eks., osv.)
+    ('date', dategrammar_reverse),                     # Standard date patterns (3. juni, 03.06.2023)
+    ('year', year_expr),                               # Years (1980, 2010, 2023)
+    ('age', age_expr),                                 # Ages (16-årig, 40-årene)
+    ('thousands', thousand_separated_rule),            # Thousand separators (1.000.000)
+    ('ordinal', ordinal_rule),                         # Ordinals (15.)
+    ('number', numbergrammar_reverse),                 # Number patterns (15, 2,5, 1000)
 )
 
+# Each rule under its name as results name (a copy, so uses of the same
+# element inside other rules stay unnamed): the tokens of a match tell which
+# rule the grammar picked
+_RULES = tuple(element.set_results_name(name) for name, element in GRAMMAR_RULES)
+_RULE_NAMES = frozenset(name for name, _ in GRAMMAR_RULES)
+
+# Accepted matches per rule, counted per thread and summed by rule_matches()
+_rule_counts = threading.local()
+_rule_count_tables = []
+_rule_count_lock = threading.Lock()
+
+def _thread_rule_counts():
+    counts = getattr(_rule_counts, 'counts', None)
+    if counts is None:
+        counts = _rule_counts.counts = dict.fromkeys(_RULE_NAMES, 0)
+        with _rule_count_lock:
+            _rule_count_tables.append(counts)
+    return counts
+
+# Comprehensive grammar: the rules in priority order, then plain words
+comprehensive_grammar = pp.Or(list(_RULES) + [wordgrammar])
+
+# Match positions index the text as given (pyparsing would otherwise expand
+# tabs first, and replacements after a tab would be lost)
+comprehensive_grammar.parseWithTabs()
+
+# Replacements of recurring tokens ("2023", "ca.", "3. juni") are remembered
+# per rule, so their parse actions only run once per distinct text
+token_cache = TokenCache()
+install_token_cache(comprehensive_grammar, token_cache)
+
+def rule_matches():
+    """
+    Return how many matches each top-level rule has made in this process.
+
+    Only matches the grammar picked are counted (in expand_matches), under
+    the names of GRAMMAR_RULES; plain words are not counted.
+
+    Returns:
+        dict: {rule name: matches}, in priority order
+    """
+    with _rule_count_lock:
+        tables = list(_rule_count_tables)
+    totals = {name: 0 for name, _ in GRAMMAR_RULES}
+    for counts in tables:
+        for name, count in list(counts.items()):
+            totals[name] += count
+    return totals
+
 def get_grammar():
     """
     Returns the comprehensive grammar with all patterns.
@@ -67,7 +136,126 @@ def get_grammar():
     """
     return comprehensive_grammar
 
-def normalize_text(text):
+# Rule categories a caller can restrict normalization to (GRAMMAR_RULES names).
+# The categories overlap in one rule: the year after a date ("3. juni 2023")
+# is a match of its own, so 'dates' includes the 'year' rule of 'years'.
+# Within a category grammar the selected rules take text that a left-out rule
+# would have won: with 'numbers' alone, "1980" is read as a number and the
+# "3." of "3. juni" as an ordinal.
+GRAMMAR_CATEGORIES = {
+    'times': ('time',),
+    'ranges': ('range',),
+    'dates': ('slash_date', 'dash_date', 'yearfirst_date', 'date', 'year'),
+    'numbers': ('scientific_notation', 'mixed_number', 'large_number', 'age', 'thousands', 'ordinal', 'number'),
+    'abbreviations': ('abbreviation',),
+    'years': ('year',),
+}
+
+# Category grammars kept compiled at most (least recently used are dropped)
+CATEGORY_GRAMMAR_CACHE_SIZE = 16
+
+def resolve_categories(categories):
+    """
+    Validate a collection of category names and return it as a frozenset.
+
+    A single name may be given as a string.
+
+    Raises:
+        ValueError: For an unknown category or an empty collection
+    """
+    if isinstance(categories, str):
+        categories = (categories,)
+    categories = frozenset(categories)
+    unknown = categories - GRAMMAR_CATEGORIES.keys()
+    if unknown:
+        raise ValueError(f"Unknown categor{'ies' if len(unknown) > 1 else 'y'}: {', '.join(sorted(unknown))} "
+                         f"(expected some of {', '.join(GRAMMAR_CATEGORIES)})")
+    if not categories:
+        raise ValueError("At least one category is needed")
+    return categories
+
+def category_grammar(categories):
+    """
+    Return the grammar with only the rules of the given categories.
+
+    The rules keep their priority order and the plain-word fallback, so text
+    that only the left-out rules would match is copied through unchanged.
+    Each distinct set of categories is compiled once and kept in a small LRU
+    cache (CATEGORY_GRAMMAR_CACHE_SIZE); all categories give
+    comprehensive_grammar itself.
+
+    Args:
+        categories: Category names (see GRAMMAR_CATEGORIES)
+
+    Returns:
+        PyParsing grammar object
+    """
+    return _category_grammar(resolve_categories(categories))
+
+@lru_cache(maxsize=CATEGORY_GRAMMAR_CACHE_SIZE)
+def _category_grammar(categories):
+    if categories == GRAMMAR_CATEGORIES.keys():
+        return comprehensive_grammar
+    names = {name for category in categories for name in GRAMMAR_CATEGORIES[category]}
+    grammar = pp.Or([rule for rule in _RULES if rule.resultsName in names] + [wordgrammar])
+    grammar.parseWithTabs()
+    # The rules are those of comprehensive_grammar, so they already go
+    # through token_cache
+    return grammar
+
+# Longest piece of text processed between two deadline checks
+DEADLINE_SEGMENT_LENGTH = 500
+
+# Degradation modes for text left over when a deadline is reached
+DEGRADE_MODES = ('numbers', 'passthrough')
+
+# Plain integers that stand on their own (not part of a date, decimal, time,
+# range or word), for the numbers-only fallback path
+_PLAIN_INTEGER = re.compile(r"(?<![\w.,:/-])\d{1,15}(?![\w%]|[.,:/-]\d)")
+
+class NormalizedText(str):
+    """
+    Normalized text returned by normalize_text() when a deadline is given.
+
+    Behaves exactly like str, and additionally records whether the deadline
+    was reached: `degraded` is True if some text did not get the full
+    grammar, and `degraded_chars` is how many input characters that was.
+    """
+
+    def __new__(cls, value, degraded=False, degraded_chars=0):
+        obj = super().__new__(cls, value)
+        obj.degraded = degraded
+        obj.degraded_chars = degraded_chars
+        return obj
+
+def normalize_numbers_only(text):
+    """
+    Cheap fallback normalization: spell out standalone integers only.
+
+    Used for the part of a text that is left when a deadline is reached.
+    """
+    return _PLAIN_INTEGER.sub(lambda m: digits_to_spoken(m.group()), text)
+
+def _normalize_within(text, deadline, degrade, grammar, categories=None):
+    """Normalize segment by segment until `deadline` seconds have passed."""
+    if degrade not in DEGRADE_MODES:
+        raise ValueError(f"Unknown degrade mode: {degrade!r} (expected one of {', '.join(DEGRADE_MODES)})")
+    if categories is not None and 'numbers' not in categories:
+        degrade = 'passthrough'
+
+    stop_at = time.perf_counter() + deadline
+    segments = split_segments(text, DEADLINE_SEGMENT_LENGTH)
+    parts = []
+    for index, segment in enumerate(segments):
+        if time.perf_counter() >= stop_at:
+            rest = "".join(segments[index:])
+            parts.append(normalize_numbers_only(rest) if degrade == 'numbers' else rest)
+            return NormalizedText("".join(parts), degraded=True, degraded_chars=len(rest))
+        parts.append(normalize_text(segment, grammar=grammar, categories=categories))
+    return NormalizedText("".join(parts))
+
+def normalize_text(text, deadline=None, degrade='numbers', profile=None, grammar=None,
+                   categories=None):
     """
     Normalize Norwegian text using the comprehensive grammar.
 
@@ -78,33 +266,124 @@ def normalize_text(text):
     - Abbreviations: ca. → "cirka"
     - Enhanced patterns: 10-15 → "ti til femten"
 
+    Only the parts of the text around numbers, abbreviations and fractions
+    are matched against the grammar (see pretokenizer.py).
+
+    With a deadline the text is processed segment by segment (see
+    segmentation.py). Once the time budget is spent, the remaining text is
+    either passed through the cheap numbers-only path (degrade='numbers') or
+    left unchanged (degrade='passthrough'), and the returned NormalizedText
+    has `degraded` set.
+
+    `profile` selects the lexicon variant profile (see lexicon.py) for this
+    call only; by default the active profile is used.
+
+    `grammar` is the compiled grammar to match with (default:
+    comprehensive_grammar); a Normalizer passes its own copy.
+
+    `categories` restricts normalization to some rule categories, e.g.
+    {'numbers', 'dates'} (see GRAMMAR_CATEGORIES and category_grammar()).
+    Without 'numbers', Unicode fractions and superscripts are left as they
+    are and text over a deadline is passed through.
+
     Args:
         text (str): Input Norwegian text to normalize
+        deadline (float): Optional time budget in seconds
+        degrade (str): What to do with text left when the budget is spent
+        profile (str): Optional lexicon profile, e.g. 'bokmal' or 'nynorsk'
+        grammar: Optional grammar to use instead of comprehensive_grammar
+        categories: Optional rule categories to restrict normalization to
 
     Returns:
         str: Normalized text with patterns converted to spoken Norwegian
+            (a NormalizedText when a deadline is given)
     """
     if not text or not isinstance(text, str):
         return text
 
-    # Get all matches from the grammar
-    matches = comprehensive_grammar.searchString(text)
+    if profile is not None:
+        with use_profile(profile):
+            return normalize_text(text, deadline, degrade, grammar=grammar, categories=categories)
+
+    if categories is not None:
+        if grammar is not None:
+            raise ValueError("grammar and categories cannot both be given")
+        categories = resolve_categories(categories)
+
+    if deadline is not None:
+        return _normalize_within(text, deadline, degrade, grammar, categories)
+
+    if categories is not None:
+        grammar = _category_grammar(categories)
+        if 'numbers' not in categories:
+            return _normalize_windows(text, grammar)
+    text = expand_unicode_symbols(text)
+    return expand_fractions(_normalize_windows(text, grammar or comprehensive_grammar))
 
-    if not matches:
+def _normalize_windows(text, grammar):
+    """Apply `grammar` to the candidate windows of `text`."""
+    if not has_candidates(text):
         return text
 
-    # Collect all normalized replacements with their positions
+    # Only the windows around candidate tokens go through the grammar; the
+    # plain text between them is copied as is (see pretokenizer.py)
+    parts = []
+    position = 0
+    for start, end in candidate_windows(text):
+        parts.append(text[position:start])
+        parts.append(_apply_grammar(text[start:end], grammar))
+        position = end
+    if not parts:
+        return text
+    parts.append(text[position:])
+    return "".join(parts)
+
+def _apply_grammar(text, grammar):
+    """Scan `text` with `grammar` and apply every replacement."""
+    return apply_replacements(text, expand_matches(text, scan_matches(text, grammar)))
+
+def scan_matches(text, grammar):
+    """
+    Return grammar.scanString(text) with match positions that index `text`.
+
+    Replacements are spliced in at the positions of their matches, so a
+    grammar that expands tabs before scanning (pyparsing's default) is
+    scanned through a copy that keeps them.
+    """
+    if not grammar.keepTabs and "\t" in text:
+        grammar = grammar.copy().parseWithTabs()
+    return grammar.scanString(text)
+
+def expand_matches(text, matches):
+    """
+    Turn grammar matches into replacements.
+
+    Args:
+        text (str): The scanned text
+        matches: (tokens, start, end) triples from scan_matches(text, grammar)
+
+    Returns:
+        list of (position, length, spoken) tuples
+    """
+    # The original text is located inside the span of its own match, so a
+    # replacement is always applied where it was matched, never at an
+    # earlier occurrence.
     replacements = []
-    for match in matches:
-        if len(match) > 0:
-            first_element = match[0]
+    counts = None
+    for tokens, start, end in matches:
+        rule = tokens.get_name()
+        if rule in _RULE_NAMES:
+            if counts is None:
+                counts = _thread_rule_counts()
+            counts[rule] += 1
+        if len(tokens) > 0:
+            first_element = tokens[0]
 
             # Check if this is a normalized pattern
             if isinstance(first_element, tuple) and len(first_element) == 2:
                 original_text = str(first_element[0])
                 normalized_text = str(first_element[1])
-                # Find position of original text in the remaining text
-                pos = text.find(original_text)
+                pos = text.find(original_text, start, end)
                 if pos != -1:
                     replacements.append((pos, len(original_text), normalized_text))
             elif hasattr(first_element, '__len__') and len(first_element) > 0:
@@ -113,23 +392,173 @@ def normalize_text(text):
                 if isinstance(nested_item, tuple) and len(nested_item) == 2:
                     original_text = str(nested_item[0])
                     normalized_text = str(nested_item[1])
-                    pos = text.find(original_text)
+                    pos = text.find(original_text, start, end)
                     if pos != -1:
                         replacements.append((pos, len(original_text), normalized_text))
+    return replacements
 
-    # Sort replacements by position (reverse order to avoid index shifts)
-    replacements.sort(key=lambda x: x[0], reverse=True)
+def apply_replacements(text, replacements):
+    """Apply (position, length, spoken) replacements from expand_matches() to `text`."""
+    if not replacements:
+        return text
 
-    # Apply replacements from right to left
+    # Apply replacements from right to left (to avoid index shifts)
     result = text
-    for pos, length, replacement in replacements:
+    for pos, length, replacement in sorted(replacements, key=lambda x: x[0], reverse=True):
         result = result[:pos] + replacement + result[pos + length:]
 
     return result
 
+# Modules whose rules, tables and code determine the normalization output
+# (pretokenizer, segmentation and token_cache decide which text the grammar
+# sees and when a result is reused)
+GRAMMAR_MODULES = (
+    'lexicon',
+    'number_grammar_reverse',
+    'year_grammar_reverse',
+    'date_grammar_reverse',
+    'time_grammar_reverse',
+    'abbrev_grammar_reverse',
+    'enhanced_patterns_grammar_reverse',
+    'pretokenizer',
+    'segmentation',
+    'token_cache',
+    'grammar',
+)
+
+# Lookup tables that feed the parse actions: (module, attribute)
+RULESET_TABLES = (
+    ('lexicon', 'ONES'),
+    ('lexicon', 'TEENS'),
+    ('lexicon', 'TENS'),
+    ('lexicon', 'SCALES'),
+    ('lexicon', 'ordinals_dict'),
+    ('lexicon', 'months'),
+    ('lexicon', 'abbrevdict_forward'),
+    ('lexicon', 'PROFILES'),
+    ('number_grammar_reverse', 'MAX_SPOKEN_DIGITS'),
+    ('lexicon', 'FRACTIONS'),
+)
+
+def _describe_element(element, seen):
+    """Return a JSON-serializable description of a grammar element tree."""
+    if id(element) in seen:
+        return ["ref", seen[id(element)]]
+    seen[id(element)] = len(seen)
+
+    description = {"type": type(element).__name__}
+    if isinstance(element, pp.Regex):
+        description["pattern"] = element.pattern
+        description["flags"] = int(element.flags)
+    elif isinstance(element, pp.Literal):
+        description["match"] = element.match
+    elif isinstance(element, pp.Word):
+        description["init"] = sorted(element.initChars)
+        description["body"] = sorted(element.bodyChars)
+        description["min"] = element.minLen
+        description["max"] = element.maxLen
+    elif isinstance(element, (pp.WordStart, pp.WordEnd)):
+        description["chars"] = sorted(element.wordChars)
+    if element.parseAction:
+        description["actions"] = [action.__name__ for action in element.parseAction]
+    if isinstance(element, pp.ParseExpression):
+        description["exprs"] = [_describe_element(e, seen) for e in element.exprs]
+    elif isinstance(element, pp.ParseElementEnhance) and element.expr is not None:
+        description["expr"] = _describe_element(element.expr, seen)
+    return description
+
+_DOCSTRING_OWNERS = (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)
+
+def _describe_code(module):
+    """
+    Return a digest of the code of a module: its syntax tree without
+    docstrings, so comment, docstring and formatting edits leave it alone
+    but any change to parse actions or their helpers does not. None if the
+    source is not available.
+    """
+    try:
+        tree = ast.parse(inspect.getsource(module))
+    except (OSError, TypeError):
+        return None
+    for node in ast.walk(tree):
+        if not isinstance(node, _DOCSTRING_OWNERS):
+            continue
+        first = node.body[0]
+        if isinstance(first, ast.Expr) and isinstance(first.value, ast.Constant) \
+                and isinstance(first.value.value, str):
+            node.body = node.body[1:] or [ast.Pass()]
+    return hashlib.sha256(ast.dump(tree).encode('utf-8')).hexdigest()
+
+def describe_ruleset():
+    """
+    Describe everything that determines the normalization output.
+
+    The description covers the structure and regex sources of the
+    comprehensive grammar, the lookup tables in RULESET_TABLES, the code of
+    every module in GRAMMAR_MODULES (parse actions and the functions they
+    call; see _describe_code) and their __version__. A logic change thus
+    changes the fingerprint even without a version bump.
+
+    Returns:
+        dict: Description with "grammar", "tables", "code" and "versions" keys
+    """
+    modules = {name: importlib.import_module(name) for name in GRAMMAR_MODULES}
+    return {
+        "grammar": _describe_element(comprehensive_grammar, {}),
+        "tables": {
+            f"{module}.{attr}": getattr(modules[module], attr)
+            for module, attr in RULESET_TABLES
+        },
+        "code": {name: _describe_code(module) for name, module in modules.items()},
+        "versions": {name: getattr(module, '__version__', None) for name, module in modules.items()},
+    }
+
+@lru_cache(maxsize=None)
+def grammar_fingerprint():
+    """
+    Return a stable fingerprint of the normalization rule set.
+
+    The fingerprint is a hex digest of describe_ruleset() in canonical JSON
+    form. It only changes when a rule, table or module version changes, so it
+    is identical across processes, hosts and restarts of the same grammar.
+    Caches and dataset outputs record it to avoid serving stale results.
+    It is kept in the startup snapshot (see snapshot.py).
+
+    Returns:
+        str: Hex digest identifying the current rule set
+    """
+    return snapshot.table('grammar.fingerprint', _compute_fingerprint)
+
+def _compute_fingerprint():
+    canonical = json.dumps(describe_ruleset(), sort_keys=True, ensure_ascii=False,
+                           separators=(",", ":"), default=sorted)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
 # Export the main functions and grammar
 __all__ = [
+    'apply_replacements',
+    'category_grammar',
+    'CATEGORY_GRAMMAR_CACHE_SIZE',
     'comprehensive_grammar',
+    'describe_ruleset',
+    'expand_matches',
     'get_grammar',
-    'normalize_text'
-]
\ No newline at end of file
+    'GRAMMAR_CATEGORIES',
+    'GRAMMAR_RULES',
+    'grammar_fingerprint',
+    'normalize_numbers_only',
+    'normalize_text',
+    'NormalizedText',
+    'resolve_categories',
+    'rule_matches',
+    'scan_matches',
+    'token_cache',
+]
+
+# Module metadata
+__version__ = '2.1.0'
+
+# Write the startup snapshot if this import had to build any of its tables
+if snapshot.needs_save():
+    grammar_fingerprint()
+    snapshot.save()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Incremental Normalization for Edited Documents
+
+Keeps a normalized copy of a document up to date while it is being edited.
+The document is split into independently normalizable segments (see
+segmentation.py) and every segment's output is cached by its content. After
+an edit only the segments around the changed region are re-split, and only
+segments whose content is new are normalized, so the cost of an update
+depends on the size of the edit rather than the size of the document.
+
+Usage:
+    doc = IncrementalNormalizer()
+    preview = doc.update(manuscript)            # full text on every save
+    preview = doc.edit(120, 125, "3. juni")     # or just the changed span
+"""
+
+from bisect import bisect_right
+from collections import OrderedDict
+
+from grammar import normalize_text
+from segmentation import split_segments
+
+DEFAULT_CACHE_SIZE = 100_000
+
+# Granularity used when searching for the common prefix/suffix of two texts
+_COMPARE_CHUNK = 4096
+
+
+def _common_prefix_length(a, b, limit):
+    """Length of the common prefix of a and b, at most `limit` (C-level slice compares)."""
+    pos = 0
+    while pos < limit:
+        step = min(_COMPARE_CHUNK, limit - pos)
+        if a[pos:pos + step] == b[pos:pos + step]:
+            pos += step
+            continue
+        while step > 1:
+            half = step // 2
+            if a[pos:pos + half] == b[pos:pos + half]:
+                pos += half
+                step -= half
+            else:
+                step = half
+        return pos if a[pos] != b[pos] else pos + 1
+    return limit
+
+
+def _common_suffix_length(a, b, limit):
+    """Length of the common suffix of a and b, at most `limit`."""
+    pos = 0
+    len_a = len(a)
+    len_b = len(b)
+    while pos < limit:
+        step = min(_COMPARE_CHUNK, limit - pos)
+        if a[len_a - pos - step:len_a - pos] == b[len_b - pos - step:len_b - pos]:
+            pos += step
+            continue
+        while step > 1:
+            half = step // 2
+            if a[len_a - pos - half:len_a - pos] == b[len_b - pos - half:len_b - pos]:
+                pos += half
+                step -= half
+            else:
+                step = half
+        return pos if a[len_a - pos - 1] != b[len_b - pos - 1] else pos + 1
+    return limit
+
+
+class IncrementalNormalizer:
+    """
+    Normalized view of one document that is updated edit by edit.
+
+    Args:
+        normalize_fn: Function used to normalize a single segment
+        cache_size (int): Maximum number of cached segment results (LRU)
+    """
+
+    def __init__(self, normalize_fn=normalize_text, cache_size=DEFAULT_CACHE_SIZE):
+        self.normalize_fn = normalize_fn
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._text = ""
+        self._segments = []   # segment texts, in document order
+        self._starts = []     # start offset of each segment
+        self._outputs = []    # normalized text of each segment
+
+    @property
+    def text(self):
+        """The current source text."""
+        return self._text
+
+    @property
+    def normalized(self):
+        """The normalized text of the current document."""
+        return "".join(self._outputs)
+
+    def _normalize_segment(self, segment):
+        cached = self._cache.get(segment)
+        if cached is not None:
+            self._cache.move_to_end(segment)
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        result = self.normalize_fn(segment)
+        self._cache[segment] = result
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+    def update(self, text):
+        """
+        Replace the document with `text` and return its normalized form.
+
+        The changed region is found by comparing against the previous text, so
+        callers can simply pass the full document on every save.
+        """
+        old = self._text
+        limit = min(len(old), len(text))
+        prefix = _common_prefix_length(old, text, limit)
+        suffix = _common_suffix_length(old, text, limit - prefix)
+        return self._apply(text, prefix, len(old) - suffix, len(text) - suffix)
+
+    def edit(self, start, end, replacement):
+        """
+        Replace text[start:end] with `replacement` and return the normalized document.
+        """
+        if not 0 <= start <= end <= len(self._text):
+            raise IndexError(f"Edit span {start}:{end} outside document of length {len(self._text)}")
+        text = self._text[:start] + replacement + self._text[end:]
+        return self._apply(text, start, end, start + len(replacement))
+
+    def _apply(self, text, start, old_end, new_end):
+        """
+        Re-segment around the change old[start:old_end] -> text[start:new_end].
+        """
+        if not self._segments:
+            self._set_segments(0, 0, split_segments(text))
+            self._text = text
+            return self.normalized
+
+        # Segments touching the change, widened by one neighbor on each side so
+        # the re-split region is bounded by two unchanged segments.
+        first = max(bisect_right(self._starts, start) - 2, 0)
+        last = min(bisect_right(self._starts, max(old_end - 1, start)) + 1, len(self._segments))
+
+        region_start = self._starts[first]
+        region_old_end = self._starts[last] if last < len(self._segments) else len(self._text)
+        region_new_end = region_old_end + (new_end - old_end)
+
+        self._set_segments(first, last, split_segments(text[region_start:region_new_end]))
+        self._text = text
+        return self.normalized
+
+    def _set_segments(self, first, last, segments):
+        """Replace segments[first:last] with `segments` and fix up offsets."""
+        offset = self._starts[first] if first < len(self._starts) else 0
+        starts = []
+        for segment in segments:
+            starts.append(offset)
+            offset += len(segment)
+
+        shift = offset - (self._starts[last] if last < len(self._starts) else len(self._text))
+        tail = self._starts[last:]
+        if shift:
+            tail = [position + shift for position in tail]
+
+        self._segments[first:last] = segments
+        self._outputs[first:last] = [self._normalize_segment(segment) for segment in segments]
+        self._starts[first:] = starts + tail
+
+
+__all__ = ['IncrementalNormalizer']
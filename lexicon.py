@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Lexicon and Variant Profiles for Norwegian Text Normalizer
+
+All word tables used by the grammar modules live here: number words, scale
+words, ordinals, fractions, month names and abbreviation expansions. Many entries have
+alternative forms ("sjuende"/"syvende", "tjuende"/"tyvende", "blant
+annet"/"blant anna"). A profile picks one form for every entry, and each
+profile is compiled once at import into flat lookup tables (a Lexicon).
+
+Parse actions read the tables of the lexicon that is active for the current
+call, so one process can serve several voice styles with a single grammar:
+
+    with use_profile('nynorsk'):
+        normalize_text("Møte 1. mai ca. kl. 12")
+
+The default profile ('bokmal') gives the same output as the first form of
+every entry.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import snapshot
+
+###############################################################################
+# 1) Base tables (Bokmål, first form is the default)
+###############################################################################
+
+ONES = [
+    "null",  # 0
+    "en",    # 1
+    "to",    # 2
+    "tre",   # 3
+    "fire",  # 4
+    "fem",   # 5
+    "seks",  # 6
+    "sju",   # 7
+    "åtte",  # 8
+    "ni",    # 9
+]
+TEENS = {
+    10: "ti",
+    11: "elleve",
+    12: "tolv",
+    13: "tretten",
+    14: "fjorten",
+    15: "femten",
+    16: "seksten",
+    17: "sytten",
+    18: "atten",
+    19: "nitten",
+}
+TENS = {
+    20: "tjue",
+    30: "tretti",
+    40: "førti",
+    50: "femti",
+    60: "seksti",
+    70: "sytti",
+    80: "åtti",
+    90: "nitti",
+}
+
+# Scale words for groups of three digits above the thousands, as
+# (singular, plural). Index 0 is 10^6, index 1 is 10^9, and so on.
+SCALES = [
+    ("million", "millioner"),            # 10^6
+    ("milliard", "milliarder"),          # 10^9
+    ("billion", "billioner"),            # 10^12
+    ("billiard", "billiarder"),          # 10^15
+    ("trillion", "trillioner"),          # 10^18
+    ("trilliard", "trilliarder"),        # 10^21
+    ("kvadrillion", "kvadrillioner"),    # 10^24
+    ("kvadrilliard", "kvadrilliarder"),  # 10^27
+    ("kvintillion", "kvintillioner"),    # 10^30
+    ("kvintilliard", "kvintilliarder"),  # 10^33
+]
+
+# Day ordinals with their alternative forms
+ordinals_dict = {
+    1: ["første", "fyrste"],
+    2: ["andre"],
+    3: ["tredje"],
+    4: ["fjerde"],
+    5: ["femte"],
+    6: ["sjette"],
+    7: ["sjuende", "syvende"],
+    8: ["åttende", "åttande"],
+    9: ["niende", "niande"],
+    10: ["tiende", "tiande"],
+    11: ["ellevte"],
+    12: ["tolvte"],
+    13: ["trettende", "trettande"],
+    14: ["fjortende", "fjortande"],
+    15: ["femtende", "femtande"],
+    16: ["sekstende", "sekstande"],
+    17: ["syttende", "syttande"],
+    18: ["attende", "attande"],
+    19: ["nittende", "nittande"],
+    20: ["tjuende", "tyvende", "tjuande"],
+    21: ["tjueførste", "tjuefyrste", "énogtyvende", "énogtjuende"],
+    22: ["tjueandre", "toogtyvende", "toogtjuende"],
+    23: ["tjuetredje", "treogtyvende", "treogtjuende"],
+    24: ["tjuefjerde", "fireogtyvende", "fireogtjuende"],
+    25: ["tjuefemte", "femogtyvende", "femogtjuende"],
+    26: ["tjuesjette", "seksogtyvende", "seksogtjuende"],
+    27: ["tjuesjuende", "tjuesyvende", "syvogtyvende", "syvogtjuende"],
+    28: ["tjueåttende", "tjueåttande", "åtteogtyvende", "åtteogtjuende"],
+    29: ["tjueniende", "tjueniande", "niogtyvende", "niogtjuende"],
+    30: ["trettiende", "trettiande"],
+    31: ["trettiførste", "trettifyrste", "énogtrettiende"],
+}
+
+# Unicode fraction characters -> (numerator, denominator). The spoken forms
+# are built from the number words and ordinals of each profile.
+FRACTIONS = {
+    '¼': (1, 4),
+    '½': (1, 2),
+    '¾': (3, 4),
+    '⅐': (1, 7),
+    '⅑': (1, 9),
+    '⅒': (1, 10),
+    '⅓': (1, 3),
+    '⅔': (2, 3),
+    '⅕': (1, 5),
+    '⅖': (2, 5),
+    '⅗': (3, 5),
+    '⅘': (4, 5),
+    '⅙': (1, 6),
+    '⅚': (5, 6),
+    '⅛': (1, 8),
+    '⅜': (3, 8),
+    '⅝': (5, 8),
+    '⅞': (7, 8),
+}
+
+months = {
+    1: "januar",
+    2: "februar",
+    3: "mars",
+    4: "april",
+    5: "mai",
+    6: "juni",
+    7: "juli",
+    8: "august",
+    9: "september",
+    10: "oktober",
+    11: "november",
+    12: "desember",
+}
+
+# Spelled-out form -> abbreviation. Several forms can share an abbreviation;
+# the first one listed is the default expansion.
+abbrevdict_forward = {
+    "blant annet": "bl.a.",
+    "blant anna": "bl.a.",
+    "cirka": "ca.",
+    "sirka": "ca.",
+    "centimeter": "cm",
+    "det vil si": "dvs.",
+    "et cetera": "etc.",
+    "for eksempel": "f.eks.",
+    "fylkesvei": "fv.",
+    "kilobyte": "kB",
+    "kilometer i timen": "km/t",
+    "kilowattimer": "kWh",
+    "klokka": "kl.",
+    "klokken": "kl.",
+    "mellom anna": "m.a.",
+    "megabyte": "MB",
+    "millimeter": "mm",
+    "og liknende": "o.l.",
+    "parts per million": "p.p.m",
+    "riksvei": "rv.",
+    "til dømes": "t.d.",
+    "terrawattimer": "TWh",
+    "jamfør": "jf.",
+    "det vil seie": "dvs.",
+    "fylkesveg": "fv.",
+    "jevnfør": "jf.",
+    "kilowattimar": "kWh",
+    "og lignende": "o.l.",
+    "og liknande": "o.l.",
+    "riksveg": "rv.",
+    "terawattimar": "TWh",
+    "terawattimer": "TWh",
+    "dekar": "daa",
+    "desibel": "dB",
+    "elektronisk post": "e-post",
+    "desiliter": "dl",
+    "desimeter": "dm",
+    "eller liknende": "e.l.",
+    "eller lignende": "e.l.",
+    "eller liknande": "e.l.",
+    "fra og med": "f.o.m.",
+    "gigabyte": "GB",
+    "gigawatt": "GW",
+    "kilobit": "kb",
+    "kilo": "kg",
+    "kilogram": "kg",
+    "kilometer": "km",
+    "kilovolt": "kV",
+    "kvadratmeter": "kvm",
+    "kilowatt": "kW",
+    "megabit": "Mb",
+    "milliliter": "ml",
+    "millivolt": "mV",
+    "megavolt": "MV",
+    "milliwatt": "mW",
+    "megawatt": "MW",
+    "og så bortetter": "osb.",
+    "og så vidare": "osv.",
+    "og så videre": "osv.",
+    "på grunn av": "pga.",
+    "petabyte": "PB",
+    "petawatt": "PW",
+    "terabyte": "TB",
+    "terrabyte": "TB",
+    "til og med": "t.o.m.",
+    "terawatt": "TW",
+    "terrawatt": "TW",
+    "til eksempel": "t.eks.",
+}
+
+###############################################################################
+# 2) Variant profiles
+#
+#    A profile overrides number words and lists the forms it prefers. For an
+#    ordinal, the first form containing one of `ordinal_markers` (tried in
+#    order) is used; for an abbreviation, the first expansion that is in
+#    `expansions`. Everything else falls back to the first form.
+###############################################################################
+
+DEFAULT_PROFILE = 'bokmal'
+
+PROFILES = {
+    'bokmal': {},
+    'bokmal_tradisjonell': {
+        'ones': {7: "syv"},
+        'tens': {20: "tyve"},
+        'ordinal_markers': ("tyv", "syv"),
+        'expansions': ("klokken", "og lignende", "eller lignende", "jevnfør"),
+    },
+    'nynorsk': {
+        'ones': {1: "ein"},
+        'hundred': "eitt hundre",
+        'one': "ein",
+        'scales': [(singular, singular + "ar") for singular, _ in SCALES],
+        'plural': "ar",
+        'ordinal_markers': ("fyrste", "ande"),
+        'expansions': (
+            "blant anna", "det vil seie", "fylkesveg", "kilowattimar",
+            "mellom anna", "og liknande", "eller liknande", "riksveg",
+            "terawattimar", "til dømes", "og så vidare",
+        ),
+    },
+}
+
+
+class Lexicon:
+    """
+    Flat lookup tables for one profile.
+
+    Attributes:
+        name (str): Profile name
+        ones, teens, tens: Number words, as ONES/TEENS/TENS
+        scales: (singular, plural) scale words, as SCALES
+        one (str): Article before a singular scale word ("en million")
+        groups (list): Spoken form of 0-999, indexed by value ("" for 0)
+        ordinals (dict): Day number -> ordinal
+        fractions (dict): Fraction character -> spoken form ("en halv")
+        months (dict): Month number -> name
+        abbreviations (dict): Abbreviation -> expansion
+    """
+
+    def __init__(self, name, spec):
+        self.name = name
+        self.ones = list(ONES)
+        for digit, word in spec.get('ones', {}).items():
+            self.ones[digit] = word
+        self.teens = dict(TEENS)
+        self.tens = dict(TENS)
+        self.tens.update(spec.get('tens', {}))
+        self.scales = list(spec.get('scales', SCALES))
+        self.one = spec.get('one', "en")
+        self.hundred = spec.get('hundred', "ett hundre")
+        self.groups = [""] + [self._below_thousand(num) for num in range(1, 1000)]
+
+        markers = spec.get('ordinal_markers', ())
+        self.ordinals = {
+            day: _pick(forms, markers)
+            for day, forms in ordinals_dict.items()
+        }
+        plural = spec.get('plural', "er")
+        self.fractions = {
+            char: self._fraction(numerator, denominator, plural)
+            for char, (numerator, denominator) in FRACTIONS.items()
+        }
+        self.months = dict(months)
+
+        preferred = set(spec.get('expansions', ()))
+        expansions = {}
+        for spelled_out, abbr in abbrevdict_forward.items():
+            expansions.setdefault(abbr, []).append(spelled_out)
+        self.abbreviations = {
+            abbr: next((form for form in forms if form in preferred), forms[0])
+            for abbr, forms in expansions.items()
+        }
+
+    def _below_thousand(self, num):
+        """Spell out 1-999 ("ett hundre og tjue tre")."""
+        parts = []
+        hundreds, rest = divmod(num, 100)
+        if hundreds:
+            parts.append(self.hundred if hundreds == 1 else f"{self.ones[hundreds]} hundre")
+            if rest:
+                parts.append("og")
+        if rest:
+            if rest < 10:
+                parts.append(self.ones[rest])
+            elif rest < 20:
+                parts.append(self.teens[rest])
+            else:
+                parts.append(self.tens[rest - rest % 10])
+                if rest % 10:
+                    parts.append(self.ones[rest % 10])
+        return " ".join(parts)
+
+    def _fraction(self, numerator, denominator, plural):
+        """Spell out a simple fraction ("en halv", "tre fjerdedeler")."""
+        if denominator == 2:
+            return f"{self.one} halv"
+        part = self.ordinals[denominator] + "del"
+        if numerator == 1:
+            return f"{self.one} {part}"
+        return f"{self.ones[numerator]} {part}{plural}"
+
+    def __repr__(self):
+        return f"Lexicon({self.name!r})"
+
+
+def _pick(forms, markers):
+    """Return the first form containing the earliest marker, else forms[0]."""
+    for marker in markers:
+        for form in forms:
+            if marker in form:
+                return form
+    return forms[0]
+
+
+# Every profile, compiled once (or loaded from the startup snapshot)
+LEXICONS = snapshot.table(
+    'lexicon.LEXICONS',
+    lambda: {name: Lexicon(name, spec) for name, spec in PROFILES.items()},
+)
+
+_active = ContextVar('lexicon', default=LEXICONS[DEFAULT_PROFILE])
+
+
+def get_lexicon(profile=None):
+    """Return the compiled Lexicon for a profile name (None: the active one)."""
+    if profile is None:
+        return _active.get()
+    try:
+        return LEXICONS[profile]
+    except KeyError:
+        raise ValueError(
+            f"Unknown profile: {profile!r} (expected one of {', '.join(LEXICONS)})"
+        ) from None
+
+
+def current_lexicon():
+    """Return the Lexicon active in the current context."""
+    return _active.get()
+
+
+@contextmanager
+def use_profile(profile=None):
+    """Make `profile` the active lexicon inside the block (None: keep the current one)."""
+    if profile is None:
+        yield _active.get()
+        return
+    token = _active.set(get_lexicon(profile))
+    try:
+        yield token.var.get()
+    finally:
+        _active.reset(token)
+
+
+__all__ = [
+    'DEFAULT_PROFILE',
+    'FRACTIONS',
+    'LEXICONS',
+    'Lexicon',
+    'PROFILES',
+    'current_lexicon',
+    'get_lexicon',
+    'use_profile',
+]
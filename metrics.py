@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Metrics for Norwegian Text Normalizer (Prometheus text format)
+
+A small metrics registry with counters, gauges and histograms, exported in
+the Prometheus text exposition format to a file (for batch jobs, e.g. the
+node_exporter textfile collector) or over HTTP (for long-running services).
+
+The normalizer metrics are recorded at the call sites that already hand out
+work (the command-line tool and the dataset script), once per text, never
+inside grammar.normalize_text. Per-rule match counts and token cache hit
+rates are not counted again: they are read from the token cache's own
+statistics when the metrics are exported.
+
+Worker processes have registries of their own. A worker returns
+REGISTRY.take_delta() with its results and the parent merges it, so the
+parent's export covers the whole pool:
+
+    # worker
+    metrics.observe(text, normalized, seconds)
+    return result, metrics.REGISTRY.take_delta()
+
+    # parent
+    metrics.REGISTRY.merge(delta)
+    metrics.REGISTRY.write('/var/lib/node_exporter/normalizer.prom')
+
+    server = metrics.REGISTRY.serve(9108)   # http://host:9108/metrics
+"""
+
+import bisect
+import os
+import threading
+from collections import namedtuple
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Content type of the text exposition format
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# A metric family produced by a collector: samples are (labels, value), with
+# labels a tuple of (name, value) pairs
+Family = namedtuple('Family', ['name', 'kind', 'help', 'samples'])
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric:
+    """Base class: a named metric with optional labels."""
+
+    kind = None
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        # Metrics without labels are exported (as 0) before their first update
+        self._values = {} if self.labelnames or self.kind == 'histogram' else {(): 0}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        try:
+            return tuple(str(labels[name]) for name in self.labelnames)
+        except KeyError as e:
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}") from e
+
+    def _labels(self, key):
+        return tuple(zip(self.labelnames, key))
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        if amount < 0:
+            raise ValueError(f"counter {self.name} can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, self._labels(key), value) for key, value in self._values.items()]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down (not merged from workers)."""
+
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, self._labels(key), value) for key, value in self._values.items()]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed buckets."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # One count per bucket plus +Inf, then the sum of all values
+                state = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[index] += 1
+            state[-1] += value
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            items = [(key, list(state)) for key, state in self._values.items()]
+        for key, state in items:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), state):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", labels + (('le', _format_value(float(bound))),), cumulative))
+            samples.append((f"{self.name}_sum", labels, state[-1]))
+            samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+
+class Registry:
+    """
+    A set of metrics plus collectors evaluated at export time.
+
+    Collectors are zero-argument callables returning Family tuples; they
+    expose statistics that are kept elsewhere (e.g. the token cache).
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._remote = {}
+        self._lock = threading.Lock()
+
+    def _add(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name!r} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self._add(Counter(name, help, labelnames))
+
+    def gauge(self, name, help, labelnames=()):
+        return self._add(Gauge(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._add(Histogram(name, help, labelnames, buckets))
+
+    def register_collector(self, collector):
+        """Add a callable returning Family tuples, evaluated on every export."""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def take_delta(self):
+        """
+        Return the counts recorded since the last call and reset them (for workers).
+
+        Counters and histograms are returned as increments; collector values
+        are returned as current totals, keyed by process id. Gauges stay local.
+        """
+        values = {}
+        for metric in list(self._metrics.values()):
+            if metric.kind == 'gauge':
+                continue
+            with metric._lock:
+                if metric._values:
+                    values[metric.name] = metric._values
+                    metric._values = {}
+        return {'pid': os.getpid(), 'values': values, 'collected': self._collect_local()}
+
+    def merge(self, delta):
+        """Add a worker's take_delta() result to this registry."""
+        for name, values in delta['values'].items():
+            metric = self._metrics.get(name)
+            if metric is None:
+                continue
+            with metric._lock:
+                for key, value in values.items():
+                    if metric.kind == 'histogram':
+                        state = metric._values.setdefault(key, [0] * (len(metric.buckets) + 1) + [0.0])
+                        for i, count in enumerate(value):
+                            state[i] += count
+                    else:
+                        metric._values[key] = metric._values.get(key, 0) + value
+        with self._lock:
+            self._remote[delta['pid']] = delta['collected']
+
+    def _collect_local(self):
+        families = []
+        for collector in list(self._collectors):
+            families.extend(collector())
+        return families
+
+    def _collected(self):
+        """Collector families of this process and of merged workers, summed by labels."""
+        with self._lock:
+            remote = list(self._remote.values())
+        merged = {}
+        for families in [self._collect_local()] + remote:
+            for family in families:
+                name, kind, help, totals = merged.setdefault(family.name, (family.name, family.kind, family.help, {}))
+                for labels, value in family.samples:
+                    totals[labels] = totals.get(labels, 0) + value
+        families = [
+            Family(name, kind, help, list(totals.items()))
+            for name, kind, help, totals in merged.values()
+        ]
+        hits = merged.get('normalizer_cache_hits_total')
+        misses = merged.get('normalizer_cache_misses_total')
+        if hits and misses:
+            ratios = []
+            for labels, hit_count in hits[3].items():
+                lookups = hit_count + misses[3].get(labels, 0)
+                ratios.append((labels, hit_count / lookups if lookups else 0.0))
+            families.append(Family('normalizer_cache_hit_ratio', 'gauge',
+                                   'Share of cache lookups that found a result', ratios))
+        return families
+
+    def expose(self):
+        """Return all metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        for family in self._collected():
+            lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for labels, value in family.samples:
+                lines.append(f"{family.name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Write the metrics to `path`, replacing it atomically."""
+        import tempfile
+
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.metrics-')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(self.expose())
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def serve(self, port, host=''):
+        """
+        Serve the metrics over HTTP from a background thread.
+
+        Returns:
+            http.server.ThreadingHTTPServer (call shutdown() to stop it)
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = registry.expose().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        thread = threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True)
+        thread.start()
+        return server
+
+
+def cache_families(cache, stats):
+    """
+    Families for a cache's hit and miss totals.
+
+    Args:
+        cache (str): Value of the `cache` label, e.g. 'token' or 'shared'
+        stats (dict): Current totals with 'hits' and 'misses'
+    """
+    labels = (('cache', cache),)
+    return [
+        Family('normalizer_cache_hits_total', 'counter', 'Cache lookups that found a result',
+               [(labels, stats['hits'])]),
+        Family('normalizer_cache_misses_total', 'counter', 'Cache lookups that found nothing',
+               [(labels, stats['misses'])]),
+    ]
+
+
+def _token_cache_collector():
+    from grammar import token_cache
+
+    return cache_families('token', {'hits': token_cache.hits, 'misses': token_cache.misses})
+
+
+def _rule_collector():
+    from grammar import rule_matches
+
+    return [Family(
+        'normalizer_rule_matches_total', 'counter', 'Matches the grammar accepted, per rule',
+        [((('rule', rule),), matches) for rule, matches in rule_matches().items()],
+    )]
+
+
+REGISTRY = Registry()
+REGISTRY.register_collector(_token_cache_collector)
+REGISTRY.register_collector(_rule_collector)
+
+REQUESTS = REGISTRY.counter('normalizer_requests_total', 'Texts normalized')
+LINES = REGISTRY.counter('normalizer_lines_total', 'Input lines (records) processed')
+CHARS = REGISTRY.counter('normalizer_chars_total', 'Characters of input text normalized')
+DEGRADED = REGISTRY.counter('normalizer_degraded_total', 'Texts that ran over their time budget')
+ERRORS = REGISTRY.counter('normalizer_errors_total', 'Texts that failed to normalize', ('error',))
+LATENCY = REGISTRY.histogram('normalizer_latency_seconds', 'Time to normalize one text')
+QUEUE_DEPTH = REGISTRY.gauge('normalizer_queue_depth', 'Chunks handed to workers and not yet written')
+
+
+def observe(text, normalized, seconds):
+    """Record one normalized text: request, characters, latency and time budget."""
+    REQUESTS.inc()
+    CHARS.inc(len(text))
+    LATENCY.observe(seconds)
+    if getattr(normalized, 'degraded', False):
+        DEGRADED.inc()
+
+
+__all__ = [
+    'CHARS',
+    'CONTENT_TYPE',
+    'Counter',
+    'DEGRADED',
+    'ERRORS',
+    'Family',
+    'Gauge',
+    'Histogram',
+    'LATENCY',
+    'LATENCY_BUCKETS',
+    'LINES',
+    'QUEUE_DEPTH',
+    'REGISTRY',
+    'REQUESTS',
+    'Registry',
+    'cache_families',
+    'observe',
+]
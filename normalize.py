@@ -15,24 +15,28 @@ from pyparsing import Word, printables, alphas8bit
 
 # Import the integrated grammar system
 from grammar import comprehensive_grammar, normalize_text as enhanced_normalize_text
+from lexicon import use_profile
 
 # Legacy imports for backward compatibility
 from number_grammar_reverse import numbergrammar_reverse, wstart, wend
 from year_grammar_reverse import yeargrammar_reverse
 from date_grammar_reverse import dategrammar_reverse
+from time_grammar_reverse import timegrammar_reverse
 from abbrev_grammar_reverse import abbrevgrammar_reverse
 
 # Backward compatibility grammar (original patterns)
 wordgrammar = Word(printables + alphas8bit)
 legacy_grammar = (
-    abbrevgrammar_reverse
+    timegrammar_reverse
+    ^ abbrevgrammar_reverse
     ^ dategrammar_reverse
     ^ yeargrammar_reverse
     ^ numbergrammar_reverse
     ^ wordgrammar
 )
 
-def normalize(mystring, grammar=None, use_enhanced=True):
+def normalize(mystring, grammar=None, use_enhanced=True, deadline=None, degrade='numbers',
+              profile=None, categories=None):
     """
     Normalize Norwegian text using comprehensive grammar patterns.
 
@@ -44,26 +48,54 @@ def normalize(mystring, grammar=None, use_enhanced=True):
         mystring (str): The input string to normalize
         grammar: Optional custom grammar (defaults to comprehensive grammar)
         use_enhanced (bool): Whether to use enhanced patterns (default: True)
+        deadline (float): Optional time budget in seconds for the enhanced
+            grammar. Text left when it is spent goes through a cheap
+            numbers-only path, or is passed through unchanged with
+            degrade='passthrough'; the result then has `degraded` set.
+        degrade (str): 'numbers' (default) or 'passthrough'
+        profile (str): Lexicon variant profile for this call ('bokmal',
+            'bokmal_tradisjonell' or 'nynorsk'; see lexicon.py)
+        categories: Only apply the rules of these categories, e.g.
+            {'numbers', 'dates'} (see grammar.GRAMMAR_CATEGORIES); other
+            text is left unchanged
 
     Returns:
         str: Normalized string with patterns converted to spoken Norwegian
 
     Examples:
         >>> normalize("Møte kl. 15:30 den 3. juni 2023")
-        'Møte klokka femten tretti den tredje juni to tusen og tjue tre'
+        'Møte klokka femten tretti den tredje juni tjue tjuetre'
 
         >>> normalize("Rapporten 2010-2020 viser 50% økning")
         'Rapporten tjue ti til tjue tjue viser femti prosent økning'
 
         >>> normalize("ca. 10-15 deltakere")
         'cirka ti til femten deltakere'
+
+        >>> normalize("Møte kl. 15:30", deadline=0.005).degraded
+        False
+
+        >>> normalize("Møte 7. mai bl.a. kl. 12", profile='bokmal_tradisjonell')
+        'Møte syvende mai blant annet klokken tolv'
+
+        >>> normalize("ca. 15 deltakere 3. juni", categories={"abbreviations"})
+        'cirka 15 deltakere 3. juni'
     """
     if not mystring or not isinstance(mystring, str):
         return mystring
 
+    if profile is not None:
+        with use_profile(profile):
+            return normalize(mystring, grammar, use_enhanced, deadline, degrade,
+                             categories=categories)
+
     # Use enhanced normalization by default
     if use_enhanced and grammar is None:
-        return enhanced_normalize_text(mystring)
+        return enhanced_normalize_text(mystring, deadline=deadline, degrade=degrade,
+                                       categories=categories)
+
+    if categories is not None:
+        raise ValueError("categories only apply to the enhanced grammar")
 
     # Use custom grammar if provided
     if grammar is not None:
@@ -154,4 +186,10 @@ __all__ = [
 # Module metadata
 __version__ = '2.0.0'
 __author__ = 'Norwegian Text Normalizer Team'
-__description__ = 'Comprehensive Norwegian text normalization for TTS applications'
\ No newline at end of file
+__description__ = 'Comprehensive Norwegian text normalization for TTS applications'
+
+if __name__ == '__main__':
+    # python -m normalize: streaming command-line tool (see normalize_cli.py)
+    import sys
+    from normalize_cli import main
+    sys.exit(main())
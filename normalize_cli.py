@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Streaming Command-Line Interface for Norwegian Text Normalizer
+
+Reads text from files or stdin and writes the normalized text to stdout, so
+the normalizer can sit in a shell pipeline:
+
+    cat book.txt | python -m normalize > spoken.txt
+    python -m normalize --mode paragraph chapter*.txt > spoken.txt
+    python -m normalize --field 2 --delimiter '|' --workers 8 < manifest.txt > out.txt
+
+Records are lines (default) or paragraphs (runs of lines separated by blank
+lines). With --field, only that field of each line is normalized and the
+others are copied through, as for the text column of a filename|text|speaker
+manifest. Line endings and bytes that are not valid UTF-8 are copied through
+unchanged.
+
+The input is read in chunks of about --chunk-size bytes. With --workers,
+chunks are normalized on a NormalizerPool and written in input order; at
+most --max-pending chunks are in flight, so memory stays bounded however
+large the input is. Progress (--progress) and a summary go to stderr.
+
+Metrics (see metrics.py) can be written to a file in the Prometheus text
+format when the run ends (--metrics-file) or served over HTTP while it runs
+(--metrics-port). A record that fails to normalize is copied through
+unchanged and counted in normalizer_errors_total.
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from functools import partial
+
+import metrics
+from grammar import GRAMMAR_CATEGORIES
+from lexicon import DEFAULT_PROFILE, PROFILES
+from normalize import normalize
+
+# Bytes of input per chunk handed to a worker
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Seconds between progress lines
+_PROGRESS_INTERVAL = 1.0
+
+
+def read_records(stream, mode='line'):
+    """
+    Yield the records of a binary stream, each with its line endings.
+
+    In paragraph mode a record is a paragraph followed by the blank lines
+    after it; "".join(records) is always the whole input.
+    """
+    if mode == 'line':
+        yield from stream
+        return
+    paragraph = []
+    after_blank = False
+    for line in stream:
+        blank = not line.strip()
+        if paragraph and after_blank and not blank:
+            yield b"".join(paragraph)
+            paragraph = []
+        paragraph.append(line)
+        after_blank = blank
+    if paragraph:
+        yield b"".join(paragraph)
+
+
+def read_chunks(records, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Group records into lists of about chunk_size bytes."""
+    chunk = []
+    size = 0
+    for record in records:
+        chunk.append(record)
+        size += len(record)
+        if size >= chunk_size:
+            yield chunk
+            chunk = []
+            size = 0
+    if chunk:
+        yield chunk
+
+
+def normalize_chunk(records, field=None, delimiter='|', profile=None, deadline=None,
+                    categories=None):
+    """
+    Normalize a chunk of records (worker entry point).
+
+    Args:
+        records (list of bytes): Records from read_records()
+        field (int): 1-based field to normalize, or None for the whole record
+        delimiter (str): Field delimiter
+        profile (str): Lexicon variant profile
+        deadline (float): Optional time budget in seconds per record
+        categories: Optional rule categories to restrict normalization to
+
+    Returns:
+        tuple: (output bytes, records changed, records degraded)
+    """
+    output = []
+    changed = 0
+    degraded = 0
+    metrics.LINES.inc(len(records))
+    for record in records:
+        record = record.decode('utf-8', 'surrogateescape')
+        body = record.rstrip("\r\n")
+        ending = record[len(body):]
+        if field is None:
+            text = body
+        else:
+            fields = body.split(delimiter)
+            if len(fields) < field:
+                output.append(record)
+                continue
+            text = fields[field - 1]
+
+        start = time.perf_counter()
+        try:
+            normalized = normalize(text, deadline=deadline, profile=profile, categories=categories)
+        except Exception as e:
+            metrics.ERRORS.inc(error=type(e).__name__)
+            output.append(record)
+            continue
+        metrics.observe(text, normalized, time.perf_counter() - start)
+        if normalized != text:
+            changed += 1
+        if getattr(normalized, 'degraded', False):
+            degraded += 1
+
+        if field is not None:
+            fields[field - 1] = normalized
+            normalized = delimiter.join(fields)
+        output.append(normalized + ending)
+    return "".join(output).encode('utf-8', 'surrogateescape'), changed, degraded
+
+
+def _normalize_chunk_in_worker(records, **options):
+    """normalize_chunk() for a pool worker: also returns the worker's metrics delta."""
+    return normalize_chunk(records, **options), metrics.REGISTRY.take_delta()
+
+
+class _Progress:
+    """Running totals, reported on stderr."""
+
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.start = time.perf_counter()
+        self.last_report = self.start
+        self.records = 0
+        self.bytes_in = 0
+        self.changed = 0
+        self.degraded = 0
+
+    def add(self, chunk, result):
+        _, changed, degraded = result
+        self.records += len(chunk)
+        self.bytes_in += sum(len(record) for record in chunk)
+        self.changed += changed
+        self.degraded += degraded
+        now = time.perf_counter()
+        if self.enabled and now - self.last_report >= _PROGRESS_INTERVAL:
+            self.last_report = now
+            print(f"\r{self.line(now):<79}", end="", file=sys.stderr, flush=True)
+
+    def line(self, now):
+        seconds = max(now - self.start, 1e-9)
+        return (f"{self.records:,} records, {self.bytes_in / 2**20:,.1f} MiB "
+                f"({self.records / seconds:,.0f} records/s, {self.bytes_in / 2**20 / seconds:,.2f} MiB/s)")
+
+    def summary(self, workers):
+        now = time.perf_counter()
+        if self.enabled:
+            print(file=sys.stderr)
+        line = f"normalize: {self.line(now)} in {now - self.start:.1f} s on {workers} worker(s); {self.changed:,} changed"
+        if self.degraded:
+            line += f", {self.degraded:,} over the time budget"
+        print(line, file=sys.stderr)
+
+
+def _input_streams(paths):
+    """Yield binary streams for the input paths ('-' or none: stdin)."""
+    for path in paths or ['-']:
+        if path == '-':
+            yield sys.stdin.buffer
+        else:
+            with open(path, 'rb') as f:
+                yield f
+
+
+def _records(paths, mode):
+    for stream in _input_streams(paths):
+        yield from read_records(stream, mode)
+
+
+def run(paths, output, options, mode='line', workers=1, chunk_size=DEFAULT_CHUNK_SIZE,
+        max_pending=None, progress=None):
+    """
+    Stream the records of `paths` through the normalizer into `output`.
+
+    Args:
+        paths (list of str): Input files ('-' for stdin; empty: stdin)
+        output: Binary stream to write to
+        options (dict): Keyword arguments for normalize_chunk()
+        mode (str): 'line' or 'paragraph'
+        workers (int): Worker processes (1: normalize in this process)
+        chunk_size (int): Bytes of input per chunk
+        max_pending (int): Chunks in flight at most (default: 2 per worker)
+        progress (_Progress): Optional running totals
+    """
+    normalize_fn = partial(normalize_chunk, **options)
+    chunks = read_chunks(_records(paths, mode), chunk_size)
+    if workers == 1:
+        for chunk in chunks:
+            result = normalize_fn(chunk)
+            output.write(result[0])
+            if progress:
+                progress.add(chunk, result)
+        return
+
+    from worker_pool import NormalizerPool
+
+    def write_next():
+        done_chunk, async_result = pending.popleft()
+        result, delta = async_result.get()
+        metrics.REGISTRY.merge(delta)
+        metrics.QUEUE_DEPTH.set(len(pending))
+        output.write(result[0])
+        if progress:
+            progress.add(done_chunk, result)
+
+    worker_fn = partial(_normalize_chunk_in_worker, **options)
+    max_pending = max_pending or 2 * workers
+    with NormalizerPool(workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            if len(pending) >= max_pending:
+                write_next()
+            pending.append((chunk, pool.apply_async(worker_fn, (chunk,))))
+            metrics.QUEUE_DEPTH.set(len(pending))
+        while pending:
+            write_next()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m normalize',
+        description="Normalize Norwegian text from files or stdin to stdout.",
+    )
+    parser.add_argument('files', nargs='*', help="input files (default, or '-': stdin)")
+    parser.add_argument('-m', '--mode', choices=('line', 'paragraph'), default='line',
+                        help="normalize line by line (default) or paragraph by paragraph")
+    parser.add_argument('-f', '--field', type=int,
+                        help="normalize only this field (1-based) of each line")
+    parser.add_argument('-d', '--delimiter', default='|',
+                        help="field delimiter for --field (default: '|')")
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help="worker processes (0: one per CPU; default: 1)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"bytes of input per chunk (default: {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument('--max-pending', type=int,
+                        help="chunks in flight at most (default: 2 per worker)")
+    parser.add_argument('--deadline', type=float,
+                        help="time budget per record in seconds; the rest of a record that "
+                             "runs over only gets numbers spelled out")
+    parser.add_argument('--profile', choices=sorted(PROFILES), default=DEFAULT_PROFILE,
+                        help=f"lexicon variant profile (default: {DEFAULT_PROFILE})")
+    parser.add_argument('-c', '--categories', type=lambda value: value.split(','),
+                        help=f"only normalize these comma-separated rule categories "
+                             f"({', '.join(GRAMMAR_CATEGORIES)}; default: all)")
+    parser.add_argument('--progress', action='store_true',
+                        help="report progress on stderr while running")
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help="do not print the summary on stderr")
+    parser.add_argument('--metrics-file',
+                        help="write metrics in Prometheus text format to this file at the end")
+    parser.add_argument('--metrics-port', type=int,
+                        help="serve metrics over HTTP on this port while running")
+    args = parser.parse_args(argv)
+
+    if args.field is not None:
+        if args.field < 1:
+            parser.error("--field must be >= 1")
+        if args.mode == 'paragraph':
+            parser.error("--field cannot be used with --mode paragraph")
+    if not args.delimiter or args.delimiter in "\r\n":
+        parser.error("--delimiter must be a character other than a line break")
+    if args.workers < 0:
+        parser.error("--workers must be >= 0")
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be >= 1")
+    if args.max_pending is not None and args.max_pending < 1:
+        parser.error("--max-pending must be >= 1")
+    if args.categories is not None:
+        unknown = set(args.categories) - GRAMMAR_CATEGORIES.keys()
+        if unknown:
+            parser.error(f"unknown categories: {', '.join(sorted(unknown))}")
+        args.categories = frozenset(args.categories)
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    workers = args.workers or os.cpu_count() or 1
+    options = dict(field=args.field, delimiter=args.delimiter,
+                   profile=args.profile, deadline=args.deadline, categories=args.categories)
+    progress = _Progress(args.progress)
+    server = metrics.REGISTRY.serve(args.metrics_port) if args.metrics_port is not None else None
+
+    try:
+        run(args.files, sys.stdout.buffer, options, args.mode, workers,
+            args.chunk_size, args.max_pending, progress)
+        sys.stdout.buffer.flush()
+    except BrokenPipeError:
+        # The reader went away (e.g. `| head`); silence the flush at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    except OSError as e:
+        print(f"normalize: error: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        if args.metrics_file:
+            metrics.REGISTRY.write(args.metrics_file)
+        if server is not None:
+            server.shutdown()
+
+    if not args.quiet:
+        progress.summary(workers)
+    return 0
+
+
+__all__ = ['main', 'normalize_chunk', 'read_chunks', 'read_records', 'run']
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Thread-Safe Normalizer for Norwegian Text Normalizer
+
+normalize() and normalize_text() work on module-level state: the shared
+comprehensive grammar, its token cache and the active lexicon profile. A
+Normalizer instead owns everything it needs:
+
+- its own copy of the compiled grammar, so nothing done to the module-level
+  rules after construction (new parse actions, a resized cache) affects it
+- its own token cache
+- its settings (profile, deadline, degrade mode), fixed at construction
+
+A Normalizer is immutable once built and can be shared by any number of
+threads, e.g. through a ThreadPoolExecutor:
+
+    normalizer = Normalizer(profile='nynorsk')
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(normalizer, texts))
+
+The profile is applied per call through a context variable, so threads
+using different Normalizers do not affect each other.
+"""
+
+import copy
+
+from grammar import (
+    DEGRADE_MODES,
+    comprehensive_grammar,
+    grammar_fingerprint,
+    normalize_text,
+)
+from lexicon import DEFAULT_PROFILE, get_lexicon, use_profile
+from token_cache import DEFAULT_MAXSIZE, TokenCache, install_token_cache
+
+# Text that runs every rule of the grammar once. pyparsing finds out how many
+# arguments a parse action takes on its first calls, which is not safe to do
+# from several threads at once, so a Normalizer does it before it is shared.
+WARMUP_TEXT = (
+    "Møte kl. 15:30 den 3. juni 2023 og 17.05. 03.06.2023 1/6/2023 06-03-2023 "
+    "2023.06.03 15.30-tiden bl.a. ca. 10-15 (20) 40-årene 16-årig 11-årige "
+    "1980 31. 15 2,5 50% 2,5% 1 000 000 1.000.000 1,5×10^3 2.5e10 1 1/2 "
+    "1234567890 10-tiden e-post"
+)
+
+
+class Normalizer:
+    """
+    Immutable normalizer with its own grammar, token cache and settings.
+
+    Args:
+        profile (str): Lexicon profile (default 'bokmal'; see lexicon.py)
+        deadline (float): Optional time budget in seconds per call
+        degrade (str): 'numbers' or 'passthrough', for text left when the
+            deadline is reached (see grammar.normalize_text)
+        cache_size (int): Size of the token cache (0 disables it)
+
+    Attributes:
+        profile, deadline, degrade: The settings above
+        token_cache (TokenCache): This normalizer's token cache
+        fingerprint (str): grammar_fingerprint() of the rules it was built from
+    """
+
+    __slots__ = ('profile', 'deadline', 'degrade', 'token_cache', 'fingerprint', '_grammar')
+
+    def __init__(self, profile=None, deadline=None, degrade='numbers', cache_size=DEFAULT_MAXSIZE):
+        profile = get_lexicon(profile or DEFAULT_PROFILE).name
+        if degrade not in DEGRADE_MODES:
+            raise ValueError(f"Unknown degrade mode: {degrade!r} (expected one of {', '.join(DEGRADE_MODES)})")
+        if deadline is not None and deadline < 0:
+            raise ValueError(f"deadline must be >= 0, got {deadline}")
+
+        token_cache = TokenCache(cache_size)
+        grammar = copy.deepcopy(comprehensive_grammar)
+        install_token_cache(grammar, token_cache, replace=True)
+
+        set_attr = super().__setattr__
+        set_attr('profile', profile)
+        set_attr('deadline', deadline)
+        set_attr('degrade', degrade)
+        set_attr('token_cache', token_cache)
+        set_attr('fingerprint', grammar_fingerprint())
+        set_attr('_grammar', grammar)
+
+        with use_profile(profile):
+            normalize_text(WARMUP_TEXT, grammar=grammar)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Normalizer is immutable (cannot set {name!r})")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"Normalizer is immutable (cannot delete {name!r})")
+
+    def __repr__(self):
+        return (f"Normalizer(profile={self.profile!r}, deadline={self.deadline!r}, "
+                f"degrade={self.degrade!r}, cache_size={self.token_cache.maxsize})")
+
+    def normalize(self, text):
+        """
+        Normalize one text with this normalizer's settings.
+
+        Returns:
+            str: Normalized text (a NormalizedText when a deadline is set)
+        """
+        with use_profile(self.profile):
+            return normalize_text(text, self.deadline, self.degrade, grammar=self._grammar)
+
+    __call__ = normalize
+
+    def normalize_many(self, texts, executor=None):
+        """
+        Normalize a sequence of texts, optionally on an Executor.
+
+        Args:
+            texts: Iterable of strings
+            executor: Optional concurrent.futures.Executor (e.g. a
+                ThreadPoolExecutor) to spread the texts over
+
+        Returns:
+            list of str, in input order
+        """
+        if executor is None:
+            return [self.normalize(text) for text in texts]
+        return list(executor.map(self.normalize, texts))
+
+
+__all__ = ['Normalizer', 'WARMUP_TEXT']
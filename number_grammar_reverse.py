@@ -1,104 +1,76 @@
 import pyparsing as pp
 from pyparsing import Word, nums, WordStart, WordEnd, Combine, Suppress, OneOrMore, Optional, Keyword, originalTextFor, oneOf, Group, Regex
 import re
-# We replicate some definitions so that everything is in one file:
-pp.ParserElement.setDefaultWhitespaceChars("\t\n")
+# Shared by all grammar modules, which import this module before building
+# their own elements. Spaces are significant in the rules, so only tabs and
+# newlines are skipped between elements.
+WHITESPACE_CHARS = "\t\n"
+pp.ParserElement.setDefaultWhitespaceChars(WHITESPACE_CHARS)
 wstart = WordStart()
-wend = WordEnd()
+# Word end; returns its location so rules can tell where the match ended
+wend = WordEnd().setParseAction(lambda s, l, t: l)
 WS = pp.Suppress(" ")
 
 """
 1) A helper function to spell out a non-negative integer in Norwegian
 ##############################################################################
 """
-ONES = [
-    "null",  # 0
-    "en",    # 1
-    "to",    # 2
-    "tre",   # 3
-    "fire",  # 4
-    "fem",   # 5
-    "seks",  # 6
-    "sju",   # 7
-    "åtte",  # 8
-    "ni",    # 9
-]
-TEENS = {
-    10: "ti",
-    11: "elleve",
-    12: "tolv",
-    13: "tretten",
-    14: "fjorten",
-    15: "femten",
-    16: "seksten",
-    17: "sytten",
-    18: "atten",
-    19: "nitten",
-}
-TENS = {
-    20: "tjue",
-    30: "tretti",
-    40: "førti",
-    50: "femti",
-    60: "seksti",
-    70: "sytti",
-    80: "åtti",
-    90: "nitti",
-}
-
-def number_to_spoken(num: int) -> str:
-    if num == 0:
-        return "null"
-
+# Number words and scale words live in lexicon.py; the tables of the active
+# profile are used at parse time.
+from lexicon import ONES, TEENS, TENS, SCALES, current_lexicon
+
+# Longest digit string read as a number; longer strings (and anything beyond
+# the scale table) are read digit by digit.
+MAX_SPOKEN_DIGITS = 3 * (len(SCALES) + 2)
+
+
+def digits_to_spoken(digits: str, max_digits: int = None) -> str:
+    """
+    Spell out a string of decimal digits (any script) in Norwegian.
+
+    The string is read in groups of three with the scale words in SCALES, in
+    time linear in its length and without converting it to an int. Strings
+    longer than `max_digits` (default MAX_SPOKEN_DIGITS, leading zeros not
+    counted) are read digit by digit, e.g. long IDs and account numbers.
+    """
+    lexicon = current_lexicon()
+    significant = digits.lstrip("0")
+    if not significant:
+        return lexicon.ones[0]
+    if max_digits is None or max_digits > 3 * (len(SCALES) + 2):
+        max_digits = min(MAX_SPOKEN_DIGITS, 3 * (len(SCALES) + 2))
+    if len(significant) > max_digits:
+        return " ".join(lexicon.ones[int(digit)] for digit in digits)
+
+    groups = lexicon.groups
     parts = []
+    thousands = False
+    scale = (len(significant) - 1) // 3
+    end = len(significant) - 3 * scale
+    start = 0
+    while scale >= 0:
+        group = int(significant[start:end])
+        if group:
+            if scale == 0:
+                if thousands:
+                    parts.append("og")
+                parts.append(groups[group])
+            elif scale == 1:
+                parts.append("tusen" if group == 1 else f"{groups[group]} tusen")
+                thousands = True
+            else:
+                singular, plural = lexicon.scales[scale - 2]
+                parts.append(f"{lexicon.one} {singular}" if group == 1 else f"{groups[group]} {plural}")
+        start = end
+        end += 3
+        scale -= 1
+    return " ".join(parts)
 
-    # Handle millions
-    millions = num // 1_000_000
-    remainder = num % 1_000_000
-    if millions > 0:
-        if millions == 1:
-            parts.append("en million")
-        else:
-            parts.append(f"{number_to_spoken(millions)} millioner")
-        #if remainder > 0:
-        #    parts.append("og")
-
-    # Handle thousands
-    thousands = remainder // 1000
-    remainder = remainder % 1000
-    if thousands > 0:
-        if thousands == 1:
-            parts.append("tusen")
-        else:
-            parts.append(f"{number_to_spoken(thousands)} tusen")
-        if remainder > 0:
-            parts.append("og")
-
-    # Handle hundreds
-    hundreds = remainder // 100
-    remainder2 = remainder % 100
-    if hundreds > 0:
-        if hundreds == 1:
-            parts.append("ett hundre")
-        else:
-            parts.append(f"{number_to_spoken(hundreds)} hundre")
-        if remainder2 > 0:
-            parts.append("og")
-
-    # Handle remainder under 100
-    if remainder2 > 0:
-        if remainder2 < 10:
-            parts.append(ONES[remainder2])
-        elif remainder2 < 20:
-            parts.append(TEENS[remainder2])
-        else:
-            tens_part = (remainder2 // 10) * 10
-            ones_part = remainder2 % 10
-            parts.append(TENS[tens_part])
-            if ones_part > 0:
-                parts.append(ONES[ones_part])
-
-    return " ".join(parts).replace("  ", " ").strip()
+
+def number_to_spoken(num: int) -> str:
+    if 0 < num < 1000:
+        return current_lexicon().groups[num]
+    return digits_to_spoken(str(num))
 
 
 ###############################################################################
@@ -106,10 +78,10 @@ def number_to_spoken(num: int) -> str:
 # ##############################################################################
 # e.g. "2500" -> "to tusen fem hundre" (or you might want "to tusen og fem hundre")
 
-integer_token = Word(nums).setParseAction(lambda t: (t[0], number_to_spoken(int(t[0]))))
+integer_token = Word(nums).setParseAction(lambda t: (t[0], digits_to_spoken(t[0])))
 
 numbergrammar_reverse = (
-    wstart + integer_token + wend.setParseAction(lambda s, l, t: l)
+    wstart + integer_token + wend
 )
 
 ###############################################################################
@@ -117,9 +89,11 @@ numbergrammar_reverse = (
 #    or half thousands (“2,5” => “to og en halv”), you can add them here:
 # ##############################################################################
 
-# Spaced numbers parser
-spaced_number = Combine(Word(nums) + OneOrMore(WS + Word(nums)))
-spaced_number.setParseAction(lambda t: (t[0], number_to_spoken(int(t[0].replace(' ', '')))))
+# Spaced numbers parser: "1 000 000" (thousands groups separated by spaces).
+# The number of groups is bounded so that a long run of space-separated
+# numbers is not re-consumed from every token start.
+spaced_number = pp.Regex(r"\d{1,3}(?: \d{3}){1,6}")
+spaced_number.setParseAction(lambda t: (t[0], digits_to_spoken(t[0].replace(' ', ''))))
 
 # Percentages parser
 percent_decimal_expr = pp.Regex(r'\d+,\d+%')
@@ -128,11 +102,11 @@ percent_integer_expr = pp.Regex(r'\d+%')
 def parse_percent_decimal(t):
     num_str = t[0].replace('%', '')
     whole, frac = num_str.split(',')
-    return (t[0], f"{number_to_spoken(int(whole))} komma {number_to_spoken(int(frac))} prosent")
+    return (t[0], f"{digits_to_spoken(whole)} komma {digits_to_spoken(frac)} prosent")
 
 def parse_percent_integer(t):
     num_str = t[0].replace('%', '')
-    return (t[0], f"{number_to_spoken(int(num_str))} prosent")
+    return (t[0], f"{digits_to_spoken(num_str)} prosent")
 
 percent_decimal_expr.setParseAction(parse_percent_decimal)
 percent_integer_expr.setParseAction(parse_percent_integer)
@@ -146,8 +120,8 @@ def decimal_to_spoken(t):
     text = t[0]
     whole, frac = text.split(',')
     if frac == '5':
-        return (text, f"{number_to_spoken(int(whole))} og en halv")
-    return (text, f"{number_to_spoken(int(whole))} komma {number_to_spoken(int(frac))}")
+        return (text, f"{digits_to_spoken(whole)} og en halv")
+    return (text, f"{digits_to_spoken(whole)} komma {digits_to_spoken(frac)}")
 decimal_expr.setParseAction(decimal_to_spoken)
 
 
@@ -158,7 +132,7 @@ decimal_expr.setParseAction(decimal_to_spoken)
 # 12-14 → "tolv til fjorten"
 range_expr = Combine(Word(nums) + Suppress("-") + Word(nums))
 range_expr.setParseAction(
-    lambda t: f"{number_to_spoken(int(t[0][0]))} til {number_to_spoken(int(t[0][1]))}"
+    lambda t: f"{digits_to_spoken(t[0][0])} til {digits_to_spoken(t[0][1])}"
 )
 
 time_expr = Combine(
@@ -178,7 +152,7 @@ tiden_expr = (
 
 def parse_parenthesized_number(t):
     raw_digits = t.digits  # e.g. "20"
-    spelled = number_to_spoken(int(raw_digits))  # "tjue"
+    spelled = digits_to_spoken(raw_digits)  # "tjue"
     # Return a 2-tuple: (original, replaced)
     return (f"({raw_digits})", f"({spelled})")
 
@@ -190,14 +164,14 @@ parenthesized_number = (
 
 def parse_parenthesized_number(t):
     raw_digits = t.digits  # e.g. "20"
-    spelled = number_to_spoken(int(raw_digits))  # "tjue"
+    spelled = digits_to_spoken(raw_digits)  # "tjue"
     # Return a 2-tuple: (original, replaced)
     return (f"({raw_digits})", f"({spelled})")
 
 parenthesized_number.setParseAction(parse_parenthesized_number)
 
 digit_tiden_expr = pp.Regex(r"(\d+)-(tiden|tida)").setParseAction(
-    lambda t: (t[0], f"{number_to_spoken(int(t[0].split('-')[0]))}-{t[0].split('-')[1]}")
+    lambda t: (t[0], f"{digits_to_spoken(t[0].split('-')[0])}-{t[0].split('-')[1]}")
 )
 
 two_part_version_expr = pp.Regex(r"\b(\d+)\.(\d+)\b")
@@ -231,13 +205,16 @@ numbergrammar_reverse = (
         percent_expr |
         spaced_number |
         decimal_expr |
-        Word(nums).setParseAction(lambda t: (t[0], number_to_spoken(int(t[0]))))
+        Word(nums).setParseAction(lambda t: (t[0], digits_to_spoken(t[0])))
     ) + wend
 )
 
 ###############################################################################
 
-__all__ = ["numbergrammar_reverse", "number_to_spoken"]
+__all__ = ["numbergrammar_reverse", "number_to_spoken", "digits_to_spoken"]
+
+# Module metadata
+__version__ = '2.2.0'
 
 
 
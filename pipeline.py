@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Staged Normalization Pipeline for Norwegian Text Normalizer
+
+grammar.normalize_text runs every step of normalization in one call. The
+Pipeline runs the same steps as separate, timed stages:
+
+    prenormalize  separate Unicode fractions glued to a number ("1½")
+    prefilter     finish early if the text has no candidate token at all
+    candidates    find the windows around candidate tokens (pretokenizer.py)
+    match         scan each window with the grammar
+    expand        turn the matches into (position, length, spoken) replacements
+    assemble      apply the replacements, join the windows with the text
+                  between them and spell out Unicode fractions
+
+With the default stages the output is identical to normalize_text. Stages
+can be skipped per call (skipping 'candidates' scans the whole text as one
+window; 'prenormalize' and 'prefilter' can be left out too) or replaced with
+another function taking the PipelineState. run_batch() runs each stage over
+a whole batch of texts before the next, so a stage can be vectorized on its
+own.
+
+Every stage is timed; timings() and report() show where the time goes:
+
+    pipeline = Pipeline()
+    results = pipeline.run_batch(texts)
+    print(pipeline.report())
+
+Usage:
+    python pipeline.py                    # stage timings on generated texts
+    python pipeline.py --input texts.txt  # ... on a file, one text per line
+"""
+
+import argparse
+import sys
+import threading
+import time
+
+from grammar import (
+    apply_replacements,
+    comprehensive_grammar,
+    expand_fractions,
+    expand_matches,
+    expand_unicode_symbols,
+    scan_matches,
+)
+from lexicon import use_profile
+from pretokenizer import candidate_windows, has_candidates
+
+
+class PipelineState:
+    """
+    Data passed from stage to stage for one text.
+
+    Attributes:
+        text (str): Text being normalized (after prenormalize)
+        grammar: Grammar the match stage uses
+        windows (list): (start, end) spans to scan, from the candidates stage
+        matches (list): Per window, the (tokens, start, end) grammar matches
+        replacements (list): Per window, the replacements from expand_matches()
+        output (str): Result; once set, the remaining stages are skipped
+    """
+
+    __slots__ = ('text', 'grammar', 'windows', 'matches', 'replacements', 'output')
+
+    def __init__(self, text, grammar):
+        self.text = text
+        self.grammar = grammar
+        self.windows = None
+        self.matches = None
+        self.replacements = None
+        self.output = None
+
+
+def prenormalize(state):
+    state.text = expand_unicode_symbols(state.text)
+
+
+def prefilter(state):
+    if not has_candidates(state.text):
+        state.output = state.text
+
+
+def find_candidates(state):
+    state.windows = candidate_windows(state.text)
+
+
+def match_rules(state):
+    windows = state.windows if state.windows is not None else [(0, len(state.text))]
+    state.windows = windows
+    grammar = state.grammar
+    state.matches = [list(scan_matches(state.text[start:end], grammar)) for start, end in windows]
+
+
+def expand(state):
+    text = state.text
+    state.replacements = [
+        expand_matches(text[start:end], matches)
+        for (start, end), matches in zip(state.windows, state.matches)
+    ]
+
+
+def assemble(state):
+    text = state.text
+    parts = []
+    position = 0
+    for (start, end), replacements in zip(state.windows, state.replacements):
+        parts.append(text[position:start])
+        parts.append(apply_replacements(text[start:end], replacements))
+        position = end
+    parts.append(text[position:])
+    state.output = expand_fractions("".join(parts))
+
+
+# Default stages, in order: (name, function taking a PipelineState)
+STAGES = (
+    ('prenormalize', prenormalize),
+    ('prefilter', prefilter),
+    ('candidates', find_candidates),
+    ('match', match_rules),
+    ('expand', expand),
+    ('assemble', assemble),
+)
+
+# Stages a call may skip
+OPTIONAL_STAGES = frozenset({'prenormalize', 'prefilter', 'candidates'})
+
+
+class Pipeline:
+    """
+    Normalization as a sequence of named, timed stages.
+
+    Args:
+        stages: Sequence of (name, function) pairs (default STAGES)
+        grammar: Grammar for the match stage (default comprehensive_grammar)
+
+    Timings accumulate over all calls (from any thread) until reset_timings().
+    """
+
+    def __init__(self, stages=STAGES, grammar=None):
+        self.stages = tuple(stages)
+        self.grammar = grammar if grammar is not None else comprehensive_grammar
+        names = [name for name, _ in self.stages]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate stage names: {names}")
+        self._lock = threading.Lock()
+        self._timings = {name: [0, 0.0] for name in names}
+
+    def __repr__(self):
+        return f"Pipeline(stages={[name for name, _ in self.stages]})"
+
+    def replace(self, name, function):
+        """Return a new Pipeline with stage `name` replaced by `function`."""
+        if name not in self._timings:
+            raise ValueError(f"Unknown stage: {name!r}")
+        stages = [(stage, function if stage == name else fn) for stage, fn in self.stages]
+        return Pipeline(stages, self.grammar)
+
+    def _active(self, skip):
+        skip = frozenset(skip)
+        unknown = skip - set(self._timings)
+        if unknown:
+            raise ValueError(f"Unknown stage(s): {', '.join(sorted(unknown))}")
+        required = skip & {name for name, _ in STAGES} - OPTIONAL_STAGES
+        if required:
+            raise ValueError(f"Stage(s) cannot be skipped: {', '.join(sorted(required))}")
+        return [(name, function) for name, function in self.stages if name not in skip]
+
+    def _record(self, name, calls, seconds):
+        with self._lock:
+            timing = self._timings[name]
+            timing[0] += calls
+            timing[1] += seconds
+
+    def run(self, text, skip=(), profile=None):
+        """
+        Normalize one text through the stages.
+
+        Args:
+            text (str): Text to normalize
+            skip: Names of optional stages to leave out for this call
+            profile (str): Optional lexicon profile for this call
+
+        Returns:
+            str: Normalized text
+        """
+        return self.run_batch([text], skip, profile)[0]
+
+    def run_batch(self, texts, skip=(), profile=None):
+        """
+        Normalize texts stage by stage: each stage runs over the whole batch
+        before the next one starts.
+
+        Returns:
+            list of str, in input order
+        """
+        if profile is not None:
+            with use_profile(profile):
+                return self.run_batch(texts, skip)
+
+        stages = self._active(skip)
+        texts = list(texts)
+        results = list(texts)
+        states = [
+            (index, PipelineState(text, self.grammar))
+            for index, text in enumerate(texts) if text and isinstance(text, str)
+        ]
+        pending = [state for _, state in states]
+        for name, function in stages:
+            pending = [state for state in pending if state.output is None]
+            if not pending:
+                break
+            start = time.perf_counter()
+            for state in pending:
+                function(state)
+            self._record(name, len(pending), time.perf_counter() - start)
+        for index, state in states:
+            results[index] = state.output if state.output is not None else state.text
+        return results
+
+    def timings(self):
+        """
+        Return the accumulated timings.
+
+        Returns:
+            dict: {stage: {'calls': int, 'seconds': float}}, in stage order
+        """
+        with self._lock:
+            return {name: {'calls': calls, 'seconds': seconds}
+                    for name, (calls, seconds) in self._timings.items()}
+
+    def reset_timings(self):
+        with self._lock:
+            for timing in self._timings.values():
+                timing[0] = 0
+                timing[1] = 0.0
+
+    def report(self):
+        """Return the timings as a table, with each stage's share of the total."""
+        timings = self.timings()
+        total = sum(timing['seconds'] for timing in timings.values()) or 1e-9
+        lines = [f"  {'stage':<14} {'calls':>9} {'total ms':>10} {'us/call':>9} {'share':>7}"]
+        for name, timing in timings.items():
+            per_call = timing['seconds'] / timing['calls'] * 1e6 if timing['calls'] else 0.0
+            lines.append(f"  {name:<14} {timing['calls']:>9} {timing['seconds'] * 1000:>10.1f} "
+                         f"{per_call:>9.1f} {timing['seconds'] / total:>7.1%}")
+        return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show where normalization time goes, stage by stage.")
+    parser.add_argument('--input', help="texts to run (one per line; default: generated texts)")
+    parser.add_argument('--texts', type=int, default=2000, help="number of generated texts")
+    parser.add_argument('--batch-size', type=int, default=256, help="texts per run_batch() call")
+    args = parser.parse_args(argv)
+
+    if args.input:
+        with open(args.input, encoding='utf-8') as f:
+            texts = [line.rstrip("\n") for line in f if line.strip()]
+    else:
+        from benchmark_normalizer import generate_texts
+        texts = generate_texts(args.texts)
+
+    pipeline = Pipeline()
+    for i in range(0, len(texts), args.batch_size):
+        pipeline.run_batch(texts[i:i + args.batch_size])
+    print(f"{len(texts)} texts\n")
+    print(pipeline.report())
+    return 0
+
+
+__all__ = [
+    'OPTIONAL_STAGES',
+    'Pipeline',
+    'PipelineState',
+    'STAGES',
+]
+
+
+if __name__ == '__main__':
+    sys.exit(main())
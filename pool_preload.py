@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Worker Preloading for Norwegian Text Normalizer Pools
+
+Importing this module builds everything a worker needs before any worker
+exists: the grammar, the lexicon tables of every profile and a warm token
+cache. It then freezes these objects for the garbage collector (gc.freeze()),
+so processes forked afterwards share them copy-on-write.
+
+NormalizerPool (worker_pool.py) has the fork server import it, or imports it
+in the parent before forking workers; it is not meant to be used directly.
+"""
+
+import gc
+
+from lexicon import PROFILES
+from normalize import normalize
+from normalizer import WARMUP_TEXT
+
+
+def preload():
+    """Warm up the grammar for every profile, then freeze all live objects."""
+    for profile in PROFILES:
+        normalize(WARMUP_TEXT, profile=profile)
+    gc.collect()
+    gc.freeze()
+
+
+preload()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Pre-Tokenizer for Norwegian Text Normalizer
+
+Most of a text is ordinary words that no rule rewrites, yet the grammar
+still has to scan them and match them as plain words. The pre-tokenizer
+classifies each whitespace-separated token in one linear pass:
+
+    numeric       contains a digit ("2023", "15:30", "40-årene")
+    abbreviation  is (or contains, after non-ASCII characters) an
+                  abbreviation the grammar expands ("ca.", "bl.a.")
+    fraction      contains a Unicode fraction or superscript ("½", "10³")
+    plain         anything else
+
+Only windows around the candidate (non-plain) tokens are handed to the
+grammar; plain text between them is copied through untouched. A window
+takes LEFT_CONTEXT tokens before and RIGHT_CONTEXT tokens after each
+candidate, which covers every rule that spans more than one token:
+"klokka 15" starts one token before the digit, and "3. juni", "10 - 15",
+"1 1/2", "1 000 000" and "1,5 × 10^3" never span more than one plain token
+after a digit. Normalizing the windows and copying the rest gives the same
+output as normalizing the whole text.
+
+has_candidates() answers whether a text has any candidate token at all with
+a single regex search, so texts without one skip tokenization altogether.
+"""
+
+import re
+
+from pyparsing import printables
+
+from abbrev_grammar_reverse import abbrev_keys
+from lexicon import FRACTIONS
+
+PLAIN = 'plain'
+NUMERIC = 'numeric'
+ABBREVIATION = 'abbreviation'
+FRACTION = 'fraction'
+
+# Tokens around each candidate that go into its window
+LEFT_CONTEXT = 1
+RIGHT_CONTEXT = 2
+
+_TOKEN = re.compile(r"\S+")
+_DIGIT = re.compile(r"\d")
+_FRACTION = re.compile("[" + "".join(FRACTIONS) + "⁰¹²³⁴⁵⁶⁷⁸⁹⁻]")
+
+# Abbreviations match between word boundaries, and any character outside
+# pyparsing's (ASCII) printables is a boundary, e.g. "æca." contains "ca."
+_ABBREVIATIONS = frozenset(abbrev_keys)
+_NON_PRINTABLE = re.compile("[^" + re.escape(printables) + "]")
+
+# Matches where some token would not be PLAIN: a digit, a fraction or an
+# abbreviation bounded by whitespace, non-ASCII characters or the text ends
+_PRINTABLE_CLASS = "[" + re.escape(printables) + "]"
+_TRIGGER = re.compile(
+    r"\d|" + _FRACTION.pattern
+    + "|(?<!" + _PRINTABLE_CLASS + ")(?:"
+    + "|".join(re.escape(key) for key in sorted(_ABBREVIATIONS, key=len, reverse=True))
+    + ")(?!" + _PRINTABLE_CLASS + ")"
+)
+
+
+def classify_token(token):
+    """Return the class of a whitespace-free token (PLAIN, NUMERIC, ABBREVIATION or FRACTION)."""
+    if _DIGIT.search(token):
+        return NUMERIC
+    if token in _ABBREVIATIONS:
+        return ABBREVIATION
+    if not token.isascii():
+        if _FRACTION.search(token):
+            return FRACTION
+        if any(piece in _ABBREVIATIONS for piece in _NON_PRINTABLE.split(token)):
+            return ABBREVIATION
+    return PLAIN
+
+
+def has_candidates(text):
+    """Return True if `text` has a candidate token, i.e. candidate_windows(text) is not empty."""
+    return _TRIGGER.search(text) is not None
+
+
+def candidate_windows(text):
+    """
+    Return the spans of `text` that need the grammar.
+
+    Returns:
+        list of (start, end): Sorted, non-overlapping character spans; text
+        outside them is left unchanged by normalization
+    """
+    tokens = [(match.start(), match.end()) for match in _TOKEN.finditer(text)]
+    windows = []
+    last = len(tokens) - 1
+    for index, (start, end) in enumerate(tokens):
+        if classify_token(text[start:end]) == PLAIN:
+            continue
+        first = max(index - LEFT_CONTEXT, 0)
+        final = min(index + RIGHT_CONTEXT, last)
+        if windows and first <= windows[-1][1] + 1:
+            windows[-1][1] = max(windows[-1][1], final)
+        else:
+            windows.append([first, final])
+    # A window runs up to the next token, as some rules consume trailing
+    # whitespace ("10-15 %")
+    return [
+        (tokens[first][0], tokens[final + 1][0] if final < last else len(text))
+        for first, final in windows
+    ]
+
+
+__all__ = [
+    'ABBREVIATION',
+    'FRACTION',
+    'LEFT_CONTEXT',
+    'NUMERIC',
+    'PLAIN',
+    'RIGHT_CONTEXT',
+    'candidate_windows',
+    'classify_token',
+    'has_candidates',
+]
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Worst-Case Complexity Audit for the Grammar Regexes
+
+Finds every pp.Regex rule reachable from the comprehensive grammar and
+measures how its matching cost grows with input size on adversarial inputs
+(long digit runs, enumerations, whitespace runs, repeated separators) and on
+random fuzz input. Each rule is matched at every token start of the input
+(the start of the text and every position after whitespace), which is where
+the scanner tries the rules, and the cost growth between input sizes is
+reported as an exponent: ~1 is linear, ~2 is quadratic.
+
+The whole grammar is audited the same way through grammar.normalize_text, so
+a single pathological line shows up before it stalls a worker.
+
+Usage:
+    python regex_audit.py            # audit report, exits 1 on superlinear rules
+    python regex_audit.py --fuzz 500 # also run 500 random fuzz lines per rule
+"""
+
+import argparse
+import importlib
+import math
+import random
+import re
+import sys
+import time
+
+import pyparsing as pp
+
+from grammar import GRAMMAR_MODULES, comprehensive_grammar, normalize_text
+
+# Input sizes (in repetitions of the adversarial unit) used to fit the growth
+AUDIT_SIZES = (250, 500, 1000, 2000)
+# Growth exponent above which a rule is reported as superlinear
+SUPERLINEAR_EXPONENT = 1.5
+# Smallest timing (seconds) trusted when fitting the exponent
+_MIN_TIMING = 0.002
+
+# Adversarial inputs: name -> function building a line from a repetition count
+ADVERSARIAL_INPUTS = {
+    'digits': lambda n: "1" * n,
+    'enumeration': lambda n: " ".join(f"{i}. punkt" for i in range(1, n + 1)),
+    'ordinal_run': lambda n: "1." * n,
+    'dotted_digits': lambda n: "1" + ".1" * n,
+    'comma_digits': lambda n: "1" + ",1" * n,
+    'spaced_digits': lambda n: " ".join("12" for _ in range(n)),
+    'spaced_dashes': lambda n: "1 - " * n + "x",
+    'dash_run': lambda n: "1-" * n + "1",
+    'slash_run': lambda n: "1/" * n + "1",
+    'whitespace_run': lambda n: "1" + " " * n + "x",
+    'month_run': lambda n: "3. juni " * n,
+    'klokka_run': lambda n: "klokka " * n + "15.30",
+    'scientific_run': lambda n: "1,5 × " * n + "10³",
+    'mixed_run': lambda n: "1 " * n + "1/",
+    'paren_run': lambda n: "(" * n + "1",
+}
+
+_FUZZ_ALPHABET = "0123456789 .,-/:%()×x·*eE³½klokajuni\t"
+
+
+def iter_regex_rules(root=comprehensive_grammar):
+    """
+    Yield (name, element) for every distinct pp.Regex reachable from `root`.
+
+    Names are the module-level variables that refer to the element in the
+    grammar modules, or the pattern itself for anonymous rules.
+    """
+    names = {}
+    for module_name in GRAMMAR_MODULES:
+        module = importlib.import_module(module_name)
+        for attr, value in vars(module).items():
+            if isinstance(value, pp.Regex):
+                names.setdefault(id(value), f"{module_name}.{attr}")
+
+    seen = set()
+    stack = [root]
+    while stack:
+        element = stack.pop()
+        if id(element) in seen:
+            continue
+        seen.add(id(element))
+        if isinstance(element, pp.Regex):
+            yield names.get(id(element), element.pattern), element
+        if isinstance(element, pp.ParseExpression):
+            stack.extend(reversed(element.exprs))
+        elif isinstance(element, pp.ParseElementEnhance) and element.expr is not None:
+            stack.append(element.expr)
+
+
+_TOKEN_START = re.compile(r"(?:^|(?<=\s))\S")
+
+
+def _time_rule_at_token_starts(compiled, text):
+    positions = [m.start() for m in _TOKEN_START.finditer(text)]
+    match = compiled.match
+    start = time.perf_counter()
+    for pos in positions:
+        match(text, pos)
+    return time.perf_counter() - start
+
+
+def _time_normalize(text):
+    start = time.perf_counter()
+    normalize_text(text)
+    return time.perf_counter() - start
+
+
+def growth_exponent(sizes, timings):
+    """Fit the exponent k in time ~ size**k from the two largest reliable timings."""
+    points = [(n, t) for n, t in zip(sizes, timings) if t >= _MIN_TIMING]
+    if len(points) < 2:
+        return 1.0 if timings[-1] < _MIN_TIMING else None
+    (n1, t1), (n2, t2) = points[-2], points[-1]
+    return math.log(t2 / t1) / math.log(n2 / n1)
+
+
+def audit(timer, sizes=AUDIT_SIZES):
+    """
+    Run every adversarial input at every size through `timer(text)`.
+
+    Returns:
+        dict: {input name: (exponent, seconds at the largest size)}
+    """
+    results = {}
+    for name, build in ADVERSARIAL_INPUTS.items():
+        timings = [timer(build(n)) for n in sizes]
+        results[name] = (growth_exponent(sizes, timings), timings[-1])
+    return results
+
+
+def audit_rules(sizes=AUDIT_SIZES):
+    """Audit every regex rule. Returns {rule name: {input name: (exponent, seconds)}}."""
+    return {
+        name: audit(lambda text, compiled=element.re: _time_rule_at_token_starts(compiled, text), sizes)
+        for name, element in iter_regex_rules()
+    }
+
+
+def audit_grammar(sizes=AUDIT_SIZES):
+    """Audit the full normalize_text path. Returns {input name: (exponent, seconds)}."""
+    return audit(_time_normalize, sizes)
+
+
+def fuzz(lines=200, length=400, seed=0):
+    """
+    Time random lines through normalize_text and every regex rule.
+
+    Returns:
+        list of (seconds per char, target, line) for the slowest cases, worst first
+    """
+    rng = random.Random(seed)
+    rules = list(iter_regex_rules())
+    worst = []
+    for _ in range(lines):
+        line = "".join(rng.choice(_FUZZ_ALPHABET) for _ in range(length))
+        worst.append((_time_normalize(line) / length, 'normalize_text', line))
+        for name, element in rules:
+            worst.append((_time_rule_at_token_starts(element.re, line) / length, name, line))
+    worst.sort(key=lambda item: item[0], reverse=True)
+    return worst[:10]
+
+
+def _report(title, results):
+    flagged = []
+    print(title)
+    for name, (exponent, seconds) in sorted(results.items()):
+        marker = ""
+        if exponent is not None and exponent > SUPERLINEAR_EXPONENT:
+            marker = "  <-- superlinear"
+            flagged.append(name)
+        shown = "n/a" if exponent is None else f"{exponent:.2f}"
+        print(f"  {name:<22} exponent {shown:>5}  {seconds * 1000:8.2f} ms{marker}")
+    return flagged
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Audit grammar regexes for superlinear matching cost.")
+    parser.add_argument('--fuzz', type=int, default=0, help="number of random fuzz lines to run")
+    parser.add_argument('--rule', help="only audit rules whose name contains this text")
+    args = parser.parse_args(argv)
+
+    flagged = []
+    for name, element in iter_regex_rules():
+        if args.rule and args.rule not in name:
+            continue
+        results = audit(lambda text, compiled=element.re: _time_rule_at_token_starts(compiled, text))
+        flagged += [f"{name} [{case}]" for case in _report(f"\n{name}  /{element.pattern}/", results)]
+
+    if not args.rule:
+        flagged += [f"normalize_text [{case}]" for case in _report("\nnormalize_text", audit_grammar())]
+
+    if args.fuzz:
+        print(f"\nSlowest of {args.fuzz} fuzz lines (microseconds per char):")
+        for per_char, target, line in fuzz(args.fuzz):
+            print(f"  {per_char * 1e6:8.2f}  {target:<40} {line[:40]!r}")
+
+    if flagged:
+        print("\nSuperlinear cases:")
+        for case in flagged:
+            print(f"  {case}")
+        return 1
+    print("\nNo superlinear cases found.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
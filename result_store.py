@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Persistent Normalization Result Store
+
+An on-disk key-value store (stdlib sqlite3) that remembers normalized text
+across runs. TTS manifests across speakers and dataset versions share many
+identical sentences; with a store, re-runs and new dataset versions only
+normalize sentences that have not been seen before.
+
+Keys are a hash of the input text (and of the lexicon profile, for profiles
+other than the default). Every row records the grammar fingerprint it was
+produced under, and rows from any other fingerprint are dropped when the
+store is opened, so results never outlive a grammar change.
+
+Usage:
+    with NormalizationStore('normalized.sqlite') as store:
+        results = store.normalize_many(texts, normalize)
+"""
+
+import hashlib
+import sqlite3
+
+from grammar import grammar_fingerprint
+from lexicon import DEFAULT_PROFILE
+
+# Number of keys per SELECT ... IN (...) batch (below SQLite's variable limit)
+_LOOKUP_BATCH = 500
+
+
+def text_key(text, profile=DEFAULT_PROFILE):
+    """Return the store key (16-byte BLAKE2b digest) for a text under a lexicon profile."""
+    if profile != DEFAULT_PROFILE:
+        text = f"{profile}\0{text}"
+    # Lone surrogates (from JSON input) are hashed rather than rejected
+    return hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+
+def _storable(text):
+    """True if sqlite3 can store `text` (it rejects lone surrogates)."""
+    try:
+        text.encode('utf-8')
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+class FailedNormalization(str):
+    """
+    The original text, returned in place of a result when normalization failed.
+
+    Behaves exactly like str. normalize_many() returns it but never stores
+    it, so a failure is retried on the next run instead of being remembered
+    as "unchanged".
+    """
+
+    failed = True
+
+
+class NormalizationStore:
+    """
+    sqlite3-backed cache of normalized text, invalidated by grammar fingerprint.
+
+    Results for different lexicon profiles can share one store; `profile`
+    selects the ones this instance reads and writes.
+    """
+
+    def __init__(self, filepath, fingerprint=None, profile=None):
+        self.filepath = filepath
+        self.fingerprint = fingerprint or grammar_fingerprint()
+        self.profile = profile or DEFAULT_PROFILE
+        self.hits = 0
+        self.misses = 0
+
+        self._conn = sqlite3.connect(filepath)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key BLOB PRIMARY KEY,"
+            " fingerprint TEXT NOT NULL,"
+            " normalized TEXT NOT NULL)"
+        )
+        # Drop everything produced by a different grammar
+        self.invalidated = self._conn.execute(
+            "DELETE FROM results WHERE fingerprint != ?", (self.fingerprint,)
+        ).rowcount
+        self._conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self):
+        self._conn.commit()
+        self._conn.close()
+
+    def get(self, text):
+        """Return the stored normalization of `text`, or None."""
+        row = self._conn.execute(
+            "SELECT normalized FROM results WHERE key = ? AND fingerprint = ?",
+            (text_key(text, self.profile), self.fingerprint),
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0]
+
+    def get_many(self, texts):
+        """Return a dict {text: normalized} for the texts found in the store."""
+        keyed = {}
+        for text in texts:
+            keyed.setdefault(text_key(text, self.profile), text)
+
+        found = {}
+        keys = list(keyed)
+        for i in range(0, len(keys), _LOOKUP_BATCH):
+            batch = keys[i:i + _LOOKUP_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._conn.execute(
+                f"SELECT key, normalized FROM results"
+                f" WHERE fingerprint = ? AND key IN ({placeholders})",
+                [self.fingerprint] + batch,
+            )
+            for key, normalized in rows:
+                found[keyed[key]] = normalized
+
+        self.hits += len(found)
+        self.misses += len(keyed) - len(found)
+        return found
+
+    def put_many(self, pairs):
+        """
+        Store (text, normalized) pairs under the current fingerprint.
+
+        Results that contain lone surrogates cannot be stored and are skipped.
+        """
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO results (key, fingerprint, normalized) VALUES (?, ?, ?)",
+            ((text_key(text, self.profile), self.fingerprint, normalized)
+             for text, normalized in pairs if _storable(normalized)),
+        )
+        self._conn.commit()
+
+    def normalize_many(self, texts, normalize_fn, map_fn=map):
+        """
+        Normalize `texts` through the store.
+
+        Each distinct text is looked up once; only texts missing from the store
+        are passed to `normalize_fn`, and their results are added to the store.
+        Results marked `degraded` (a deadline was reached) or `failed` (see
+        FailedNormalization) are returned but not stored. `map_fn` applies
+        normalize_fn to the missing texts, e.g. NormalizerPool.map to spread
+        them over worker processes.
+
+        Returns:
+            dict: {text: normalized} for every distinct input text
+        """
+        unique = list(dict.fromkeys(texts))
+        results = self.get_many(unique)
+        missing = [text for text in unique if text not in results]
+        new_pairs = list(zip(missing, map_fn(normalize_fn, missing)))
+        if new_pairs:
+            self.put_many(
+                (text, normalized) for text, normalized in new_pairs
+                if not (getattr(normalized, 'degraded', False) or getattr(normalized, 'failed', False))
+            )
+            results.update(new_pairs)
+        return results
+
+
+__all__ = ['FailedNormalization', 'NormalizationStore', 'text_key']
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Safe Segmentation for Norwegian Text Normalizer
+
+Splits text into segments that can be normalized independently: normalizing
+each segment and joining the results gives the same output as normalizing
+the whole text at once.
+
+Segments are made of whole lines. Rules that span more than one token
+(ranges like "10 - 15", dates like "3. juni", mixed numbers like "1 1/2",
+"klokka 15.30") always involve a digit next to the gap they span, so a line
+boundary is only split when neither the last token before it nor the first
+token after it contains a digit. Whitespace-only lines stay with the
+preceding segment.
+
+With `max_length`, segments that are still too long are cut further at the
+spaces between tokens, using the same rule.
+"""
+
+import re
+
+_DIGIT = re.compile(r"\d")
+
+
+def _has_digit(token):
+    return token is not None and _DIGIT.search(token) is not None
+
+
+def is_safe_boundary(left_token, right_token):
+    """
+    Return True if no rule can match across a boundary between two tokens.
+
+    Args:
+        left_token (str): Last non-whitespace token before the boundary (or None)
+        right_token (str): First non-whitespace token after the boundary (or None)
+    """
+    return not (_has_digit(left_token) or _has_digit(right_token))
+
+
+_TOKEN = re.compile(r"\S+")
+
+
+def _split_long(segment, max_length):
+    """Cut a segment at safe spaces into pieces of about max_length chars."""
+    pieces = []
+    piece_start = 0
+    previous = None
+    for match in _TOKEN.finditer(segment):
+        token = match.group()
+        start = match.start()
+        if (start - piece_start >= max_length and previous is not None
+                and is_safe_boundary(previous, token)):
+            pieces.append(segment[piece_start:start])
+            piece_start = start
+        previous = token
+    pieces.append(segment[piece_start:])
+    return pieces
+
+
+def split_segments(text, max_length=None):
+    """
+    Split text into independently normalizable segments.
+
+    The segments are consecutive slices of the input: "".join(segments) == text.
+
+    Args:
+        text (str): Text to split
+        max_length (int): If given, segments longer than this are cut at safe
+            spaces as well (a segment can still be longer when no safe cut
+            point exists)
+
+    Returns:
+        list of str
+    """
+    if not text:
+        return []
+    if max_length:
+        segments = []
+        for segment in split_segments(text):
+            if len(segment) > max_length:
+                segments.extend(_split_long(segment, max_length))
+            else:
+                segments.append(segment)
+        return segments
+
+    lines = text.split("\n")
+    last = lines.pop()
+
+    segments = []
+    current = []
+    last_token = None
+    for line in lines:
+        tokens = line.split()
+        if tokens and current and is_safe_boundary(last_token, tokens[0]):
+            segments.append("".join(current))
+            current = []
+        current.append(line + "\n")
+        if tokens:
+            last_token = tokens[-1]
+
+    if last:
+        tokens = last.split()
+        if tokens and current and is_safe_boundary(last_token, tokens[0]):
+            segments.append("".join(current))
+            current = []
+        current.append(last)
+
+    if current:
+        segments.append("".join(current))
+    return segments
+
+
+__all__ = ['is_safe_boundary', 'split_segments']
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Cross-Process Shared Result Cache for Norwegian Text Normalizer
+
+Every worker of a process pool has its own token cache, so a sentence that
+recurs across the work of several workers is normalized once per worker.
+SharedResultCache is a fixed-size hash table of normalized sentences in a
+multiprocessing.shared_memory block that all workers of a pool read and
+fill, so the hit rate grows with the whole pool instead of with each worker.
+
+Layout: the table is split into buckets of WAYS slots; a sentence can only
+live in the bucket its key hashes to, and a full bucket overwrites one of
+its slots. Each slot holds a 16-byte key, the value length and up to
+`value_bytes` of UTF-8 normalized text; longer results are not cached.
+Keys are BLAKE2b digests of (profile, categories, text) keyed with the
+grammar fingerprint, so results from another grammar can never be returned.
+
+Buckets are guarded by a fixed set of striped locks (bucket % stripes), so
+workers only contend when they touch buckets of the same stripe. Hit, miss,
+store and eviction counts are kept per stripe in the shared block.
+
+The cache reaches the workers through process inheritance (the locks
+cannot be sent any other way): pass it to NormalizerPool, which attaches it
+in every worker:
+
+    with SharedResultCache(64 * 2**20) as cache, NormalizerPool(16, shared_cache=cache) as pool:
+        results = pool.normalize_many(texts)
+        print(cache.stats())
+"""
+
+import hashlib
+import multiprocessing
+import struct
+from multiprocessing import shared_memory
+
+from grammar import grammar_fingerprint, resolve_categories
+from lexicon import DEFAULT_PROFILE
+
+# Default size of the shared block in bytes
+DEFAULT_SIZE = 32 * 2**20
+
+# Longest normalized text (UTF-8 bytes) a slot holds
+DEFAULT_VALUE_BYTES = 1000
+
+# Default number of lock stripes
+DEFAULT_STRIPES = 64
+
+# Slots per bucket
+WAYS = 4
+
+_MAGIC = b'NTNC'
+_HEADER = struct.Struct('<4sIIII64s')   # magic, buckets, value_bytes, stripes, ways, fingerprint
+_COUNTERS = struct.Struct('<QQQQ')      # hits, misses, stores, evictions (per stripe)
+_KEY_BYTES = 16
+_LENGTH = struct.Struct('<I')           # value length + 1 (0 marks an empty slot)
+
+
+class SharedResultCache:
+    """
+    Fixed-size shared-memory cache of normalized text, shared by pool workers.
+
+    Args:
+        size (int): Size of the shared block in bytes (default 32 MiB)
+        value_bytes (int): Longest normalized text, in UTF-8 bytes, to cache
+        stripes (int): Number of locks the buckets are spread over
+        fingerprint (str): Grammar fingerprint (default grammar_fingerprint())
+
+    Attributes:
+        name (str): Name of the shared memory block
+        slots (int): Number of entries the table can hold
+    """
+
+    def __init__(self, size=DEFAULT_SIZE, value_bytes=DEFAULT_VALUE_BYTES,
+                 stripes=DEFAULT_STRIPES, fingerprint=None):
+        if value_bytes < 1:
+            raise ValueError(f"value_bytes must be >= 1, got {value_bytes}")
+        if stripes < 1:
+            raise ValueError(f"stripes must be >= 1, got {stripes}")
+        fingerprint = fingerprint or grammar_fingerprint()
+        slot_size = _KEY_BYTES + _LENGTH.size + value_bytes
+        table_offset = _HEADER.size + stripes * _COUNTERS.size
+        buckets = (size - table_offset) // (slot_size * WAYS)
+        if buckets < 1:
+            raise ValueError(f"size {size} is too small for one bucket of {WAYS} slots")
+
+        self._shm = shared_memory.SharedMemory(create=True, size=table_offset + buckets * WAYS * slot_size)
+        self._owner = True
+        _HEADER.pack_into(self._shm.buf, 0, _MAGIC, buckets, value_bytes, stripes, WAYS,
+                          fingerprint.encode('ascii')[:64])
+        # Named semaphores (not unlinked at creation, as 'fork' locks are),
+        # so workers of every start method can reopen them
+        context = multiprocessing.get_context('spawn')
+        self._locks = [context.Lock() for _ in range(stripes)]
+        self._setup()
+
+    def _setup(self):
+        _, self.buckets, self.value_bytes, self.stripes, ways, fingerprint = _HEADER.unpack_from(self._shm.buf, 0)
+        self.fingerprint = fingerprint.rstrip(b'\0').decode('ascii')
+        self.name = self._shm.name
+        self.slots = self.buckets * ways
+        self._buf = self._shm.buf
+        self._slot_size = _KEY_BYTES + _LENGTH.size + self.value_bytes
+        self._table_offset = _HEADER.size + self.stripes * _COUNTERS.size
+        self._digest_key = self.fingerprint.encode('ascii')[:64]
+
+    def __getstate__(self):
+        # Pickled when a pool starts its workers (locks only pickle then)
+        return {'name': self._shm.name, 'locks': self._locks}
+
+    def __setstate__(self, state):
+        try:
+            # Python 3.13+: leave the block to the creating process
+            self._shm = shared_memory.SharedMemory(name=state['name'], track=False)
+        except TypeError:
+            self._shm = shared_memory.SharedMemory(name=state['name'])
+        self._owner = False
+        self._locks = state['locks']
+        self._setup()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __repr__(self):
+        return f"SharedResultCache(name={self.name!r}, slots={self.slots}, value_bytes={self.value_bytes})"
+
+    def _locate(self, text, profile, categories):
+        categories = ",".join(sorted(categories)) if categories is not None else ""
+        digest = hashlib.blake2b(f"{profile}\0{categories}\0{text}".encode('utf-8'),
+                                 digest_size=_KEY_BYTES, key=self._digest_key).digest()
+        bucket = int.from_bytes(digest[:8], 'little') % self.buckets
+        return digest, bucket, bucket % self.stripes
+
+    def _count(self, stripe, field, amount=1):
+        offset = _HEADER.size + stripe * _COUNTERS.size + field * 8
+        value, = struct.unpack_from('<Q', self._buf, offset)
+        struct.pack_into('<Q', self._buf, offset, value + amount)
+
+    def get(self, text, profile=DEFAULT_PROFILE, categories=None):
+        """Return the cached normalization of `text` under `profile` and `categories`, or None."""
+        digest, bucket, stripe = self._locate(text, profile, categories)
+        buf = self._buf
+        offset = self._table_offset + bucket * WAYS * self._slot_size
+        with self._locks[stripe]:
+            for slot in range(offset, offset + WAYS * self._slot_size, self._slot_size):
+                if buf[slot:slot + _KEY_BYTES] == digest:
+                    length, = _LENGTH.unpack_from(buf, slot + _KEY_BYTES)
+                    if length:
+                        start = slot + _KEY_BYTES + _LENGTH.size
+                        value = bytes(buf[start:start + length - 1])
+                        self._count(stripe, 0)
+                        return value.decode('utf-8')
+            self._count(stripe, 1)
+        return None
+
+    def put(self, text, normalized, profile=DEFAULT_PROFILE, categories=None):
+        """
+        Cache `normalized` for `text` under `profile` and `categories`
+        (grammar categories the result was restricted to; None for all).
+
+        Returns:
+            bool: False if the value is longer than value_bytes and was not stored
+        """
+        value = normalized.encode('utf-8')
+        if len(value) > self.value_bytes:
+            return False
+        digest, bucket, stripe = self._locate(text, profile, categories)
+        buf = self._buf
+        offset = self._table_offset + bucket * WAYS * self._slot_size
+        slots = range(offset, offset + WAYS * self._slot_size, self._slot_size)
+        with self._locks[stripe]:
+            target = None
+            for slot in slots:
+                if buf[slot:slot + _KEY_BYTES] == digest:
+                    target = slot
+                    break
+                if target is None and not _LENGTH.unpack_from(buf, slot + _KEY_BYTES)[0]:
+                    target = slot
+            if target is None:
+                # Full bucket: overwrite the slot the key itself points at
+                target = slots[digest[8] % WAYS]
+                self._count(stripe, 3)
+            start = target + _KEY_BYTES + _LENGTH.size
+            buf[target:target + _KEY_BYTES] = digest
+            _LENGTH.pack_into(buf, target + _KEY_BYTES, len(value) + 1)
+            buf[start:start + len(value)] = value
+            self._count(stripe, 2)
+        return True
+
+    def stats(self):
+        """
+        Return counts summed over all processes using the cache.
+
+        Returns:
+            dict: hits, misses, stores, evictions, and hit_rate (0-1)
+        """
+        totals = [0, 0, 0, 0]
+        for stripe, lock in enumerate(self._locks):
+            with lock:
+                counts = _COUNTERS.unpack_from(self._buf, _HEADER.size + stripe * _COUNTERS.size)
+            totals = [total + count for total, count in zip(totals, counts)]
+        hits, misses, stores, evictions = totals
+        return {
+            'hits': hits,
+            'misses': misses,
+            'stores': stores,
+            'evictions': evictions,
+            'hit_rate': hits / (hits + misses) if hits + misses else 0.0,
+        }
+
+    def close(self):
+        """Detach from the block; the creating process also frees it."""
+        if self._shm is None:
+            return
+        self._buf.release()
+        self._buf = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+        self._shm = None
+
+
+# Cache attached to this process by a pool (see attach())
+_attached = None
+
+
+def attach(cache):
+    """Make `cache` the shared cache of this process (pool worker initializer)."""
+    global _attached
+    _attached = cache
+
+
+def attached_cache():
+    """Return the shared cache attached to this process, or None."""
+    return _attached
+
+
+class SharedCached:
+    """
+    Picklable wrapper that serves a normalize function from the attached cache.
+
+    In a process without an attached cache it just calls the function.
+    Inputs and results that are not strings (normalize(None) is None) go
+    around the cache, and results marked `degraded` (a deadline was reached)
+    or `failed` (see result_store.FailedNormalization) are not cached.
+
+    Args:
+        normalize_fn: Picklable function text -> normalized text
+        profile (str): Lexicon profile normalize_fn uses (part of the key)
+        categories: Grammar categories normalize_fn is restricted to (part of
+            the key; None for all)
+    """
+
+    def __init__(self, normalize_fn, profile=None, categories=None):
+        self.normalize_fn = normalize_fn
+        self.profile = profile or DEFAULT_PROFILE
+        self.categories = resolve_categories(categories) if categories is not None else None
+
+    def __call__(self, text):
+        cache = _attached
+        if cache is None or not isinstance(text, str):
+            return self.normalize_fn(text)
+        normalized = cache.get(text, self.profile, self.categories)
+        if normalized is None:
+            normalized = self.normalize_fn(text)
+            if isinstance(normalized, str) and not (
+                    getattr(normalized, 'degraded', False) or getattr(normalized, 'failed', False)):
+                cache.put(text, normalized, self.profile, self.categories)
+        return normalized
+
+
+__all__ = [
+    'DEFAULT_SIZE',
+    'DEFAULT_STRIPES',
+    'DEFAULT_VALUE_BYTES',
+    'SharedCached',
+    'SharedResultCache',
+    'attach',
+    'attached_cache',
+]
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Startup Snapshot for Norwegian Text Normalizer
+
+Importing the grammar builds a number of derived tables: the compiled
+lexicon of every profile, every spoken year 1-2999, every clock time and
+every day/month pair, per profile. Each worker process used to rebuild them
+on import. The snapshot stores them, together with the grammar fingerprint,
+in one file that later imports load with a single read.
+
+The snapshot is opt-in: it is only read and written when NORMALIZER_SNAPSHOT
+names its file, so a plain import never touches the disk. A natural place
+is the user cache directory, default_snapshot_path()
+($XDG_CACHE_HOME/norwegian-text-normalizer/snapshot.pickle, by default
+~/.cache/...); never the package directory, so read-only installs work.
+
+The snapshot is stamped with a hash of the grammar module sources and the
+Python and pyparsing versions. The stamp is a plain-text header, checked
+before anything in the file is unpickled. A snapshot with any other stamp is
+ignored, the tables are built as usual and the snapshot is rewritten, so it
+rebuilds itself whenever the grammar changes. It is written atomically, so
+concurrent imports at worst both build it.
+
+Usage:
+    python snapshot.py            # show the state of the snapshot
+    python snapshot.py --rebuild  # rebuild it now, e.g. when deploying
+                                  # (default_snapshot_path() if
+                                  # NORMALIZER_SNAPSHOT is not set)
+"""
+
+import argparse
+import hashlib
+import os
+import pickle
+import sys
+
+import pyparsing
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Environment variable with the snapshot path (unset or "off": no snapshot)
+SNAPSHOT_ENV = 'NORMALIZER_SNAPSHOT'
+
+# Modules whose source determines the snapshot contents (grammar.GRAMMAR_MODULES)
+SOURCE_MODULES = (
+    'lexicon',
+    'number_grammar_reverse',
+    'year_grammar_reverse',
+    'date_grammar_reverse',
+    'time_grammar_reverse',
+    'abbrev_grammar_reverse',
+    'enhanced_patterns_grammar_reverse',
+    'pretokenizer',
+    'segmentation',
+    'token_cache',
+    'grammar',
+)
+
+_FORMAT = 2
+_MAGIC = b"NORMALIZER-SNAPSHOT"
+
+
+def default_snapshot_path():
+    """Return the snapshot path in the user cache directory, or None if there is none."""
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser("~"), ".cache")
+    if not os.path.isabs(cache_home):
+        return None
+    return os.path.join(cache_home, 'norwegian-text-normalizer', 'snapshot.pickle')
+
+
+def snapshot_path():
+    """Return the snapshot path in use, or None if the snapshot is disabled."""
+    path = os.environ.get(SNAPSHOT_ENV)
+    return None if not path or path.lower() == 'off' else path
+
+
+def source_stamp():
+    """Hash of everything the snapshot contents depend on."""
+    digest = hashlib.sha256()
+    digest.update(f"{_FORMAT}|{sys.version}|{pyparsing.__version__}".encode())
+    for name in SOURCE_MODULES:
+        with open(os.path.join(_HERE, f"{name}.py"), 'rb') as f:
+            digest.update(name.encode() + b"\0" + f.read() + b"\0")
+    return digest.hexdigest()
+
+
+def _header(stamp):
+    """First line of a snapshot file: magic, format and stamp, in plain text."""
+    return b"%s %d %s\n" % (_MAGIC, _FORMAT, stamp.encode('ascii'))
+
+
+class _Snapshot:
+    """Entries of the snapshot file, loaded on first use."""
+
+    def __init__(self):
+        self.path = snapshot_path()
+        self.stamp = None
+        self.entries = None
+        self.dirty = False
+
+    def load(self):
+        if self.entries is not None:
+            return
+        self.entries = {}
+        if self.path is None:
+            return
+        self.stamp = source_stamp()
+        header = _header(self.stamp)
+        try:
+            with open(self.path, 'rb') as f:
+                # Only a file stamped for this very grammar is unpickled
+                if f.readline(len(header)) != header:
+                    return
+                entries = pickle.loads(f.read())
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            return
+        if isinstance(entries, dict):
+            self.entries = entries
+
+    def save(self):
+        if not self.dirty or self.path is None:
+            return False
+        import tempfile  # only needed when (re)writing the snapshot
+
+        data = _header(self.stamp) + pickle.dumps(self.entries, protocol=pickle.HIGHEST_PROTOCOL)
+        directory = os.path.dirname(self.path) or "."
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.snapshot-')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, self.path)
+        except OSError:
+            # Read-only location: keep working without a snapshot
+            return False
+        self.dirty = False
+        return True
+
+
+_snapshot = _Snapshot()
+
+
+def table(name, build):
+    """
+    Return the snapshot entry `name`, building and recording it if missing.
+
+    Args:
+        name (str): Entry name, e.g. 'year_grammar_reverse.YEAR_TABLES'
+        build: Zero-argument callable computing the value (must pickle)
+    """
+    _snapshot.load()
+    blob = _snapshot.entries.get(name)
+    if blob is not None:
+        return pickle.loads(blob)
+    value = build()
+    if _snapshot.path is not None:
+        _snapshot.entries[name] = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        _snapshot.dirty = True
+    return value
+
+
+def needs_save():
+    """True if entries were built in this process and are not on disk yet."""
+    return _snapshot.dirty
+
+
+def save():
+    """Write the snapshot if entries were added; returns True if written."""
+    return _snapshot.save()
+
+
+def info():
+    """Describe the snapshot in use: path, whether it is current, entry sizes."""
+    _snapshot.load()
+    return {
+        'path': _snapshot.path,
+        'stamp': _snapshot.stamp,
+        'current': bool(_snapshot.entries) and not _snapshot.dirty,
+        'entries': {name: len(blob) for name, blob in sorted(_snapshot.entries.items())},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show or rebuild the normalizer startup snapshot.")
+    parser.add_argument('--rebuild', action='store_true', help="rebuild the snapshot now")
+    args = parser.parse_args(argv)
+
+    path = snapshot_path()
+    if args.rebuild:
+        path = path or default_snapshot_path()
+        if path is None:
+            print(f"No user cache directory; set {SNAPSHOT_ENV} to the snapshot path", file=sys.stderr)
+            return 1
+        if os.path.exists(path):
+            os.remove(path)
+        _snapshot.path = path
+    import grammar  # noqa: F401 - loads the snapshot, or builds and saves it
+    state = info()
+
+    if state['path'] is None:
+        print(f"Snapshot disabled (set {SNAPSHOT_ENV} to its path to enable it)")
+        return 0
+    print(f"Snapshot: {state['path']}")
+    print(f"Stamp:    {state['stamp']}")
+    print(f"Current:  {'yes' if state['current'] else 'no'}")
+    if args.rebuild and snapshot_path() != path:
+        print(f"Use it with: export {SNAPSHOT_ENV}={path}")
+    for name, size in state['entries'].items():
+        print(f"  {name:<45} {size:>9,} bytes")
+    return 0
+
+
+if __name__ == '__main__':
+    # Run the imported module, so the grammar modules share its state
+    import snapshot
+    sys.exit(snapshot.main())
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The modules live at the top level of the repository
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Tests never read or write a startup snapshot, whatever the environment says
+os.environ['NORMALIZER_SNAPSHOT'] = 'off'
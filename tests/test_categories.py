@@ -0,0 +1,46 @@
+import pytest
+
+from grammar import GRAMMAR_CATEGORIES, GRAMMAR_RULES, normalize_text
+
+TEXT = "Møtet 3. juni 2023 kl. 15.30 med ca. 15 deltakere, 10-15 grupper og 1/6/2023"
+
+EXPECTED = {
+    'times': "Møtet 3. juni 2023 klokka femten tretti med ca. 15 deltakere, 10-15 grupper og 1/6/2023",
+    'ranges': "Møtet 3. juni 2023 kl. 15.30 med ca. 15 deltakere, ti til femten grupper og 1/6/2023",
+    'dates': "Møtet tredje juni tjue tjuetre kl. 15.30 med ca. 15 deltakere, 10-15 grupper og første juni tjue tjuetre",
+    'numbers': "Møtet tredje juni to tusen og tjue tre kl. femten tretti med ca. femten deltakere, 10-15 grupper og 1/6/2023",
+    'abbreviations': "Møtet 3. juni 2023 klokka 15.30 med cirka 15 deltakere, 10-15 grupper og 1/6/2023",
+    'years': "Møtet 3. juni tjue tjuetre kl. 15.30 med ca. 15 deltakere, 10-15 grupper og 1/6/2023",
+}
+
+
+def test_every_category_is_tested():
+    assert EXPECTED.keys() == GRAMMAR_CATEGORIES.keys()
+
+
+def test_every_rule_has_a_category():
+    names = {name for rules in GRAMMAR_CATEGORIES.values() for name in rules}
+    assert names == {name for name, _ in GRAMMAR_RULES}
+
+
+@pytest.mark.parametrize("category", EXPECTED)
+def test_single_category(category):
+    assert normalize_text(TEXT, categories={category}) == EXPECTED[category]
+
+
+def test_dates_speak_the_year_of_a_date():
+    assert normalize_text("3. juni 2023", categories={'dates'}) == "tredje juni tjue tjuetre"
+
+
+def test_years_leave_day_and_month_alone():
+    assert normalize_text("3. juni 2023", categories={'years'}) == "3. juni tjue tjuetre"
+    assert normalize_text("den 15. plass", categories={'years'}) == "den 15. plass"
+
+
+def test_all_categories_match_the_full_grammar():
+    assert normalize_text(TEXT, categories=GRAMMAR_CATEGORIES.keys()) == normalize_text(TEXT)
+
+
+def test_unknown_category():
+    with pytest.raises(ValueError):
+        normalize_text(TEXT, categories={'weather'})
@@ -0,0 +1,40 @@
+import pytest
+
+from columns import normalize_column
+from normalize import normalize
+
+pd = pytest.importorskip("pandas")
+
+
+def test_object_series_keeps_index_name_and_missing_values():
+    series = pd.Series(["ca. 15", None, "kl. 12", "ca. 15"], index=[3, 1, 4, 1], name="text")
+    result = normalize_column(series)
+    assert list(result.index) == [3, 1, 4, 1]
+    assert result.name == "text"
+    values = result.tolist()
+    assert pd.isna(values[1])
+    assert values[:1] + values[2:] == [normalize("ca. 15"), normalize("kl. 12"), normalize("ca. 15")]
+
+
+def test_categorical_series():
+    series = pd.Series(["ca. 15", "Møte 3. juni", None, "ca. 15", "ingen tall"],
+                       dtype="category", name="text")
+    result = normalize_column(series)
+    assert isinstance(result.dtype, pd.CategoricalDtype)
+    assert result.name == "text"
+    assert result.tolist()[:2] == [normalize("ca. 15"), normalize("Møte 3. juni")]
+    assert pd.isna(result[2])
+    assert result.tolist()[3:] == [normalize("ca. 15"), "ingen tall"]
+
+
+def test_categorical_categories_that_normalize_alike_are_merged():
+    series = pd.Series(["15", "femten", "15", None], dtype="category")
+    result = normalize_column(series)
+    assert list(result.cat.categories) == ["femten"]
+    assert result.tolist()[:3] == ["femten", "femten", "femten"]
+    assert pd.isna(result[3])
+
+
+def test_unsupported_column_type():
+    with pytest.raises(TypeError):
+        normalize_column(["ca. 15"])
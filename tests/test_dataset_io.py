@@ -0,0 +1,27 @@
+import pytest
+
+from dataset_io import ManifestReader, read_jsonl, read_pipe
+
+
+def test_jsonl_columns_are_the_union_of_keys(tmp_path):
+    path = tmp_path / "in.jsonl"
+    path.write_text('{"text": "ca. 15"}\n\n{"id": 2}\n', encoding='utf-8')
+    assert list(read_jsonl(path)) == [{'text': ["ca. 15", None], 'id': [None, 2]}]
+
+
+@pytest.mark.parametrize("line", ['[1, 2]', '15', '"ca. 15"'])
+def test_jsonl_line_that_is_not_an_object(tmp_path, line):
+    path = tmp_path / "in.jsonl"
+    path.write_text(f'{{"text": "ca. 15"}}\n{line}\n', encoding='utf-8')
+    with pytest.raises(ValueError, match="line 2"):
+        list(read_jsonl(path))
+
+
+def test_pipe_manifest(tmp_path):
+    path = tmp_path / "in.txt"
+    path.write_bytes("a.wav|ca. 15|2\n\nno fields\n  b.wav|kl. 15.30  \n".encode('utf-8'))
+    assert list(read_pipe(path)) == [
+        {'filename': ["a.wav", "b.wav"], 'text': ["ca. 15", "kl. 15.30"], 'speaker_id': ["2", "1"]}
+    ]
+    with ManifestReader(path) as reader:
+        assert [record.line_num for record in reader.records()] == [1, 4]
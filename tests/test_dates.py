@@ -0,0 +1,32 @@
+import pytest
+
+from grammar import normalize_text
+from lexicon import use_profile
+from year_grammar_reverse import ordinal_to_spoken
+
+
+def test_invalid_date_reads_the_day_as_an_ordinal():
+    # "32. juni" is not a calendar date; the ordinal rule takes the day
+    assert normalize_text("32. juni") == "trettiandre juni"
+    assert normalize_text("31. juni") == "trettiførste juni"
+
+
+@pytest.mark.parametrize("profile, digits, expected", [
+    ('bokmal', "40", "førtiende"),
+    ('bokmal', "45", "førtifemte"),
+    ('bokmal', "105", "ett hundre og femte"),
+    ('bokmal', "200", "to hundrede"),
+    ('bokmal_tradisjonell', "32", "toogtrettiende"),
+    ('bokmal_tradisjonell', "41", "énogførtiende"),
+    ('nynorsk', "40", "førtiande"),
+    ('nynorsk', "41", "førtifyrste"),
+])
+def test_compound_ordinals(profile, digits, expected):
+    with use_profile(profile):
+        assert ordinal_to_spoken(digits) == expected
+
+
+def test_text_after_an_ordinal_is_normalized():
+    # The ordinal rule matches only "N."; it used to swallow the rest of the
+    # line, which then came through unnormalized
+    assert normalize_text("den 3. plass 2023 ca. 15") == "den tredje plass tjue tjuetre cirka femten"
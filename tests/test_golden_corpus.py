@@ -0,0 +1,17 @@
+import pytest
+
+from equivalence import load_golden
+from grammar import normalize_text
+
+GOLDEN = load_golden()
+
+
+def test_changed_outputs_name_the_requests_that_changed_them():
+    for entry in GOLDEN:
+        assert ('baseline' in entry) == bool(entry.get('changed_by')), entry['input']
+
+
+@pytest.mark.parametrize("entry", GOLDEN, ids=lambda entry: entry['input'][:40])
+def test_reference_reproduces_golden_output(entry):
+    # Intended changes are recorded with: python equivalence.py --update-golden <request id>
+    assert normalize_text(entry['input']) == entry['expected']
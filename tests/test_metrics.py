@@ -0,0 +1,38 @@
+import threading
+
+from grammar import GRAMMAR_RULES, normalize_text, rule_matches
+from metrics import REGISTRY
+
+
+def _delta(text):
+    before = rule_matches()
+    normalize_text(text)
+    after = rule_matches()
+    return {rule: after[rule] - before[rule] for rule in after if after[rule] != before[rule]}
+
+
+def test_rule_matches_are_named_by_rule():
+    assert list(rule_matches()) == [name for name, _ in GRAMMAR_RULES]
+    assert _delta("Møtet 3. juni 2023 kl. 15.30 med ca. 15") == {
+        'time': 1, 'abbreviation': 1, 'date': 1, 'year': 1, 'number': 1,
+    }
+
+
+def test_rejected_candidates_are_not_counted():
+    assert _delta("31/13") == {}
+
+
+def test_matches_from_other_threads_are_summed():
+    normalize_text("ca. 15")  # pyparsing is not safe to warm up from several threads at once
+    before = rule_matches()['abbreviation']
+    threads = [threading.Thread(target=normalize_text, args=("ca. 15",)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert rule_matches()['abbreviation'] - before == 4
+
+
+def test_exported_by_rule_name():
+    normalize_text("ca. 15")
+    assert 'normalizer_rule_matches_total{rule="abbreviation"}' in REGISTRY.expose()
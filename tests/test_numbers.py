@@ -0,0 +1,20 @@
+from grammar import normalize_text
+from number_grammar_reverse import digits_to_spoken
+
+
+def test_overlong_digit_string_is_read_digit_by_digit():
+    assert digits_to_spoken("1" * 40) == " ".join(["en"] * 40)
+
+
+def test_overlong_non_ascii_digit_string():
+    # Arabic-Indic digits match \d in every number rule
+    digits = "٣" * 40
+    assert digits_to_spoken(digits) == " ".join(["tre"] * 40)
+    assert normalize_text(f"konto {digits} slutt") == f"konto {' '.join(['tre'] * 40)} slutt"
+
+
+def test_space_separated_numbers():
+    # Thousands groups are read as one number; other runs number by number.
+    # The old spaced-number rule matched such runs but never replaced them.
+    assert normalize_text("1 000 000") == "en million"
+    assert normalize_text("15 15 til") == "femten femten til"
@@ -0,0 +1,29 @@
+from grammar import normalize_text
+from result_store import FailedNormalization, NormalizationStore
+
+
+def test_results_are_stored_and_reused(tmp_path):
+    calls = []
+
+    def normalize_fn(text):
+        calls.append(text)
+        return normalize_text(text)
+
+    with NormalizationStore(str(tmp_path / "store.sqlite")) as store:
+        assert store.normalize_many(["ca. 15", "ca. 15"], normalize_fn) == {"ca. 15": "cirka femten"}
+        assert store.normalize_many(["ca. 15"], normalize_fn) == {"ca. 15": "cirka femten"}
+    assert calls == ["ca. 15"]
+
+
+def test_failed_results_are_not_stored(tmp_path):
+    with NormalizationStore(str(tmp_path / "store.sqlite")) as store:
+        store.normalize_many(["ca. 15"], FailedNormalization)
+        assert store.get("ca. 15") is None
+
+
+def test_lone_surrogates(tmp_path):
+    text = "ca. 15 \ud800"
+    with NormalizationStore(str(tmp_path / "store.sqlite")) as store:
+        assert store.normalize_many([text], normalize_text) == {text: normalize_text(text)}
+        assert store.get(text) is None
+        assert len(store) == 0
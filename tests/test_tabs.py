@@ -0,0 +1,45 @@
+import pyparsing as pp
+import pytest
+
+from grammar import GRAMMAR_RULES, normalize_text
+from incremental import IncrementalNormalizer
+from normalizer import Normalizer
+from pipeline import Pipeline
+
+TEXT = "Rom 12\tog 2\tca. 15\t3. juni"
+EXPECTED = "Rom tolv\tog to\tcirka femten\ttredje juni"
+
+
+def test_normalize_text():
+    assert normalize_text(TEXT) == EXPECTED
+
+
+def test_deadline_path():
+    assert normalize_text(TEXT, deadline=60) == EXPECTED
+
+
+def test_categories():
+    assert normalize_text(TEXT, categories={'numbers'}) == "Rom tolv\tog to\tca. femten\ttredje juni"
+
+
+def test_normalizer():
+    assert Normalizer().normalize(TEXT) == EXPECTED
+
+
+def test_incremental():
+    doc = IncrementalNormalizer()
+    assert doc.update(TEXT) == EXPECTED
+    assert doc.edit(4, 6, "7") == "Rom sju\tog to\tcirka femten\ttredje juni"
+
+
+@pytest.mark.parametrize("skip", [(), ('candidates',)])
+def test_pipeline(skip):
+    assert Pipeline().run(TEXT, skip=skip) == EXPECTED
+
+
+def test_grammar_that_expands_tabs():
+    # A grammar built without parseWithTabs() still splices at the right place
+    grammar = pp.Or([element for _, element in GRAMMAR_RULES] + [pp.Word(pp.printables)])
+    assert not grammar.keepTabs
+    assert normalize_text(TEXT, grammar=grammar) == EXPECTED
+    assert Pipeline(grammar=grammar).run(TEXT) == EXPECTED
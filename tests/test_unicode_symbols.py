@@ -0,0 +1,32 @@
+import pytest
+
+from grammar import normalize_text
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("1½", "en og en halv"),
+    ("⅓ av", "en tredjedel av"),
+    ("3¾", "tre og tre fjerdedeler"),
+    ("10³", "ti opphøyd i tre"),
+    ("10⁻⁶", "ti opphøyd i minus seks"),
+    ("1,5×10³", "en komma fem ganger ti opphøyd i tre"),
+    ("5 m²", "fem m²"),
+])
+def test_unicode_symbols(text, expected):
+    assert normalize_text(text) == expected
+
+
+def test_unit_after_a_fraction_is_expanded():
+    assert normalize_text("½kg") == "en halvkilo"
+    assert normalize_text("1½kg") == "en og en halvkilo"
+
+
+def test_ascii_caret_is_left_alone():
+    assert normalize_text("10^3") == "10^3"
+    assert normalize_text("2^10") == "2^10"
+
+
+def test_fraction_words_follow_the_profile():
+    assert normalize_text("1½ kopp og ¾ liter", profile='nynorsk') == "ein og ein halv kopp og tre fjerdedelar liter"
+    assert normalize_text("⅞", profile='bokmal_tradisjonell') == "syv åttendedeler"
+    assert normalize_text("⅞") == "sju åttendedeler"
@@ -0,0 +1,94 @@
+import pyparsing as pp
+from number_grammar_reverse import number_to_spoken, wstart, wend
+from lexicon import LEXICONS, current_lexicon, use_profile
+import snapshot
+
+###############################################################################
+# 1. Spoken clock times, precomputed per lexicon profile
+#
+#    "15:30" -> "femten tretti", "8.05" -> "åtte null fem", "16:00" -> "seksten"
+###############################################################################
+
+def _spell_time(hour: int, minute: int) -> str:
+    if minute == 0:
+        return number_to_spoken(hour)
+    if minute < 10:
+        return f"{number_to_spoken(hour)} null {number_to_spoken(minute)}"
+    return f"{number_to_spoken(hour)} {number_to_spoken(minute)}"
+
+def _build_time_table(profile):
+    """Spoken form of every time 00:00-24:00, indexed by hour * 60 + minute."""
+    with use_profile(profile):
+        return [_spell_time(hour, minute) for hour in range(24) for minute in range(60)] + [
+            number_to_spoken(24)
+        ]
+
+# Spoken times per lexicon profile
+TIME_TABLES = snapshot.table(
+    'time_grammar_reverse.TIME_TABLES',
+    lambda: {profile: _build_time_table(profile) for profile in LEXICONS},
+)
+
+def time_to_spoken(hour: int, minute: int = 0):
+    """Spell out a clock time, or return None if it is not a valid time (24:00 is)."""
+    if not (0 <= hour <= 23 and 0 <= minute <= 59) and (hour, minute) != (24, 0):
+        return None
+    return TIME_TABLES[current_lexicon().name][hour * 60 + minute]
+
+###############################################################################
+# 2. One matcher for every clock time form
+#
+#    kl. 15.30 / klokka 15:30 / Klokken 8 / kl. 10-12 / 15:30 / 15.30-16.00
+#    / 15.30-tiden. Without a clock word the time must use ":", be an
+#    interval of two HH.MM times or end in -tiden/-tida; a single bare "8.05"
+#    is left to the date rules. Punctuation after the time is kept.
+###############################################################################
+
+time_expr = pp.Regex(
+    r"(?:(?P<word>(?i:kl\.|klokka|klokken))\s+(?=\d)|(?=\d{1,2}[:.]\d{2}))"
+    r"(?P<hour>\d{1,2})(?:(?P<sep>[:.])(?P<minute>\d{2}))?"
+    r"(?:\s*[-–]\s*(?P<hour2>\d{1,2})(?:[:.](?P<minute2>\d{2}))?)?"
+    r"(?!\d|[:.]\d)"
+    r"(?:-(?P<suffix>tiden|tida))?"
+    r"(?P<punct>[.,?!:;])?"
+)
+
+def _clock_word(word):
+    """Keep "klokka"/"klokken" as typed; expand "kl." with the active profile."""
+    if word.lower() != "kl.":
+        return word
+    expansion = current_lexicon().abbreviations["kl."]
+    return expansion.capitalize() if word[0].isupper() else expansion
+
+def parse_time(s, loc, t):
+    raw = t[0]
+    if not (t.word or t.sep == ":" or t.suffix or (t.minute and t.minute2)):
+        raise pp.ParseException(s, loc, "bare dotted time without interval")
+
+    spoken = time_to_spoken(int(t.hour), int(t.minute or 0))
+    if spoken is None:
+        raise pp.ParseException(s, loc, f"not a clock time: {raw}")
+    if t.hour2:
+        end = time_to_spoken(int(t.hour2), int(t.minute2 or 0))
+        if end is None:
+            raise pp.ParseException(s, loc, f"not a clock time: {raw}")
+        spoken = f"{spoken} til {end}"
+
+    if t.word:
+        spoken = f"{_clock_word(t.word)} {spoken}"
+    if t.suffix:
+        spoken += f"-{t.suffix}"
+    return (raw, spoken + (t.punct or ""))
+
+time_expr.setParseAction(parse_time)
+
+timegrammar_reverse = (
+    wstart
+    + time_expr
+    + wend
+)
+
+__all__ = ["timegrammar_reverse", "time_expr", "time_to_spoken"]
+
+# Module metadata
+__version__ = '2.0.0'
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Per-Token Cache for Rule Outputs
+
+Tokens like "2023", "ca.", "kl. 15:30", "50%" and "3. juni" recur constantly
+across a corpus, even when the sentences around them differ. The token cache
+remembers the replacement a rule produced for a matched text, so the next
+time the same rule matches the same text its parse action is skipped.
+
+Entries are keyed by (rule id, lexicon profile, matched text) and evicted
+least recently used first once the cache is full. A rule that rejected a
+match (e.g. "31/13" is not a date) is cached as a rejection. Hits and misses
+are counted per rule.
+
+The grammar installs one shared cache on its rules at import:
+
+    from grammar import token_cache
+
+    normalize_text(text)
+    print(token_cache.stats())
+    token_cache.resize(0)   # disable
+"""
+
+import threading
+import weakref
+from collections import OrderedDict
+
+import pyparsing as pp
+
+from lexicon import current_lexicon
+
+# Default number of cached (rule, text) entries
+DEFAULT_MAXSIZE = 50000
+
+# Element types whose parse action sees the matched text as a single token
+_CACHEABLE_TYPES = (pp.Regex, pp.Word, pp.Combine)
+
+_MISSING = object()
+
+# Installed parse actions (as stored by pyparsing) -> (rule id, original action)
+_installed_actions = weakref.WeakKeyDictionary()
+
+
+class _Rejected:
+    """Cached outcome of a parse action that raised ParseException."""
+
+    __slots__ = ('msg',)
+
+    def __init__(self, msg):
+        self.msg = msg
+
+
+class TokenCache:
+    """
+    Bounded, thread-safe LRU cache of parse action results.
+
+    Attributes:
+        maxsize (int): Maximum number of entries (0 disables the cache)
+        hits, misses (int): Totals over all rules
+        evictions (int): Entries dropped to stay within maxsize
+    """
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        if maxsize < 0:
+            raise ValueError(f"maxsize must be >= 0, got {maxsize}")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._rule_stats = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return f"TokenCache(maxsize={self.maxsize}, size={len(self)})"
+
+    def lookup(self, rule_id, key):
+        """Return the cached result for `key` under `rule_id`, or a miss marker."""
+        with self._lock:
+            counts = self._rule_stats.get(rule_id)
+            if counts is None:
+                counts = self._rule_stats[rule_id] = [0, 0]
+            value = self._entries.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                counts[1] += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                counts[0] += 1
+            return value
+
+    def store(self, key, value):
+        """Add an entry, evicting the least recently used ones if full."""
+        with self._lock:
+            if not self.maxsize:
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def resize(self, maxsize):
+        """Change the size limit, evicting entries as needed (0 disables)."""
+        if maxsize < 0:
+            raise ValueError(f"maxsize must be >= 0, got {maxsize}")
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._entries) > maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop all entries and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._rule_stats.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """
+        Return per-rule statistics.
+
+        Returns:
+            dict: {rule_id: {'hits': int, 'misses': int}}, busiest rules first
+        """
+        with self._lock:
+            rules = sorted(self._rule_stats.items(), key=lambda item: -sum(item[1]))
+            return {rule_id: {'hits': hits, 'misses': misses} for rule_id, (hits, misses) in rules}
+
+
+def cached_action(cache, rule_id, action):
+    """
+    Wrap a parse action so its results are served from `cache`.
+
+    Only calls whose tokens are a single matched string are cached, and only
+    str/tuple results (which are immutable) are stored.
+    """
+    def cached(s, loc, t):
+        if len(t) != 1 or not isinstance(t[0], str) or not cache.maxsize:
+            return action(s, loc, t)
+        key = (rule_id, current_lexicon().name, t[0])
+        value = cache.lookup(rule_id, key)
+        if value is not _MISSING:
+            if isinstance(value, _Rejected):
+                raise pp.ParseException(s, loc, value.msg)
+            return value
+        try:
+            value = action(s, loc, t)
+        except pp.ParseException as exc:
+            cache.store(key, _Rejected(exc.msg))
+            raise
+        if isinstance(value, (str, tuple)):
+            cache.store(key, value)
+        return value
+
+    # Keep the action's name, so grammar descriptions (and the fingerprint)
+    # are the same with and without the cache
+    cached.__name__ = action.__name__
+    return cached
+
+
+def _rule_name(element, action):
+    if action.__name__ != '<lambda>':
+        return action.__name__
+    return str(element)[:60]
+
+
+def install_token_cache(grammar, cache, replace=False):
+    """
+    Route the parse actions of every cacheable rule in `grammar` through `cache`.
+
+    A rule is cacheable if it is a Regex, Word or Combine element with a
+    single parse action. Rules already wrapped are left alone, so installing
+    on grammars that share rules is safe; with `replace`, they are moved to
+    `cache` instead (for a copy of a grammar that gets a cache of its own).
+
+    Returns:
+        dict: {rule_id: element} for the rules that were wrapped
+    """
+    installed = {}
+    names = {}
+    seen = set()
+    stack = [grammar]
+    while stack:
+        element = stack.pop()
+        if id(element) in seen:
+            continue
+        seen.add(id(element))
+
+        if isinstance(element, pp.ParseExpression):
+            stack.extend(reversed(element.exprs))
+        elif isinstance(element, pp.ParseElementEnhance) and element.expr is not None:
+            stack.append(element.expr)
+
+        if not isinstance(element, _CACHEABLE_TYPES) or len(element.parseAction) != 1:
+            continue
+        action = element.parseAction[0]
+        if action in _installed_actions:
+            if not replace:
+                continue
+            rule_id, action = _installed_actions[action]
+        else:
+            name = _rule_name(element, action)
+            names[name] = names.get(name, 0) + 1
+            rule_id = name if names[name] == 1 else f"{name} #{names[name]}"
+        element.setParseAction(cached_action(cache, rule_id, action),
+                               callDuringTry=element.callDuringTry)
+        _installed_actions[element.parseAction[0]] = (rule_id, action)
+        installed[rule_id] = element
+    return installed
+
+
+__all__ = ['DEFAULT_MAXSIZE', 'TokenCache', 'cached_action', 'install_token_cache']
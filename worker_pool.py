@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Preloaded Process Pools for Norwegian Text Normalizer
+
+A plain multiprocessing pool has every worker import the normalizer, so
+every worker builds its own grammar, lexicon tables and token cache: on a
+64-core host that is 64 copies of the same data, built 64 times while the
+pool starts. NormalizerPool builds them once and lets the workers inherit
+them instead:
+
+- 'forkserver' (default where available): the fork server imports
+  pool_preload before it forks any worker, so every worker starts as a copy
+  of a process that already holds the warmed-up grammar
+- 'fork': the parent preloads itself and the workers are forked from it
+  (fastest start, but only safe in a parent without other threads)
+- 'spawn': every worker preloads on its own (no sharing; for platforms
+  without fork)
+
+The preloaded objects are frozen for the garbage collector (gc.freeze())
+before anything is forked. Collections in the workers then never write to
+them, so their memory pages stay shared instead of being copied into every
+worker the first time the collector runs.
+
+A SharedResultCache (shared_cache.py) passed as `shared_cache` is attached
+in every worker, and normalize_many() then serves repeated sentences from it
+across the whole pool.
+
+A single large document (a book, a long transcript) is normalized in
+parallel with normalize_document(): it is cut at safe segment boundaries
+(see segmentation.py), so no rule match is ever split, and the chunks are
+normalized on the workers and joined in order. The result is identical to
+normalize(text).
+
+Usage:
+    with NormalizerPool(workers=16) as pool:
+        results = pool.normalize_many(texts, profile='nynorsk')
+
+        # or any picklable function, e.g. a wrapper around normalize()
+        results = pool.map(normalize_fn, texts)
+
+    spoken = normalize_document(book, workers=16)
+"""
+
+import multiprocessing
+import os
+from functools import partial
+
+from normalize import normalize
+from segmentation import split_segments
+from shared_cache import SharedCached, attach
+
+START_METHODS = ('forkserver', 'fork', 'spawn')
+
+# Texts sent to a worker at a time, when map() is not given a chunksize
+DEFAULT_CHUNKSIZE = 64
+
+# Characters per chunk of a document given to one worker at a time
+DEFAULT_DOCUMENT_CHUNK = 64 * 1024
+
+
+def default_start_method():
+    """'forkserver' where the platform supports it, else 'spawn'."""
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        return 'forkserver'
+    return 'spawn'
+
+
+def document_chunks(text, chunk_size=DEFAULT_DOCUMENT_CHUNK):
+    """
+    Cut a document into chunks of about `chunk_size` characters at safe boundaries.
+
+    Consecutive segments from split_segments() are packed into chunks, so
+    every cut is a safe boundary and "".join(chunks) == text. A chunk is
+    longer than chunk_size only if a single segment is.
+    """
+    chunks = []
+    current = []
+    length = 0
+    for segment in split_segments(text, max_length=chunk_size):
+        if current and length + len(segment) > chunk_size:
+            chunks.append("".join(current))
+            current = []
+            length = 0
+        current.append(segment)
+        length += len(segment)
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
+def _preload_worker():
+    import pool_preload  # noqa: F401 - builds, warms up and freezes the grammar
+
+
+def _init_worker(shared_cache, preload):
+    if preload:
+        _preload_worker()
+    attach(shared_cache)
+
+
+class NormalizerPool:
+    """
+    Process pool whose workers share a preloaded normalizer.
+
+    Args:
+        workers (int): Number of worker processes (default: os.cpu_count())
+        start_method (str): 'forkserver', 'fork' or 'spawn' (default:
+            default_start_method())
+        maxtasksperchild (int): Optional number of tasks after which a
+            worker is replaced (see multiprocessing.Pool)
+        shared_cache (SharedResultCache): Optional cache attached in every
+            worker; the caller keeps ownership and closes it
+
+    The fork server is shared by the whole process; the preload only takes
+    effect if no other forkserver pool was started before the first
+    NormalizerPool.
+    """
+
+    def __init__(self, workers=None, start_method=None, maxtasksperchild=None, shared_cache=None):
+        start_method = start_method or default_start_method()
+        if start_method not in START_METHODS:
+            raise ValueError(f"Unknown start method: {start_method!r} "
+                             f"(expected one of {', '.join(START_METHODS)})")
+        if workers is not None and workers < 1:
+            raise ValueError(f"workers must be >= 1, got {workers}")
+
+        context = multiprocessing.get_context(start_method)
+        if start_method == 'forkserver':
+            context.set_forkserver_preload(['__main__', 'pool_preload'])
+        elif start_method == 'fork':
+            _preload_worker()
+
+        self.workers = workers or os.cpu_count() or 1
+        self.start_method = start_method
+        self.shared_cache = shared_cache
+        self._pool = context.Pool(self.workers, initializer=_init_worker,
+                                  initargs=(shared_cache, start_method == 'spawn'),
+                                  maxtasksperchild=maxtasksperchild)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()
+
+    def __repr__(self):
+        return f"NormalizerPool(workers={self.workers}, start_method={self.start_method!r})"
+
+    def map(self, func, texts, chunksize=DEFAULT_CHUNKSIZE):
+        """Apply picklable `func` to every text on the workers; returns a list in input order."""
+        return self._pool.map(func, texts, chunksize)
+
+    def imap(self, func, texts, chunksize=DEFAULT_CHUNKSIZE):
+        """Like map(), but yields results in input order as they arrive."""
+        return self._pool.imap(func, texts, chunksize)
+
+    def apply_async(self, func, args=()):
+        """Run func(*args) on a worker; returns a multiprocessing AsyncResult."""
+        return self._pool.apply_async(func, args)
+
+    def normalize_many(self, texts, chunksize=DEFAULT_CHUNKSIZE, **options):
+        """
+        Normalize texts on the workers with normalize.normalize().
+
+        With a shared cache, results are looked up in and added to it under
+        the profile and categories given; with a custom grammar or
+        use_enhanced=False the cache is not used.
+
+        Args:
+            texts: Iterable of strings
+            **options: Keyword arguments for normalize(), e.g. profile,
+                categories, deadline or degrade
+
+        Returns:
+            list of str, in input order
+        """
+        normalize_fn = partial(normalize, **options)
+        if (self.shared_cache is not None and options.get('grammar') is None
+                and options.get('use_enhanced', True)):
+            normalize_fn = SharedCached(normalize_fn, options.get('profile'), options.get('categories'))
+        return self.map(normalize_fn, texts, chunksize)
+
+    def normalize_document(self, text, profile=None, chunk_size=DEFAULT_DOCUMENT_CHUNK):
+        """
+        Normalize one large text on the workers; same result as normalize(text).
+
+        Args:
+            text (str): Document to normalize
+            profile (str): Lexicon variant profile (see lexicon.py)
+            chunk_size (int): Characters per chunk sent to a worker
+
+        Returns:
+            str: The normalized document
+        """
+        chunks = document_chunks(text, chunk_size)
+        return "".join(self.map(partial(normalize, profile=profile), chunks, 1))
+
+    def close(self):
+        """Let the workers finish the queued work, then wait for them to exit."""
+        self._pool.close()
+        self._pool.join()
+
+    def terminate(self):
+        """Stop the workers at once, dropping queued work."""
+        self._pool.terminate()
+        self._pool.join()
+
+
+def normalize_document(text, workers=None, profile=None, chunk_size=DEFAULT_DOCUMENT_CHUNK, pool=None):
+    """
+    Normalize one large text in parallel; same result as normalize(text).
+
+    Args:
+        text (str): Document to normalize
+        workers (int): Worker processes for a pool started for this call
+            (default: os.cpu_count()); ignored when `pool` is given
+        profile (str): Lexicon variant profile (see lexicon.py)
+        chunk_size (int): Characters per chunk sent to a worker
+        pool (NormalizerPool): Existing pool to use (and leave running)
+
+    Returns:
+        str: The normalized document
+    """
+    if pool is not None:
+        return pool.normalize_document(text, profile, chunk_size)
+    if workers == 1 or len(text) <= chunk_size:
+        return normalize(text, profile=profile)
+    chunks = document_chunks(text, chunk_size)
+    with NormalizerPool(min(workers or os.cpu_count() or 1, len(chunks))) as pool:
+        return "".join(pool.map(partial(normalize, profile=profile), chunks, 1))
+
+
+__all__ = [
+    'DEFAULT_DOCUMENT_CHUNK',
+    'NormalizerPool',
+    'START_METHODS',
+    'default_start_method',
+    'document_chunks',
+    'normalize_document',
+]
@@ -1,45 +1,15 @@
 import pyparsing as pp
 from pyparsing import Word, nums, Regex 
-from number_grammar_reverse import wstart, wend, number_to_spoken
+from number_grammar_reverse import wstart, wend, number_to_spoken, digits_to_spoken, MAX_SPOKEN_DIGITS
 import re
 
 
 
 
 
-ordinals_dict = {
-    1: ["første", "fyrste"],  # you may pick one: "første"
-    2: ["andre"],
-    3: ["tredje"],
-    4: ["fjerde"],
-    5: ["femte"],
-    6: ["sjette"],
-    7: ["sjuende", "syvende"],
-    8: ["åttende", "åttande"],
-    9: ["niende", "niande"],
-    10: ["tiende", "tiande"],
-    11: ["ellevte"],
-    12: ["tolvte"],
-    13: ["trettende", "trettande"],
-    14: ["fjortende", "fjortande"],
-    15: ["femtende", "femtande"],
-    16: ["sekstende", "sekstande"],
-    17: ["syttende", "syttande"],
-    18: ["attende", "attande"],
-    19: ["nittende", "nittande"],
-    20: ["tjuende", "tyvende", "tjuande"],
-    21: ["tjueførste", "tjuefyrste", "énogtyvende", "énogtjuende"],
-    22: ["tjueandre", "toogtyvende", "toogtjuende"],
-    23: ["tjuetredje", "treogtyvende", "treogtjuende"],
-    24: ["tjuefjerde", "fireogtyvende", "fireogtjuende"],
-    25: ["tjuefemte", "femogtyvende", "femogtjuende"],
-    26: ["tjuesjette", "seksogtyvende", "seksogtjuende"],
-    27: ["tjuesjuende", "tjuesyvende", "syvogtyvende", "syvogtjuende"],
-    28: ["tjueåttende", "tjueåttande", "åtteogtyvende", "åtteogtjuende"],
-    29: ["tjueniende", "tjueniande", "niogtyvende", "niogtjuende"],
-    30: ["trettiende", "trettiande"],
-    31: ["trettiførste", "trettifyrste", "énogtrettiende"],
-}
+# Day ordinals come from the lexicon (single source for all grammar modules)
+from lexicon import LEXICONS, ordinals_dict, current_lexicon, use_profile
+import snapshot
 
 
 def year_to_spoken(year: int) -> str:
@@ -50,9 +20,15 @@ def year_to_spoken(year: int) -> str:
     - 2001 -> "to tusen og én"
     - 2010 -> "tjue ti" (for years 2010+)
     - 2023 -> "tjue tre"
+
+    Years 1-2999 are looked up in YEAR_TABLES (built once per lexicon profile).
     """
-    if not (0 < year < 3000):
-        return number_to_spoken(year)
+    if 0 < year < 3000:
+        return YEAR_TABLES[current_lexicon().name][year]
+    return number_to_spoken(year)
+
+def _spell_year(year: int) -> str:
+    """Spell out a year 1-2999 (see year_to_spoken)."""
 
     # 2010-2099: Use digit pronunciation for 2010 onwards
     if 2010 <= year <= 2099:
@@ -93,16 +69,27 @@ def year_to_spoken(year: int) -> str:
 
 def compress_below_100(num: int) -> str:
     """Convert numbers < 100 to compressed Norwegian format"""
-    from number_grammar_reverse import ONES, TEENS, TENS
-    
+    lexicon = current_lexicon()
+
     if num < 10:
-        return ONES[num]
+        return lexicon.ones[num]
     if num < 20:
-        return TEENS[num]
-    
+        return lexicon.teens[num]
+
     tens = (num // 10) * 10
     ones = num % 10
-    return TENS[tens] + (ONES[ones] if ones != 0 else "")
+    return lexicon.tens[tens] + (lexicon.ones[ones] if ones != 0 else "")
+
+def _build_year_table(profile):
+    """Spoken form of every year 1-2999 under a lexicon profile (index = year)."""
+    with use_profile(profile):
+        return [""] + [_spell_year(year) for year in range(1, 3000)]
+
+# Spoken years per lexicon profile
+YEAR_TABLES = snapshot.table(
+    'year_grammar_reverse.YEAR_TABLES',
+    lambda: {profile: _build_year_table(profile) for profile in LEXICONS},
+)
 
 
 
@@ -178,35 +165,56 @@ def parse_year_with_punctuation(tokens):
 
     return (raw, spelled_year + punct) 
 
-ordinal_expr_general = pp.Regex(r"\b(\d+)\.(?!\d)(.*)?")
+# Only the number and its period are matched. The text after the ordinal is
+# left to the rest of the grammar; a trailing "(.*)" here made every "N."
+# compete with a match to the end of the line.
+ordinal_expr_general = pp.Regex(r"\b(\d+)\.(?!\d)")
+
+
+def ordinal_to_spoken(digits: str) -> str:
+    """
+    Spell out the ordinal of a string of digits in the active lexicon:
+    "3" -> "tredje", "32" -> "trettiandre", "100" -> "ett hundrede",
+    "105" -> "ett hundre og femte".
+
+    Ordinals below 100 that are not in the lexicon are compounded the way the
+    lexicon compounds 21-29 ("tjueandre", or "toogtyvende" in
+    bokmal_tradisjonell). Strings too long to read as a number are read
+    digit by digit.
+    """
+    lexicon = current_lexicon()
+    ordinals = lexicon.ordinals
+    if len(digits.lstrip("0")) > MAX_SPOKEN_DIGITS or not int(digits):
+        return f"{digits_to_spoken(digits)}ende"
+    value = int(digits)
+    if value in ordinals:
+        return ordinals[value]
+
+    rest = value % 100
+    if value < 100:
+        tens, ones = value - value % 10, value % 10
+        # Suffix of a round ten: "trettiende" / "trettiande"
+        round_tens = lexicon.tens[tens] + ordinals[30][len(lexicon.tens[30]):]
+        if not ones:
+            return round_tens
+        if ordinals[22].startswith(lexicon.tens[20]):
+            return lexicon.tens[tens] + ordinals[ones]
+        prefix = ordinals[21][:-len(ordinals[20])] if ones == 1 else f"{lexicon.ones[ones]}og"
+        return prefix + round_tens
+
+    head = digits_to_spoken(str(value - rest))
+    if rest:
+        return f"{head} og {ordinal_to_spoken(str(rest))}"
+    if head.endswith(("hundre", "tusen")):
+        return f"{head}de"
+    # "en million" -> "en millionte", "to millioner" -> "to millionte"
+    return f"{head.removesuffix('er').removesuffix('ar')}te"
 
 
 def parse_ordinal_expr_general(t):
-    # t[0] is the entire match: e.g. "15. plass"
-    import re
+    # t[0] is the entire match: e.g. "15."
     raw = t[0]
-    match = re.match(r"(\d+)\.(?!\d)(.*)?", raw)
-    if not match:
-        return (raw, raw)  # fallback
-    
-    digit_str = match.group(1)    # "15"
-    trailing   = match.group(2) or ""  # " plass"
-    
-    # Spell out ordinal
-    val = int(digit_str)
-    from number_grammar_reverse import number_to_spoken
-    
-    # If you have a dictionary up to 31, do that; else fallback:
-    if val in ordinals_dict:
-        spelled_ordinal = ordinals_dict[val][0]
-    else:
-        spelled_ordinal = f"{number_to_spoken(val)}ende"
-    
-    # Suppose you want to keep the original period as well
-    # by inserting it back before trailing text:
-    # e.g. "femtende" + "." + " plass"
-    new_text = f"{spelled_ordinal}{trailing}"
-    return (raw, new_text)
+    return (raw, ordinal_to_spoken(raw[:-1]))
 
 ordinal_expr_general.setParseAction(parse_ordinal_expr_general)
 
@@ -214,8 +222,7 @@ thousand_separated_expr = pp.Regex(r"\d{1,3}(\.\d{3})+")
 def parse_thousand_separated(t):
     # Remove all dots:
     numeric_str = t[0].replace(".", "")
-    # Convert to int and then to spoken form
-    spelled = number_to_spoken(int(numeric_str))
+    spelled = digits_to_spoken(numeric_str)
     return (t[0], spelled)
 
 thousand_separated_expr.setParseAction(parse_thousand_separated)
@@ -239,3 +246,12 @@ yeargrammar_reverse = (
     + wend
 )
 
+# The same patterns as separate rules, for grammars that select them one by
+# one (grammar.GRAMMAR_RULES)
+year_expr = wstart + year_pattern + wend
+age_expr = wstart + (age_decade_pattern ^ age_single_pattern ^ age_plural_pattern) + wend
+thousand_separated_rule = wstart + thousand_separated_expr + wend
+ordinal_rule = wstart + ordinal_expr_general + wend
+
+# Module metadata
+__version__ = '2.3.0'